@@ -1,26 +1,86 @@
 """
 시스템 전역 상수/경로 설정
 """
+import os
 from pathlib import Path
 
 # ── 운영 폴더 경로 ────────────────────────────────────────────────────────────
-BASE_DIR = Path(r"D:\_claude\인센티브_로지데이터")
+# LOGI_DATA_DIR 환경변수로 바꿀 수 있다 (시뮬레이션/벤치마크는 임시 폴더 사용)
+BASE_DIR = Path(os.getenv("LOGI_DATA_DIR", r"D:\_claude\인센티브_로지데이터"))
 RAW_DIR = BASE_DIR / "raw"
 PROCESSED_DIR = BASE_DIR / "processed"
 ERROR_DIR = BASE_DIR / "error"
 CSV_DIR = BASE_DIR / "csv"
 LOG_DIR = BASE_DIR / "logs"
 SCREEN_DIR = LOG_DIR / "screens"
+MONTH_STORE_PATH = PROCESSED_DIR / "month_store.sqlite3"   # 로컬 월 데이터 저장소 (CSV 원본)
+RUN_STATE_PATH = PROCESSED_DIR / "run_state.sqlite3"       # 전체 월 실행 상태 (체크포인트)
+ROW_INDEX_DIR = PROCESSED_DIR / "row_index"                 # (날짜, 코드) → 시트 행 번호 인덱스
 
 # ── 로지 UI 설정 ──────────────────────────────────────────────────────────────
 LOGI_WINDOW_TITLE_RE = r".*아리랑.*|.*SMART.*|.*스마트D2.*"  # 메인 창 title_re
 LOGI_MENU_EMPLOYEE   = "직원"             # 상단 메뉴명
 LOGI_SCREEN_NAME     = "기간별수신콜수"   # 메뉴 클릭 후 진입할 화면명
-LOGI_QUERY_WAIT_SEC  = 5                 # 조회 버튼 클릭 후 초기 대기(초)
-LOGI_POLL_INTERVAL_SEC = 1.0             # 조회 완료 감지 폴링 간격
+LOGI_QUERY_WAIT_SEC  = 5                 # 조회 결과가 이전 날짜와 같거나 0행일 때 확정까지 대기(초)
+LOGI_QUERY_STABLE_SEC = 0.3              # 새 결과 지문이 이 시간 동안 유지되면 조회 완료
+LOGI_POLL_FAST_SEC   = 0.05              # 조회 완료 감지 첫 폴링 간격 (1.5배씩 증가)
+LOGI_POLL_INTERVAL_SEC = 1.0             # 조회 완료 감지 최대 폴링 간격
 LOGI_POLL_MAX_SEC    = 60                # 조회 완료 최대 대기 시간
 CHECKBOX_LABEL       = "전화받은건수기준" # 체크박스 레이블 (정확한 텍스트)
 CHECKBOX_TARGET_STATE = True             # 체크박스 목표 상태 (True=체크)
+DATE_INPUT_MODE      = "auto"            # 기간 입력: "auto"(직접 쓰기→키 입력 폴백) / "value" / "dtp" / "keys"
+
+# ── 로지 UI 대기 엔진 (modules.wait_profile) ─────────────────────────────────
+WAIT_PROFILE_PATH  = LOG_DIR / "wait_profile.json"   # 단계별 관측 지연/제한 시간 프로파일
+WAIT_SAMPLES_KEEP  = 50                  # 단계별 보존 표본 수
+WAIT_BUDGET_MARGIN = 2.0                 # 제한 시간 = 관측 p95 × 배수
+WAIT_MIN_SEC       = 0.05                # 제한 시간 하한(초)
+
+# ── 단계별 추적 (modules.tracing) ───────────────────────────────────────────
+TRACE_ENABLED = True                     # 단계별 span 기록 → 실행 종료 시 trace JSON + p50/p95 표
+TRACE_FILENAME_FMT = "trace_{month}.json"   # LOG_DIR 아래 (ui.perfetto.dev / chrome://tracing)
+
+# ── 실행 메트릭 (modules.metrics) ───────────────────────────────────────────
+# node_exporter --collector.textfile.directory 에 이 파일이 있는 폴더를 지정 (또는 경로 변경)
+METRICS_ENABLED = True
+METRICS_TEXTFILE_PATH = LOG_DIR / "logi_rpa.prom"
+METRICS_MIN_INTERVAL_SEC = 1.0           # 날짜별 갱신 최소 간격 (실행 종료 시에는 항상 기록)
+
+# ── 데이터 추출 방식 ──────────────────────────────────────────────────────────
+# "excel": 그리드 우클릭 → 엑셀로보기 → Excel COM 파싱 (기존)
+# "grid" : Report 그리드(aid=1780) UIA 트리를 직접 읽음 (Excel 미실행)
+# "clipboard": 그리드 Ctrl+A/Ctrl+C → 클립보드 TSV 파싱 (Excel 미실행)
+EXTRACT_MODE = "excel"
+GRID_TOTAL_ROW_LABEL = "합계"            # 그리드 맨 아래 합계행 성명 (스킵)
+GRID_SCROLL_MAX_PAGES = 200              # 그리드 스크롤 최대 페이지 수 (무한루프 방지)
+
+# ── 날짜 루프 파이프라인 ──────────────────────────────────────────────────────
+PIPELINE_QUEUE_SIZE = 2                  # 업로드 대기 최대 일수 (초과 시 UI 단계 대기)
+
+# ── Sheets 쓰기 지연(write-behind) ────────────────────────────────────────────
+# 여러 날짜의 행을 모아 한 번에 upsert. 행 수/경과 시간/실행 종료 중 먼저 도달 시 flush.
+SHEETS_FLUSH_MAX_ROWS = 3000             # 버퍼 행 수 상한 (≈ 300명 × 10일)
+SHEETS_FLUSH_MAX_SEC  = 300              # 첫 행 버퍼링 후 최대 보류 시간(초)
+SHEETS_PUBLISH_MODE   = "upsert"         # "upsert": 키 단위 갱신/추가 / "snapshot": 월 블록 1회 쓰기
+SHEETS_ENABLED        = True             # False면 로컬 저장소에만 기록 (Sheets 게시 생략)
+SHEETS_INDEX_SAMPLES  = 8                # 행 인덱스 검증 시 첫/마지막 행 외에 확인할 중간 행 수
+
+# ── Sheets 게시 대기열 (modules.outbox) ──────────────────────────────────────
+# 파싱 배치를 디스크에 먼저 추가하고 별도 스레드가 게시 - Sheets 장애 중에도 조회는 계속 진행
+OUTBOX_DIR               = PROCESSED_DIR / "outbox"   # append-only 세그먼트 + 확인 로그
+OUTBOX_SEGMENT_MAX_BYTES = 8 * 1024 * 1024   # 세그먼트 파일 크기 상한 (초과 시 새 파일)
+OUTBOX_FSYNC             = True          # 추가마다 fsync (정전/강제 종료에도 배치 보존)
+OUTBOX_BACKOFF_BASE_SEC  = 5.0           # 게시 실패 후 재시도 대기 (연속 실패마다 2배)
+OUTBOX_BACKOFF_MAX_SEC   = 300.0         # 재시도 대기 상한(초)
+OUTBOX_DRAIN_TIMEOUT_SEC = 3600          # CSV/Telegram 전 outbox 비우기 최대 대기(초) - 초과 시 다음 실행으로
+
+# ── Sheets API 쿼터/재시도 ────────────────────────────────────────────────────
+SHEETS_READ_PER_MIN   = 60               # 읽기 요청 한도 (사용자·프로젝트당 분당)
+SHEETS_WRITE_PER_MIN  = 60               # 쓰기 요청 한도 (사용자·프로젝트당 분당)
+SHEETS_BURST          = 10               # 토큰 버킷 최대 적립량 (연속 허용 요청 수)
+SHEETS_MAX_RETRIES    = 5                # 429/5xx/네트워크 오류 재시도 횟수
+SHEETS_BACKOFF_BASE_SEC = 1.0            # 지수 백오프 밑(초) - full jitter 적용
+SHEETS_BACKOFF_MAX_SEC  = 64.0           # 백오프 상한(초)
 
 # ── 기간 입력 형식 (D9) ───────────────────────────────────────────────────────
 DATE_FMT = "%Y-%m-%d"                    # 날짜 문자열 포맷
@@ -34,12 +94,32 @@ COL_D    = 3    # D: 기사(받음)
 COL_E    = 4    # E: 고객(걸음)
 COL_F    = 5    # F: 기사(걸음)
 EXCEL_HEADER_ROWS = 1                    # 건너뛸 헤더 행 수
+EXCEL_READY_POLL_SEC = 0.05              # 통합문서 열림 확인 간격 (WorkbookOpen 이벤트 보조)
+
+# ── Excel 프로세스 수명 관리 (modules.excel_processes) ────────────────────────
+EXCEL_PID_REGISTRY      = LOG_DIR / "excel_pids.json"   # 내보내기로 생긴 Excel PID → 생성 시각 기록
+EXCEL_REUSE_INSTANCE    = True           # True: 연결 중인 인스턴스 하나만 유지 / False: 날짜마다 종료
+EXCEL_HUNG_DEADLINE_SEC = 10             # 응답 없음이 이 시간 이상 이어지면 강제 종료
+EXCEL_RSS_RECYCLE_MB    = 1500           # 유지 인스턴스 메모리 상한(MB) - 초과 시 종료 후 새로
+
+# ── Office 다이얼로그 감시 (modules.office_dialogs) ───────────────────────────
+OFFICE_DIALOG_POLL_SEC     = 0.25        # 새 Excel 다이얼로그 확인 간격(초)
+OFFICE_DIALOG_POLL_MAX_SEC = 2.0         # 감속 시 최대 간격(초)
+OFFICE_DIALOG_IDLE_DATES   = 3           # 다이얼로그 없는 날짜가 이만큼 이어지면 감속 시작
+OFFICE_DIALOG_WAIT_SEC     = 5.0         # COM 거부 시 다이얼로그 처리 대기 상한(초)
 
 # ── Google Sheets 헤더 ───────────────────────────────────────────────────────
 SHEET_HEADERS = ["날짜", "코드", "성명", "수신 합계", "발신 합계", "총합계"]
 
 # ── CSV 파일명 패턴 ───────────────────────────────────────────────────────────
 CSV_FILENAME_FMT = "logi_calls_{month}_{ts}.csv"
+CSV_CHUNK_ROWS = 1000                    # CSV 스트리밍 단위 행 수 (저장소 fetchmany / 시트 구간 읽기)
+
+# ── 월 피벗/순위 보고서 (modules.month_matrix) ─────────────────────────────────
+PIVOT_ENABLED = True                     # CSV Export 후 상담원 × 일자 피벗/순위 파일 생성·전송
+PIVOT_XLSX = True                        # 피벗+순위를 XLSX 한 파일로도 저장 (openpyxl 필요)
+PIVOT_FILENAME_FMT = "logi_pivot_{month}_{ts}.{ext}"
+RANKING_FILENAME_FMT = "logi_ranking_{month}_{ts}.csv"
 
 # ── Telegram 전송 ─────────────────────────────────────────────────────────────
 TELEGRAM_MAX_RETRIES = 3
@@ -6,7 +6,8 @@
   2. 수동 진행 안내 표시 (로지 로그인 / 기간별수신콜수 이동)
   3. 완료 후 [자동 진행 시작] 클릭
   4. 자동 진행: 기간 설정 -> 조회 -> 엑셀로보기 -> 파싱 -> Sheets upsert 반복
-  5. 완료 후 CSV Export -> Telegram 전송
+     (Sheets upsert는 업로드 워커에서 다음 날짜 조회와 겹쳐 진행)
+  5. 완료 후 CSV Export (로컬 월 저장소 기준) -> Telegram 전송
 """
 import queue
 import sys
@@ -49,27 +50,34 @@ def _add_queue_handler() -> None:
 # 자동화 파이프라인 (백그라운드 스레드에서 실행)
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _run_automation(month: str, done_callback, error_callback) -> None:
+def _run_automation(month: str, done_callback, error_callback, session=None) -> None:
     """
     백그라운드 스레드 함수.
     기간별수신콜수 화면이 열려 있다는 전제로 자동 진행.
+    session: SheetsSession. None이면 .env 설정으로 실행 단위 세션 생성.
     """
+    state = None     # 체크포인트 상태 (종료 시 메트릭 기록용)
+    flusher = None   # outbox flusher (종료 시 정지)
+    logi = None      # 로지 자동화 (종료 시 end_session)
     try:
         from loguru import logger
         from utils.secrets import load_env, get_spreadsheet_id, get_google_sa_json_path, get_telegram_credentials
-        from modules import checkpoint
+        from modules import checkpoint, pipeline
         from modules.logi_automation import LogiAutomation
-        from modules.excel_parser import parse_open_excel, close_excel_without_save
-        from modules.sheets_uploader import upsert_rows, read_all_rows
-        from modules.csv_exporter import export_csv
-        from modules.telegram_sender import send_csv
-
+        from modules.sheets_uploader import SheetsSession
+        from modules.csv_exporter import export_csv_stream
+        from modules.telegram_sender import send_csv, send_pivot
+        from modules.metrics import shared_metrics
+        from modules.tracing import shared_tracer
+        from config import OUTBOX_DRAIN_TIMEOUT_SEC
+
+        shared_tracer.reset()
         # ── 환경 설정 로드 ────────────────────────────────────────────────────
         logger.info("환경 변수 로드 중...")
         load_env()
-        spreadsheet_id     = get_spreadsheet_id()
-        sa_json_path       = get_google_sa_json_path()
         bot_token, chat_id = get_telegram_credentials()
+        if session is None:
+            session = SheetsSession(get_google_sa_json_path(), get_spreadsheet_id())
         logger.info("환경 변수 로드 완료")
 
         # ── 날짜 목록 ─────────────────────────────────────────────────────────
@@ -78,15 +86,24 @@ def _run_automation(month: str, done_callback, error_callback) -> None:
         all_dates = [date(year, mon, d).isoformat() for d in range(1, last_day + 1)]
 
         state = checkpoint.load(month)
-        dates_to_process = checkpoint.pending_dates(all_dates, state)
+        plan = pipeline.plan_days(all_dates, state)
+        shared_metrics.begin(month, session.quota, planned=plan.total)
+        # Sheets 게시는 outbox flusher 스레드가 맡는다 (장애 중에도 조회 계속)
+        flusher = pipeline.start_flusher(session, state)
+
+        # ── 업로드만 실패했던 날짜: 로지 조회 없이 로컬 저장소에서 재업로드 ──
+        if plan.upload:
+            logger.info(f"[{month}] 업로드만 남은 날짜 {len(plan.upload)}일 - 재업로드 중...")
+            pipeline.upload_cached(plan.upload, state, flusher)
 
+        dates_to_process = plan.extract
         if not dates_to_process:
-            logger.info(f"[{month}] 모든 날짜 이미 완료 - CSV/Telegram 단계로 진행")
+            logger.info(f"[{month}] 조회할 날짜 없음 - CSV/Telegram 단계로 진행")
         else:
             logger.info(
-                f"[{month}] 처리 대상: {len(dates_to_process)}일 / "
+                f"[{month}] 조회 대상: {len(dates_to_process)}일 / "
                 f"전체: {len(all_dates)}일 "
-                f"(이미 완료: {len(all_dates) - len(dates_to_process)}일)"
+                f"(이미 완료: {len(all_dates) - plan.total}일)"
             )
 
             # ── 로지 화면 연결 ────────────────────────────────────────────────
@@ -94,78 +111,78 @@ def _run_automation(month: str, done_callback, error_callback) -> None:
             logi = LogiAutomation()
             logi.connect_to_open_screen()
             logger.info("기간별수신콜수 화면 연결 완료")
+            pipeline.start_session()
+
+            # 조회/엑셀/파싱은 이 스레드에서, 로컬 기록/outbox 추가는 업로드 워커에서
+            def _extract(date_str: str) -> "pipeline.DayBatch":
+                logger.info(f"  [1/2] 기간 설정 및 조회 중...")
+                rows = pipeline.extract_day(logi, date_str)
+                logger.info(f"  [2/2] 데이터 추출 완료 ({len(rows)}행) - 업로드 대기열 등록")
+                return rows
+
+            pipeline.run_days(
+                dates_to_process,
+                state,
+                extract=_extract,
+                flusher=flusher,
+            )
 
-            total = len(dates_to_process)
-            for idx, date_str in enumerate(dates_to_process, 1):
-                logger.info(f"[{idx}/{total}] {date_str} 처리 시작")
-                try:
-                    # 1. 기간 설정 + 조회
-                    logger.info(f"  [1/5] 기간 설정 및 조회 중...")
-                    logi.query_date(date_str)
-                    logger.info(f"  [1/5] 조회 완료")
-
-                    # 2. 엑셀로보기
-                    logger.info(f"  [2/5] 엑셀로보기 실행 중...")
-                    logi.open_excel()
-                    logger.info(f"  [2/5] Excel 열림")
-
-                    # 3. Excel 파싱
-                    logger.info(f"  [3/5] Excel 데이터 파싱 중...")
-                    rows = parse_open_excel(date_str)
-                    close_excel_without_save()
-
-                    if not rows:
-                        logger.warning(f"  [3/5] 데이터 없음 - 이 날짜는 스킵")
-                        checkpoint.mark_done(state, date_str)
-                        continue
-                    logger.info(f"  [3/5] 파싱 완료 ({len(rows)}행)")
-
-                    # 4. Google Sheets 업로드
-                    logger.info(f"  [4/5] Google Sheets 업로드 중...")
-                    upsert_rows(sa_json_path, spreadsheet_id, month, rows)
-                    logger.info(f"  [4/5] 업로드 완료")
-
-                    # 5. 체크포인트
-                    checkpoint.mark_done(state, date_str)
-                    logger.info(f"  [5/5] {date_str} 완료 ({len(rows)}행)")
-
-                except Exception as e:
-                    logger.error(f"  [오류] {date_str} 실패: {e}")
-                    checkpoint.mark_failed(state, date_str)
-
-            failed = state.get("failed_dates", [])
-            logger.info(
-                f"[{month}] 날짜 루프 완료 - "
-                f"성공: {len(state.get('done_dates', []))}일, "
-                f"실패: {len(failed)}일"
+        # ── Sheets 게시 대기 (outbox 비우기) ──────────────────────────────────
+        logger.info(f"[{month}] Sheets 게시 대기 중... ({flusher.outbox.pending_rows()}행)")
+        if not flusher.drain(OUTBOX_DRAIN_TIMEOUT_SEC):
+            raise RuntimeError(
+                f"Sheets 게시가 {OUTBOX_DRAIN_TIMEOUT_SEC}초 안에 끝나지 않음 - "
+                f"미게시 {len(flusher.outbox)}건은 다음 실행에서 게시"
             )
-            if failed:
-                logger.warning(f"  실패 날짜: {', '.join(failed)}")
+        failed = state.failed_dates
+        logger.info(
+            f"[{month}] 날짜 처리 완료 - "
+            f"성공: {len(state.done_dates)}일, "
+            f"실패: {len(failed)}일"
+        )
+        if failed:
+            logger.warning(f"  실패 날짜: {', '.join(failed)}")
 
         # ── CSV Export ────────────────────────────────────────────────────────
         logger.info(f"[{month}] CSV Export 시작...")
-        all_rows = read_all_rows(sa_json_path, spreadsheet_id, month)
-        csv_path = export_csv(month, all_rows)
-        state["last_csv"] = csv_path.name
+        csv_path, n_rows = export_csv_stream(month, pipeline.month_chunks(session, month, state))
+        state.last_csv = csv_path.name
         checkpoint.save(state)
-        logger.info(f"[{month}] CSV 저장 완료: {csv_path.name} ({len(all_rows)}행)")
+        logger.info(f"[{month}] CSV 저장 완료: {csv_path.name} ({n_rows}행)")
+        pivot_paths = pipeline.month_pivot(month)
 
         # ── Telegram 전송 ─────────────────────────────────────────────────────
         logger.info(f"[{month}] Telegram 전송 중...")
-        ok = send_csv(bot_token, chat_id, csv_path, month, len(all_rows))
-        state["telegram_sent"] = ok
+        ok = send_csv(bot_token, chat_id, csv_path, month, n_rows)
+        state.telegram_sent = ok
         checkpoint.save(state)
+        if ok:
+            checkpoint.mark_completed(state)
+            shared_metrics.mark_success(state.completed_at)
+        if ok and pivot_paths:
+            send_pivot(bot_token, chat_id, pivot_paths, month)
 
         if ok:
             logger.info(f"[{month}] Telegram 전송 완료")
         else:
             logger.error(f"[{month}] Telegram 전송 실패 - CSV 로컬 보관: {csv_path}")
 
-        done_callback(month, len(all_rows))
+        done_callback(month, n_rows)
 
     except Exception as e:
         import traceback
         error_callback(f"{e}\n{traceback.format_exc()}")
+    finally:
+        from modules.metrics import shared_metrics
+        from modules.tracing import shared_tracer
+        if flusher is not None:
+            flusher.stop()
+        if logi is not None:   # 조회 중 예외여도 대기 프로파일 저장·감시 스레드 정지
+            from modules import pipeline
+            pipeline.end_session(logi)
+        shared_tracer.finish(month)
+        if state is not None:
+            shared_metrics.finish(state)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
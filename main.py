@@ -8,25 +8,34 @@
 
 흐름:
     1. 로지 로그인
-    2. 날짜 루프 (체크포인트로 재개 가능)
+    2. 날짜 루프 (체크포인트로 재개 가능 - 업로드만 실패했던 날짜는 로컬 저장소에서 먼저 일괄 재업로드)
        a. 기간 설정 → 조회
-       b. 엑셀로 보기
+       b. 엑셀로 보기          (EXTRACT_MODE="grid"/"clipboard"면 b~d 대신 그리드 직접 읽기/클립보드 복사)
        c. Excel 파싱
        d. Excel 닫기
-       e. Google Sheets upsert
-       f. 체크포인트 갱신
-    3. CSV Export
+       e. 로컬 저장소 + outbox 기록  — 업로드 워커 스레드. 다음 날짜의 a~d와 겹쳐 진행.
+       f. Google Sheets upsert       — outbox flusher 스레드. 여러 날짜를 모아 한 번에 (SHEETS_FLUSH_*),
+                                       장애 시 백오프 후 재시도 (그동안 a~e는 계속 진행)
+    3. CSV Export (outbox가 빈 뒤, 로컬 월 저장소 기준 - Sheets 재다운로드 없음)
+       + 상담원 × 일자 피벗/순위 (PIVOT_ENABLED)
     4. Telegram 전송
+    5. 단계별 trace 저장 (logs/trace_YYYY-MM.json) + p50/p95/max 표
+       Prometheus 메트릭 파일 (logs/logi_rpa.prom - 날짜 처리 후/종료 시 갱신)
+
+    python main.py reconcile 2026-02 [--push]     # 로컬 저장소 ↔ 시트 차이 점검
+    python main.py missing 2026                   # 연도(또는 월) 전체 미완료 날짜 (어제까지)
 """
 import sys
 from calendar import monthrange
 from datetime import date, timedelta
 from pathlib import Path
+from typing import Callable
 
 # 프로젝트 루트를 경로에 추가
 sys.path.insert(0, str(Path(__file__).parent))
 
 from loguru import logger
+from config import OUTBOX_DRAIN_TIMEOUT_SEC
 from utils.logger import setup_logger, save_screenshot
 from utils.secrets import (
     load_env,
@@ -35,12 +44,14 @@ from utils.secrets import (
     get_google_sa_json_path,
     get_telegram_credentials,
 )
-from modules import checkpoint
+from modules import checkpoint, month_store, pipeline
 from modules.logi_automation import LogiAutomation
-from modules.excel_parser import parse_open_excel, close_excel_without_save
-from modules.sheets_uploader import upsert_rows, read_all_rows
-from modules.csv_exporter import export_csv
-from modules.telegram_sender import send_csv
+from modules.records import CallRecord
+from modules.sheets_uploader import SheetsSession, read_all_rows, upsert_rows
+from modules.csv_exporter import export_csv_stream
+from modules.telegram_sender import send_csv, send_pivot
+from modules.metrics import shared_metrics
+from modules.tracing import shared_tracer
 
 
 def _generate_dates(month: str) -> list[str]:
@@ -64,88 +75,119 @@ def _date_range(start: str, end: str) -> list[str]:
     return result
 
 
-def run(month: str, dates: list[str], skip_export: bool = False) -> None:
+def run(
+    month: str,
+    dates: list[str],
+    skip_export: bool = False,
+    session: SheetsSession | None = None,
+    logi_factory: Callable[[str, str], LogiAutomation] = LogiAutomation,
+) -> None:
     """
     Args:
         month: 'YYYY-MM' (체크포인트/시트명/CSV명에 사용)
         dates: 처리할 날짜 리스트 ['YYYY-MM-DD', ...]
         skip_export: True면 CSV/Telegram 단계 스킵 (단일 날짜 테스트 시)
+        session: Sheets 연결. None이면 .env 설정으로 실행 단위 세션 생성.
+        logi_factory: (id, pw) → LogiAutomation. 시뮬레이션은 sim.fake_logi.SimLogiAutomation.
     """
     setup_logger(month)
+    shared_tracer.reset()
+    state = checkpoint.load(month)
+    try:
+        _run(month, dates, skip_export, session, logi_factory, state)
+    finally:
+        shared_tracer.finish(month)
+        shared_metrics.finish(state)
+
+
+def _run(
+    month: str,
+    dates: list[str],
+    skip_export: bool,
+    session: SheetsSession | None,
+    logi_factory: Callable[[str, str], LogiAutomation],
+    state: checkpoint.RunState,
+) -> None:
+    """run() 본문. state는 run()이 로드한 체크포인트 상태 (종료 시 메트릭 기록에도 사용)."""
     load_env()
 
     logi_id, logi_pw       = get_logi_credentials()
-    spreadsheet_id          = get_spreadsheet_id()
-    sa_json_path            = get_google_sa_json_path()
     bot_token, chat_id      = get_telegram_credentials()
+    if session is None:
+        session = SheetsSession(get_google_sa_json_path(), get_spreadsheet_id())
 
     all_dates = dates
-    state = checkpoint.load(month)
-    dates_to_process = checkpoint.pending_dates(all_dates, state)
-
-    if not dates_to_process:
-        logger.info(f"[{month}] 모든 날짜 이미 완료 - CSV/Telegram 단계로 진행")
-    else:
-        logger.info(f"[{month}] 처리 대상: {len(dates_to_process)}일 / 전체: {len(all_dates)}일")
-
-        logi = LogiAutomation(logi_id, logi_pw)
-        logi.login()
-
-        for date_str in dates_to_process:
-            logger.info(f"━━ [{date_str}] 처리 시작 ━━")
-            try:
-                # 조회
-                logi.query_date(date_str)
-
-                # 엑셀로 보기
-                logi.open_excel()
-
-                # Excel 파싱
-                rows = parse_open_excel(date_str)
-
-                # Excel 닫기
-                close_excel_without_save()
+    plan = pipeline.plan_days(all_dates, state)
+    shared_metrics.begin(month, session.quota, planned=plan.total)
 
-                if not rows:
-                    logger.warning(f"[{date_str}] 파싱 결과 없음 - 완료 처리")
-                    checkpoint.mark_done(state, date_str)
-                    continue
-
-                # Sheets upsert
-                upsert_rows(sa_json_path, spreadsheet_id, month, rows)
-
-                checkpoint.mark_done(state, date_str)
-                logger.info(f"[{date_str}] 완료 ({len(rows)}행)")
+    # Sheets 게시는 outbox flusher 스레드가 맡는다 (장애 중에도 조회 계속)
+    flusher = pipeline.start_flusher(session, state)
+    logi = None
+    try:
+        if plan.upload:
+            logger.info(f"[{month}] 업로드만 남은 날짜 {len(plan.upload)}일 - 로지 조회 없이 재업로드")
+            pipeline.upload_cached(plan.upload, state, flusher)
 
-            except Exception as e:
-                logger.error(f"[{date_str}] 처리 실패: {e}")
-                save_screenshot(month, f"error_{date_str}")
-                checkpoint.mark_failed(state, date_str)
+        dates_to_process = plan.extract
+        if not dates_to_process:
+            logger.info(f"[{month}] 조회할 날짜 없음 - CSV/Telegram 단계로 진행")
+        else:
+            logger.info(f"[{month}] 조회 대상: {len(dates_to_process)}일 / 전체: {len(all_dates)}일")
+
+            logi = logi_factory(logi_id, logi_pw)
+            logi.login()
+            pipeline.start_session()
+
+            # 조회/내보내기/파싱은 이 스레드에서, 로컬 기록/outbox 추가는 업로드 워커에서
+            pipeline.run_days(
+                dates_to_process,
+                state,
+                extract=lambda d: pipeline.extract_day(logi, d),
+                flusher=flusher,
+                on_extract_error=lambda d, e: save_screenshot(month, f"error_{d}"),
+            )
+
+        logger.info(f"[{month}] outbox 게시 대기 - {len(flusher.outbox)}건 / {flusher.outbox.pending_rows()}행")
+        drained = flusher.drain(OUTBOX_DRAIN_TIMEOUT_SEC)
+    finally:
+        flusher.stop()
+        if logi is not None:   # 로그인/조회 중 예외여도 대기 프로파일 저장·감시 스레드 정지
+            pipeline.end_session(logi)
+    logger.info(f"Sheets 요청 통계: {session.quota.stats()}")
+    if not drained:
+        logger.error(f"[{month}] outbox를 {OUTBOX_DRAIN_TIMEOUT_SEC}초 안에 비우지 못함 - "
+                     f"CSV/Telegram 보류 (다음 실행에서 게시 후 진행)")
+        return
 
     # ── CSV Export ────────────────────────────────────────────────────────────
     if skip_export:
         logger.info("테스트 모드 - CSV/Telegram 스킵")
         return
 
-    failed = state.get("failed_dates", [])
+    failed = state.failed_dates
     if failed:
         logger.warning(f"실패 날짜 {len(failed)}건 존재: {failed}")
 
     logger.info(f"[{month}] CSV Export 시작")
     try:
-        all_rows = read_all_rows(sa_json_path, spreadsheet_id, month)
-        csv_path = export_csv(month, all_rows)
-        state["last_csv"] = csv_path.name
+        csv_path, n_rows = export_csv_stream(month, pipeline.month_chunks(session, month, state))
+        state.last_csv = csv_path.name
         checkpoint.save(state)
     except Exception as e:
         logger.error(f"CSV Export 실패: {e}")
         return
+    pivot_paths = pipeline.month_pivot(month)
 
     # ── Telegram 전송 ─────────────────────────────────────────────────────────
     logger.info(f"[{month}] Telegram 전송 시작")
-    ok = send_csv(bot_token, chat_id, csv_path, month, len(all_rows))
-    state["telegram_sent"] = ok
+    ok = send_csv(bot_token, chat_id, csv_path, month, n_rows)
+    state.telegram_sent = ok
     checkpoint.save(state)
+    if ok:
+        checkpoint.mark_completed(state)
+        shared_metrics.mark_success(state.completed_at)
+    if ok and pivot_paths:
+        send_pivot(bot_token, chat_id, pivot_paths, month)
 
     if ok:
         logger.info(f"[{month}] 전체 파이프라인 완료")
@@ -153,15 +195,82 @@ def run(month: str, dates: list[str], skip_export: bool = False) -> None:
         logger.error(f"[{month}] Telegram 전송 실패 - CSV 로컬 보관: {csv_path}")
 
 
+def reconcile(month: str, push: bool = False) -> dict:
+    """
+    로컬 월 저장소와 시트를 (날짜, 코드) 키로 비교. 실행할 때만 시트를 내려받는다.
+    push=True면 로컬에만 있거나 값이 다른 행을 시트에 upsert한다.
+    """
+    setup_logger(month)
+    load_env()
+    session = SheetsSession(get_google_sa_json_path(), get_spreadsheet_id())
+
+    local = month_store.read_month(month)
+    sheet = read_all_rows(session, month)
+    diff = month_store.diff_rows(local, sheet)
+
+    logger.info(
+        f"[{month}] reconcile - 로컬 {len(local)}행 / 시트 {len(sheet)}행 | "
+        f"시트 누락 {len(diff['missing_in_sheet'])} / "
+        f"로컬 누락 {len(diff['missing_locally'])} / "
+        f"값 불일치 {len(diff['mismatched'])}"
+    )
+    for loc, sh in diff["mismatched"][:20]:
+        logger.info(f"  불일치: 로컬={loc} 시트={sh}")
+
+    if push:
+        to_push = diff["missing_in_sheet"] + [loc for loc, _ in diff["mismatched"]]
+        rows = [CallRecord.from_values(r) for r in to_push]
+        upsert_rows(session, month, rows)
+    return diff
+
+
+def missing(period: str) -> list[str]:
+    """'YYYY' 또는 'YYYY-MM' 중 체크포인트상 완료되지 않은 날짜 (어제까지). 월별 개수를 출력."""
+    if len(period) == 4:
+        start, end = date(int(period), 1, 1), date(int(period), 12, 31)
+    else:
+        start = date.fromisoformat(f"{period}-01")
+        end = start.replace(day=monthrange(start.year, start.month)[1])
+    end = min(end, date.today() - timedelta(days=1))
+    if end < start:
+        print(f"{period}: 조회할 지난 날짜가 없습니다.")
+        return []
+    dates = checkpoint.missing_dates(start.isoformat(), end.isoformat())
+    by_month: dict[str, list[str]] = {}
+    for d in dates:
+        by_month.setdefault(d[:7], []).append(d)
+    print(f"{period}: 미완료 {len(dates)}일 ({start} ~ {end})")
+    for month, days in by_month.items():
+        print(f"  {month}: {len(days)}일 - {', '.join(d[8:] for d in days)}")
+    return dates
+
+
 def main() -> None:
     if len(sys.argv) < 2:
         print("사용법:")
         print("  python main.py 2026-02                  # 월 전체 취합")
         print("  python main.py 2026-02 2026-02-15       # 단일 날짜 테스트")
         print("  python main.py 2026-02-01 2026-02-05    # 날짜 범위 지정")
+        print("  python main.py reconcile 2026-02 [--push]  # 로컬 저장소 ↔ 시트 점검")
+        print("  python main.py missing 2026             # 미완료 날짜 조회")
         sys.exit(1)
 
     arg1 = sys.argv[1]
+
+    if arg1 == "reconcile":
+        if len(sys.argv) < 3:
+            print("reconcile 대상 월을 지정하세요 (예: python main.py reconcile 2026-02)")
+            sys.exit(1)
+        reconcile(sys.argv[2], push="--push" in sys.argv[3:])
+        return
+
+    if arg1 == "missing":
+        if len(sys.argv) < 3:
+            print("조회할 연도나 월을 지정하세요 (예: python main.py missing 2026)")
+            sys.exit(1)
+        missing(sys.argv[2])
+        return
+
     arg2 = sys.argv[2] if len(sys.argv) >= 3 else None
 
     # ── 모드 판별 ──────────────────────────────────────────────────────────────
@@ -1,78 +1,410 @@
 """
-월 단위 실행 진행 상태를 로컬 JSON으로 저장/복구한다. (D25)
-
-파일 위치: C:/RPA/logi_exports/logs/checkpoint_{YYYY-MM}.json
-구조:
-{
-  "month": "2026-02",
-  "done_dates": ["2026-02-01", "2026-02-03", ...],
-  "failed_dates": ["2026-02-02", ...],
-  "last_csv": "logi_calls_2026-02_20260219-0630.csv",
-  "telegram_sent": false
-}
+월 단위 실행 진행 상태 저장/복구. (D25)
+
+예전에는 logs/checkpoint_{YYYY-MM}.json 전체를 mark_done/mark_failed마다 다시 썼다
+(원자적이지 않아 쓰기 중 종료되면 파일이 깨지고, 다음 load가 그 달을 통째로 초기화).
+이제 모든 월을 SQLite 하나(RUN_STATE_PATH, WAL)에 날짜 단위 행으로 기록한다.
+갱신은 해당 날짜 한 행만 바꾸는 트랜잭션이고, 메모리 사본(RunState)은 dict 조회다.
+
+날짜마다 단계별 결과도 남긴다 (D26):
+  queried(조회 성공) → parsed(파싱 + 로컬 저장소 기록) → uploaded(Sheets 게시 = done)
+  실패 시 failed_stage = 'query' | 'parse' | 'upload'
+파싱 행은 month_store(로컬 저장소)에 이미 있으므로, 업로드에서만 실패한 날짜는
+work_plan()이 upload 목록으로 분리 → 다음 실행 시작 시 로지 조회 없이 한 번에 다시 게시한다.
+
+테이블:
+  run_dates  (date PK, month, status 'done'|'failed'|'pending', attempts, row_count,
+              stage, failed_stage, first_attempt_at, updated_at,
+              queried_at, parsed_at, uploaded_at, done_at)
+  run_months (month PK, last_csv, telegram_sent, completed_at(epoch초), updated_at)
+  migrations (source PK, migrated_at)   ← 가져온 이전 JSON 파일
+
+기존 checkpoint_*.json은 저장소를 처음 열 때 가져오고 *.json.migrated로 이름을 바꾼다.
+  (저장소에 이미 있는 날짜는 저장소 값 유지. 깨진 JSON은 건너뛰고 경고만 남긴다)
 """
 import json
+import sqlite3
+import threading
+import time
+from calendar import monthrange
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import NamedTuple
 from loguru import logger
 
-from config import LOG_DIR
+from config import LOG_DIR, RUN_STATE_PATH
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS run_dates (
+    date             TEXT PRIMARY KEY,
+    month            TEXT NOT NULL,
+    status           TEXT NOT NULL,
+    attempts         INTEGER NOT NULL DEFAULT 0,
+    row_count        INTEGER,
+    first_attempt_at TEXT NOT NULL,
+    updated_at       TEXT NOT NULL,
+    done_at          TEXT,
+    stage            TEXT,
+    failed_stage     TEXT,
+    queried_at       TEXT,
+    parsed_at        TEXT,
+    uploaded_at      TEXT
+);
+CREATE INDEX IF NOT EXISTS run_dates_month ON run_dates (month, status);
+CREATE TABLE IF NOT EXISTS run_months (
+    month         TEXT PRIMARY KEY,
+    last_csv      TEXT,
+    telegram_sent INTEGER NOT NULL DEFAULT 0,
+    completed_at  REAL,
+    updated_at    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS migrations (
+    source      TEXT PRIMARY KEY,
+    migrated_at TEXT NOT NULL
+);
+"""
 
-def _checkpoint_path(month: str) -> Path:
-    return LOG_DIR / f"checkpoint_{month}.json"
+DONE = "done"
+FAILED = "failed"
+PENDING = "pending"     # 파싱까지 끝나고 업로드 결과 대기
 
+QUERIED, PARSED, UPLOADED = "queried", "parsed", "uploaded"
+# 실패 단계 → 그 시도에서 도달한 단계
+_REACHED = {"query": None, "parse": QUERIED, "upload": PARSED}
+_STAGE_COLUMNS = ("stage", "failed_stage", "queried_at", "parsed_at", "uploaded_at")
 
-def load(month: str) -> dict:
-    """체크포인트 로드. 없으면 빈 상태 반환."""
-    path = _checkpoint_path(month)
-    if path.exists():
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-            logger.info(f"체크포인트 로드: {path} (완료={len(data.get('done_dates', []))}일)")
-            return data
-        except Exception as e:
-            logger.warning(f"체크포인트 파싱 실패, 초기화: {e}")
 
-    return {
-        "month": month,
-        "done_dates": [],
-        "failed_dates": [],
-        "last_csv": None,
-        "telegram_sent": False,
-    }
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class StateStore:
+    """프로세스당 연결 하나 (UI 스레드/업로드 워커 공용, 잠금으로 직렬화)."""
+
+    def __init__(self, path: Path = RUN_STATE_PATH, legacy_dir: Path = LOG_DIR) -> None:
+        self.path = path
+        self.legacy_dir = legacy_dir
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            _add_stage_columns(conn)
+            self._conn = conn
+            self._migrate_json()
+        return self._conn
+
+    def execute(self, sql: str, params: tuple = ()) -> list[tuple]:
+        """한 문장 실행 + 커밋. 결과 행 목록 반환."""
+        with self._lock:
+            conn = self._db()
+            with conn:
+                return conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ── 이전 JSON 가져오기 ────────────────────────────────────────────────────
+
+    def _migrate_json(self) -> None:
+        for path in sorted(self.legacy_dir.glob("checkpoint_*.json")):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                month = data["month"]
+            except Exception as e:
+                logger.warning(f"체크포인트 JSON 가져오기 실패(건너뜀, 파일 유지): {path.name} - {e}")
+                continue
+            stamp = datetime.fromtimestamp(path.stat().st_mtime).isoformat(timespec="seconds")
+            done = set(data.get("done_dates", []))
+            failed = set(data.get("failed_dates", [])) - done
+            counts = data.get("fail_counts", {})
+            rows = [
+                (d, month, DONE if d in done else FAILED, counts.get(d, 0) + (d in done),
+                 stamp, stamp, stamp if d in done else None, UPLOADED if d in done else None)
+                for d in sorted(done | failed)
+            ]
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO run_dates "
+                    "(date, month, status, attempts, first_attempt_at, updated_at, done_at, stage) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO run_months VALUES (?, ?, ?, ?, ?)",
+                    (month, data.get("last_csv"), int(bool(data.get("telegram_sent"))),
+                     data.get("completed_at"), stamp),
+                )
+                self._conn.execute("INSERT OR REPLACE INTO migrations VALUES (?, ?)", (path.name, _now()))
+            path.replace(path.with_name(path.name + ".migrated"))
+            logger.info(f"체크포인트 JSON 가져오기: {path.name} → {self.path.name} "
+                        f"(완료 {len(done)}일 / 실패 {len(failed)}일)")
 
 
-def save(state: dict) -> None:
-    """체크포인트 저장."""
-    path = _checkpoint_path(state["month"])
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
-    logger.debug(f"체크포인트 저장: {path}")
+def _add_stage_columns(conn: sqlite3.Connection) -> None:
+    """단계 컬럼이 없는 이전 저장소에 컬럼 추가 (완료 날짜는 uploaded로 채움)."""
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(run_dates)")}
+    missing = [c for c in _STAGE_COLUMNS if c not in cols]
+    if not missing:
+        return
+    with conn:
+        for col in missing:
+            conn.execute(f"ALTER TABLE run_dates ADD COLUMN {col} TEXT")
+        conn.execute(
+            "UPDATE run_dates SET stage = ?, uploaded_at = done_at WHERE status = ? AND stage IS NULL",
+            (UPLOADED, DONE),
+        )
 
 
-def mark_done(state: dict, date_str: str) -> dict:
-    """날짜를 완료 목록에 추가하고 실패 목록에서 제거."""
-    if date_str not in state["done_dates"]:
-        state["done_dates"].append(date_str)
-    if date_str in state["failed_dates"]:
-        state["failed_dates"].remove(date_str)
-    save(state)
+shared_store = StateStore()
+
+
+class RunState:
+    """
+    한 달의 실행 상태 메모리 사본. 변경은 아래 mark_* / save()로만 (저장소에 즉시 반영).
+    업로드 워커와 outbox flusher가 함께 갱신하므로 목록은 복사본에서 만든다.
+    """
+
+    def __init__(self, month: str) -> None:
+        self.month = month
+        self.status: dict[str, str] = {}      # 날짜 → DONE / FAILED / PENDING
+        self.attempts: dict[str, int] = {}    # 날짜 → 기록된 시도(결과) 횟수
+        self.stage: dict[str, str | None] = {}          # 날짜 → 마지막 시도에서 도달한 단계
+        self.failed_stage: dict[str, str | None] = {}   # 날짜 → 실패 단계 (성공하면 None)
+        self.last_csv: str | None = None
+        self.telegram_sent = False
+        self.completed_at: float | None = None
+
+    @property
+    def done_dates(self) -> list[str]:
+        return sorted(d for d, s in list(self.status.items()) if s == DONE)
+
+    @property
+    def failed_dates(self) -> list[str]:
+        return sorted(d for d, s in list(self.status.items()) if s == FAILED)
+
+
+def load(month: str, store: StateStore = shared_store) -> RunState:
+    """월 상태 로드. 기록이 없으면 빈 상태."""
+    state = RunState(month)
+    for d, status, attempts, stage, failed_stage in store.execute(
+        "SELECT date, status, attempts, stage, failed_stage FROM run_dates WHERE month = ?", (month,)
+    ):
+        state.status[d] = status
+        state.attempts[d] = attempts
+        state.stage[d] = stage
+        state.failed_stage[d] = failed_stage
+    meta = store.execute(
+        "SELECT last_csv, telegram_sent, completed_at FROM run_months WHERE month = ?", (month,)
+    )
+    if meta:
+        state.last_csv, sent, state.completed_at = meta[0]
+        state.telegram_sent = bool(sent)
+    if state.status or meta:
+        logger.info(f"체크포인트 로드: {month} (완료={len(state.done_dates)}일, 실패={len(state.failed_dates)}일)")
+    return state
+
+
+def save(state: RunState, store: StateStore = shared_store) -> None:
+    """월 단위 값(last_csv / telegram_sent / completed_at) 저장. 날짜 상태는 mark_*가 바로 기록."""
+    store.execute(
+        "INSERT OR REPLACE INTO run_months VALUES (?, ?, ?, ?, ?)",
+        (state.month, state.last_csv, int(state.telegram_sent), state.completed_at, _now()),
+    )
+    logger.debug(f"체크포인트 저장: {state.month}")
+
+
+def _mark(state: RunState, date_str: str, store: StateStore, *, status: str, stage: str | None,
+          failed_stage: str | None = None, attempt: int = 1, row_count: int | None = None) -> RunState:
+    """날짜 한 행 upsert. 단계 시각은 새로 도달한 단계만 기록하고, 이전 값은 유지."""
+    now = _now()
+    reached = {
+        "queried_at": stage in (QUERIED, PARSED, UPLOADED),
+        "parsed_at": stage in (PARSED, UPLOADED),
+        "uploaded_at": stage == UPLOADED,
+    }
+    stamps = [now if hit else None for hit in reached.values()]
+    store.execute(
+        "INSERT INTO run_dates (date, month, status, attempts, row_count, stage, failed_stage, "
+        "  first_attempt_at, updated_at, queried_at, parsed_at, uploaded_at, done_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(date) DO UPDATE SET "
+        "  status = excluded.status, attempts = attempts + excluded.attempts, "
+        "  stage = excluded.stage, failed_stage = excluded.failed_stage, "
+        "  updated_at = excluded.updated_at, "
+        "  row_count = COALESCE(excluded.row_count, row_count), "
+        "  queried_at = COALESCE(excluded.queried_at, queried_at), "
+        "  parsed_at = COALESCE(excluded.parsed_at, parsed_at), "
+        "  uploaded_at = COALESCE(excluded.uploaded_at, uploaded_at), "
+        "  done_at = COALESCE(excluded.done_at, done_at)",
+        (date_str, date_str[:7], status, attempt, row_count, stage, failed_stage,
+         now, now, *stamps, now if status == DONE else None),
+    )
+    state.status[date_str] = status
+    state.attempts[date_str] = state.attempts.get(date_str, 0) + attempt
+    state.stage[date_str] = stage
+    state.failed_stage[date_str] = failed_stage
     return state
 
 
-def mark_failed(state: dict, date_str: str) -> dict:
-    """날짜를 실패 목록에 추가 (완료 목록에서는 제거하지 않음)."""
-    if date_str not in state["failed_dates"]:
-        state["failed_dates"].append(date_str)
-    save(state)
+def mark_parsed(state: RunState, date_str: str, row_count: int,
+                store: StateStore = shared_store) -> RunState:
+    """조회/파싱 성공 + 로컬 저장소 기록 완료. 업로드 결과 전까지 PENDING (시도 횟수는 세지 않음)."""
+    return _mark(state, date_str, store, status=PENDING, stage=PARSED, attempt=0, row_count=row_count)
+
+
+def mark_done(state: RunState, date_str: str, row_count: int | None = None,
+              store: StateStore = shared_store) -> RunState:
+    """날짜 완료(업로드 성공) 기록 (실패였으면 완료로 바뀜)."""
+    return _mark(state, date_str, store, status=DONE, stage=UPLOADED, row_count=row_count)
+
+
+def mark_failed(state: RunState, date_str: str, failed_at: str = "query",
+                store: StateStore = shared_store) -> RunState:
+    """
+    날짜 실패 기록. failed_at: 'query' | 'parse' | 'upload'.
+    이미 완료된 날짜(재수집 실패)는 완료 상태를 유지하고 시도 횟수만 센다.
+    """
+    if state.status.get(date_str) == DONE:
+        return _mark(state, date_str, store, status=DONE, stage=UPLOADED)
+    return _mark(state, date_str, store, status=FAILED, stage=_REACHED[failed_at], failed_stage=failed_at)
+
+
+def mark_completed(state: RunState, store: StateStore = shared_store) -> RunState:
+    """월 전체 완료 (CSV Telegram 전송 성공) 시각 기록."""
+    state.completed_at = time.time()
+    save(state, store)
     return state
 
 
-def is_done(state: dict, date_str: str) -> bool:
-    return date_str in state["done_dates"]
+def last_completed_at(store: StateStore = shared_store) -> float | None:
+    """모든 월 중 가장 최근 완료 시각 (epoch초). 없으면 None."""
+    return store.execute("SELECT MAX(completed_at) FROM run_months")[0][0]
+
+
+def attempt_number(state: RunState, date_str: str) -> int:
+    """이번이 이 날짜의 몇 번째 시도인지 (기록된 시도 횟수 + 1)."""
+    return state.attempts.get(date_str, 0) + 1
+
+
+def is_done(state: RunState, date_str: str) -> bool:
+    return state.status.get(date_str) == DONE
+
+
+class WorkPlan(NamedTuple):
+    """완료되지 않은 날짜의 단계별 작업 목록."""
+    upload: list[str]     # 파싱 행이 로컬 저장소에 있음 - 로지 조회 없이 다시 게시만
+    extract: list[str]    # 조회부터 다시 (UI)
+
+    @property
+    def total(self) -> int:
+        return len(self.upload) + len(self.extract)
+
+
+def work_plan(all_dates: list[str], state: RunState, cached_dates: set[str]) -> WorkPlan:
+    """
+    완료되지 않은 날짜를 단계별로 나눈다 (실패 포함).
+    cached_dates: 로컬 저장소에 행이 기록된 날짜 (month_store.stored_dates) - 파싱까지
+    끝났어도 저장소에 없으면 조회부터 다시 한다.
+    """
+    upload, extract = [], []
+    for d in all_dates:
+        if state.status.get(d) == DONE:
+            continue
+        if state.stage.get(d) == PARSED and d in cached_dates:
+            upload.append(d)
+        else:
+            extract.append(d)
+    return WorkPlan(upload, extract)
+
+
+def missing_dates(start: str, end: str, store: StateStore = shared_store) -> list[str]:
+    """start~end(포함, 'YYYY-MM-DD') 중 완료되지 않은 날짜 - 여러 달에 걸친 조회용."""
+    done = {d for (d,) in store.execute(
+        "SELECT date FROM run_dates WHERE date BETWEEN ? AND ? AND status = ?", (start, end, DONE)
+    )}
+    d, last = date.fromisoformat(start), date.fromisoformat(end)
+    out = []
+    while d <= last:
+        if d.isoformat() not in done:
+            out.append(d.isoformat())
+        d += timedelta(days=1)
+    return out
+
+
+def month_summaries(store: StateStore = shared_store) -> list[tuple[str, int, int, int]]:
+    """(월, 완료 일수, 실패 일수, 완료 행 수) - 기록이 있는 모든 월."""
+    return store.execute(
+        "SELECT month, SUM(status = 'done'), SUM(status = 'failed'), "
+        "COALESCE(SUM(CASE WHEN status = 'done' THEN row_count END), 0) "
+        "FROM run_dates GROUP BY month ORDER BY month"
+    )
+
+
+# ── 단독 실행 테스트 (JSON 재기록 대비 갱신 비용 / 1년 누락 조회) ───────────────
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
+    tmp = Path(tempfile.mkdtemp())
+    legacy = {
+        "month": "2025-12", "done_dates": [f"2025-12-{d:02d}" for d in range(1, 29)],
+        "failed_dates": ["2025-12-29"], "fail_counts": {"2025-12-29": 2},
+        "last_csv": "logi_calls_2025-12_x.csv", "telegram_sent": False,
+    }
+    (tmp / "checkpoint_2025-12.json").write_text(json.dumps(legacy), encoding="utf-8")
+    store = StateStore(tmp / "run_state.sqlite3", legacy_dir=tmp)
+
+    dec = load("2025-12", store)
+    assert len(dec.done_dates) == 28 and attempt_number(dec, "2025-12-29") == 3
+    assert (tmp / "checkpoint_2025-12.json.migrated").exists()
+
+    # 단계별 작업 계획: 업로드에서만 실패한 날짜는 upload, 조회 실패/캐시 없는 날짜는 extract
+    mark_parsed(dec, "2025-12-29", 300, store)
+    mark_failed(dec, "2025-12-29", "upload", store)
+    mark_parsed(dec, "2025-12-30", 300, store)                  # 업로드 전에 중단된 날짜
+    mark_failed(dec, "2025-12-31", "parse", store)
+    plan = work_plan([f"2025-12-{d:02d}" for d in range(1, 32)], load("2025-12", store),
+                     cached_dates={"2025-12-29", "2025-12-30"})
+    assert plan == WorkPlan(["2025-12-29", "2025-12-30"], ["2025-12-31"]), plan
+    assert load("2025-12", store).stage["2025-12-31"] == QUERIED
+
+    # 1년치 기록: 날짜당 1행 갱신 (이전 방식은 날짜마다 월 JSON 전체를 indent=2로 재기록)
+    days = [date(2026, m, d).isoformat() for m in range(1, 13) for d in range(1, monthrange(2026, m)[1] + 1)]
+    t0 = time.perf_counter()
+    states: dict[str, RunState] = {}
+    for i, d in enumerate(days):
+        if d[:7] not in states:
+            states[d[:7]] = load(d[:7], store)
+        st = states[d[:7]]
+        if i % 37 == 5:
+            mark_failed(st, d, "query", store)
+        else:
+            mark_parsed(st, d, 300, store)
+            mark_done(st, d, 300, store)
+    per_mark = (time.perf_counter() - t0) / (len(days) * 2)
+
+    legacy_month = {"month": "2026-01", "done_dates": days[:31], "failed_dates": []}
+    t0 = time.perf_counter()
+    for _ in range(200):
+        (tmp / "legacy.json").write_text(json.dumps(legacy_month, ensure_ascii=False, indent=2), encoding="utf-8")
+    per_json = (time.perf_counter() - t0) / 200
 
+    t0 = time.perf_counter()
+    missing = missing_dates("2025-12-01", "2026-12-31", store)
+    t_missing = time.perf_counter() - t0
 
-def pending_dates(all_dates: list[str], state: dict) -> list[str]:
-    """완료되지 않은 날짜 목록 반환 (실패 포함)."""
-    done = set(state["done_dates"])
-    return [d for d in all_dates if d not in done]
+    print(f"날짜 갱신 1건: SQLite {per_mark * 1000:.2f} ms | JSON 월 전체 재기록 {per_json * 1000:.2f} ms")
+    print(f"누락 날짜 조회 (13개월): {len(missing)}일, {t_missing * 1000:.2f} ms")
+    for row in month_summaries(store)[:3]:
+        print(row)
+    store.close()
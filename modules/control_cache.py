@@ -0,0 +1,107 @@
+"""
+로지 화면 컨트롤 해석 결과 캐시.
+
+child_window(...) 검색은 호출할 때마다 창의 UIA 하위 트리(수백 개 요소)를 훑는다.
+세션 동안 한 번 찾은 wrapper를 이름별로 보관하고, 사용 전
+is_enabled()/rectangle() 두 번의 가벼운 호출로 살아 있는지만 확인한다.
+죽은(또는 화면에서 사라진) 컨트롤만 다시 찾는다.
+
+    cache = ControlCache()
+    cache.register("query_btn", lambda: win.child_window(title_re=r"조\\s*회.*", control_type="Button"))
+    cache.get("query_btn").click_input()
+
+pywinauto에 의존하지 않으므로 sim.fake_uia의 가짜 트리로도 동작한다.
+"""
+import time
+from typing import Callable
+from loguru import logger
+
+
+def _is_alive(wrapper) -> bool:
+    """창이 닫히거나 컨트롤이 재생성되면 예외 또는 빈 사각형이 나온다."""
+    try:
+        rect = wrapper.rectangle()
+        return bool(wrapper.is_enabled()) and rect.width() > 0 and rect.height() > 0
+    except Exception:
+        return False
+
+
+class ControlCache:
+    def __init__(self) -> None:
+        self._resolvers: dict[str, Callable] = {}
+        self._cache: dict[str, object] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lookup_sec = 0.0
+
+    def register(self, name: str, resolver: Callable) -> None:
+        """resolver: 검색 조건(WindowSpecification) 또는 wrapper를 반환하는 함수."""
+        self._resolvers[name] = resolver
+        self._cache.pop(name, None)
+
+    def get(self, name: str):
+        """캐시된 wrapper 반환. 없거나 죽었으면 다시 찾는다 (실패 시 resolver 예외 그대로)."""
+        t0 = time.perf_counter()
+        try:
+            wrapper = self._cache.get(name)
+            if wrapper is not None and _is_alive(wrapper):
+                self.hits += 1
+                return wrapper
+
+            if wrapper is not None:
+                logger.debug(f"  컨트롤 '{name}' 무효 - 재탐색")
+            self.misses += 1
+            found = self._resolvers[name]()
+            wrapper = found.wrapper_object() if hasattr(found, "wrapper_object") else found
+            self._cache[name] = wrapper
+            return wrapper
+        finally:
+            self._lookup_sec += time.perf_counter() - t0
+
+    def invalidate(self, name: str | None = None) -> None:
+        """name 하나 또는 전체(None) 캐시 제거. 화면 재연결 시 전체 제거."""
+        if name is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(name, None)
+
+    def take_lookup_sec(self) -> float:
+        """마지막 호출 이후 누적된 탐색+확인 시간(초)을 반환하고 0으로 되돌린다."""
+        sec, self._lookup_sec = self._lookup_sec, 0.0
+        return sec
+
+
+# ── 단독 실행 테스트 (가짜 UIA 트리: 매번 검색 vs 캐시) ──────────────────────
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, str(__import__("pathlib").Path(__file__).parent.parent))
+    from sim.fake_uia import build_logi_tree, synthetic_grid
+
+    root = build_logi_tree(synthetic_grid(300))
+    win = root.child_window(title="기간별수신콜수")
+    specs = {
+        "checkbox":  lambda: win.child_window(title="전화받은건수기준", control_type="CheckBox"),
+        "date0":     lambda: win.child_window(auto_id="1204"),
+        "date1":     lambda: win.child_window(auto_id="1206"),
+        "query_btn": lambda: win.child_window(title_re=r"조\s*회.*", control_type="Button"),
+        "grid":      lambda: win.child_window(auto_id="1780", control_type="Table"),
+    }
+    days = 31
+
+    t0 = time.perf_counter()
+    for _ in range(days):
+        for resolve in specs.values():
+            resolve()
+    uncached = time.perf_counter() - t0
+
+    cache = ControlCache()
+    for name, resolve in specs.items():
+        cache.register(name, resolve)
+    t0 = time.perf_counter()
+    for _ in range(days):
+        for name in specs:
+            cache.get(name)
+    cached = time.perf_counter() - t0
+
+    print(f"{days}일 × {len(specs)}컨트롤 - 매번 검색: {uncached * 1000:.2f} ms / "
+          f"캐시: {cached * 1000:.2f} ms (적중 {cache.hits}, 재탐색 {cache.misses})")
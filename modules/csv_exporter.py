@@ -1,26 +1,35 @@
 """
-Google Sheets 월 시트 데이터를 CSV 파일로 내보낸다. (D21~D22)
+월 데이터를 CSV 파일로 내보낸다. (D21~D22)
+원본: 로컬 월 저장소 (modules.month_store) - Sheets 재다운로드 없음
+행 묶음 단위로 스트리밍 기록 (CSV_CHUNK_ROWS) → 월/연 단위 데이터도 메모리 일정
 
 파일명: logi_calls_{YYYY-MM}_{YYYYMMDD-HHMM}.csv
 저장 위치: C:/RPA/logi_exports/csv/
 인코딩: UTF-8 BOM (Excel 한글 호환)
 """
 import csv
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import Iterable
 from loguru import logger
 
 from config import CSV_DIR, CSV_FILENAME_FMT, SHEET_HEADERS
+from modules.tracing import traced
 
 
-def export_csv(month: str, rows: list[list]) -> Path:
+@traced()
+def export_csv_stream(month: str, chunks: Iterable[list]) -> tuple[Path, int]:
     """
+    행 묶음(chunk)을 받는 즉시 CSV에 기록한다. 메모리에는 한 묶음만 유지.
+
     Args:
         month: 'YYYY-MM'
-        rows: sheets_uploader.read_all_rows() 반환값 (헤더 제외 리스트)
+        chunks: 헤더 제외 행 리스트를 차례로 내주는 이터러블
+                (month_store.iter_month / sheets_uploader.iter_sheet_rows)
 
     Returns:
-        저장된 CSV 파일 경로
+        (저장된 CSV 파일 경로, 기록한 행 수)
     """
     CSV_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -28,10 +37,30 @@ def export_csv(month: str, rows: list[list]) -> Path:
     filename = CSV_FILENAME_FMT.format(month=month, ts=ts)
     filepath = CSV_DIR / filename
 
+    t0 = time.perf_counter()
+    total = 0
     with filepath.open("w", encoding="utf-8-sig", newline="") as f:
         writer = csv.writer(f)
         writer.writerow(SHEET_HEADERS)
-        writer.writerows(rows)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            total += len(chunk)
+
+    elapsed = time.perf_counter() - t0
+    rate = total / elapsed if elapsed > 0 else 0.0
+    logger.info(f"CSV 저장 완료: {filepath} ({total}행, {rate:,.0f}행/초)")
+    return filepath, total
 
-    logger.info(f"CSV 저장 완료: {filepath} ({len(rows)}행)")
+
+@traced()
+def export_csv(month: str, rows: list[list]) -> Path:
+    """
+    Args:
+        month: 'YYYY-MM'
+        rows: 헤더 제외, SHEET_HEADERS 순서 행 리스트
+
+    Returns:
+        저장된 CSV 파일 경로
+    """
+    filepath, _ = export_csv_stream(month, [rows])
     return filepath
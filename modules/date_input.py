@@ -0,0 +1,209 @@
+"""
+로지 기간 입력 Pane(aid 1204/1206)에 날짜를 쓰는 전략 모음.
+
+키 입력 방식은 로지 창이 전면에 있어야 하고 필드당 1초 이상 걸리며
+작업자가 키보드를 만지면 깨진다. 포커스 없이 값을 직접 쓰는 전략을 먼저 시도한다:
+
+  "value"  UIA ValuePattern.SetValue("YYYY-MM-DD HH:MM")
+  "dtp"    네이티브 SysDateTimePick32면 DTM_SETSYSTEMTIME 메시지
+           (pywinauto DateTimePickerWrapper.set_time - 프로세스 간 메모리 처리 포함)
+  "keys"   클릭 → 년/월/일/시 파트별 send_keys → Enter (기존 방식, 최종 폴백)
+
+모든 전략은 표시 값을 다시 읽어(read_field_digits) 검증한다.
+필드별로 성공한 전략을 기억해 다음 날짜부터는 바로 그 전략을 쓴다.
+표시 값을 읽을 수 없는 컨트롤이면 검증이 불가능하므로 키 입력만 사용한다.
+
+pywinauto는 dtp/keys 전략 안에서만 가져오므로 sim.fake_uia의 가짜 컨트롤로도 동작한다.
+"""
+import re
+import time
+from typing import Callable
+from loguru import logger
+
+from config import DATE_INPUT_MODE
+from modules.wait_profile import WaitEngine
+
+_DIRECT_STRATEGIES = ("value", "dtp")
+_KEYS_LEGACY_SEC = 1.1     # 키 입력 방식의 기존 고정 대기 합 (0.3 + 4×0.15 + 0.2)
+
+
+def read_field_digits(ctrl) -> str:
+    """기간 Pane의 표시 값에서 숫자만 추출. 읽을 수 없으면 ''."""
+    for getter in (
+        lambda: ctrl.iface_value.CurrentValue,
+        lambda: ctrl.legacy_properties().get("Value", ""),
+        ctrl.window_text,
+    ):
+        try:
+            digits = re.sub(r"\D", "", getter() or "")
+        except Exception:
+            continue
+        if digits:
+            return digits
+    return ""
+
+
+def _split(value: str) -> tuple[str, str, str, str]:
+    """'2026-02-01 00:00' → ('2026', '02', '01', '00')"""
+    date_part, time_part = value.split(" ")
+    year, month, day = date_part.split("-")
+    return year, month, day, time_part[:2]
+
+
+def _verified(ctrl, value: str) -> bool:
+    year, month, day, _ = _split(value)
+    return read_field_digits(ctrl).startswith(year + month + day)
+
+
+# ── 전략별 구현 ──────────────────────────────────────────────────────────────
+
+def set_by_value_pattern(ctrl, value: str, waits: WaitEngine) -> bool:
+    """ValuePattern.SetValue. 패턴 미지원/읽기 전용이면 예외."""
+    iface = ctrl.iface_value
+    if iface.CurrentIsReadOnly:
+        raise RuntimeError("ValuePattern 읽기 전용")
+    iface.SetValue(value)
+    return waits.wait_until(
+        "date.value", lambda: _verified(ctrl, value), legacy=_KEYS_LEGACY_SEC, ceiling=0.5,
+    )
+
+
+def set_by_dtp_message(ctrl, value: str, waits: WaitEngine) -> bool:
+    """네이티브 DateTimePicker에 DTM_SETSYSTEMTIME 전송. 다른 클래스면 예외."""
+    from pywinauto import handleprops
+    from pywinauto.controls.common_controls import DateTimePickerWrapper
+
+    hwnd = ctrl.handle
+    if not hwnd or "SysDateTimePick32" not in (handleprops.classname(hwnd) or ""):
+        raise RuntimeError("네이티브 DateTimePicker 아님")
+    year, month, day, hour = _split(value)
+    DateTimePickerWrapper(hwnd).set_time(
+        year=int(year), month=int(month), day=int(day), hour=int(hour),
+    )
+    return waits.wait_until(
+        "date.dtp", lambda: _verified(ctrl, value), legacy=_KEYS_LEGACY_SEC, ceiling=0.5,
+    )
+
+
+def set_by_keys(ctrl, value: str, waits: WaitEngine,
+                send_keys: Callable[[str], None] | None = None) -> bool:
+    """
+    DevExpress DateTimePicker는 파트별 순서대로 입력해야 함:
+      클릭 → 년도 입력 → 월 입력 → 일 입력 → 시간 입력 → Enter
+    (각 파트 입력 후 커서가 자동으로 다음 파트로 이동함)
+
+    파트 사이 간격은 관측 신호가 없어 표시 값 확인 결과로 학습한다.
+    표시 값을 읽을 수 없으면 고정 간격 후 True.
+    """
+    if send_keys is None:
+        from pywinauto.keyboard import send_keys
+
+    verifiable = bool(read_field_digits(ctrl))
+    ctrl.click_input()
+    waits.wait_until("date.focus", ctrl.has_keyboard_focus, legacy=0.3, ceiling=1.0)
+
+    # 년도 → 월 → 일 → 시간 순서로 각 파트를 개별 입력
+    for part in _split(value):
+        send_keys(part)
+        waits.pause("date.key", legacy=0.15)
+    send_keys("{ENTER}")
+
+    if not verifiable:
+        # 표시 값을 읽을 수 없는 환경 - 기존처럼 고정 간격 후 진행
+        waits.pause("date.commit.blind", legacy=0.2)
+        return True
+
+    ok = waits.wait_until("date.commit", lambda: _verified(ctrl, value), legacy=0.2, ceiling=1.5)
+    if ok:
+        waits.feedback("date.key", True)
+    else:
+        waits.feedback("date.key", False, ceiling=0.6)
+    return ok
+
+
+_STRATEGIES = {
+    "value": set_by_value_pattern,
+    "dtp": set_by_dtp_message,
+    "keys": set_by_keys,
+}
+
+
+class DateInput:
+    """
+    필드별 입력 전략 선택기.
+
+    mode: "auto"(직접 쓰기 → 키 입력 폴백) / "value" / "dtp" / "keys"
+    """
+
+    def __init__(self, waits: WaitEngine, mode: str = DATE_INPUT_MODE,
+                 send_keys: Callable[[str], None] | None = None) -> None:
+        self.waits = waits
+        self.mode = mode
+        self._send_keys = send_keys
+        self._preferred: dict[int, str] = {}    # field_index → 마지막 성공 전략
+        self.used: dict[str, int] = {}          # 전략별 성공 횟수
+
+    def _order(self, field_index: int) -> list[str]:
+        if self.mode != "auto":
+            return [self.mode]
+        preferred = self._preferred.get(field_index)
+        if preferred == "keys":
+            return ["keys"]
+        order = list(_DIRECT_STRATEGIES) + ["keys"]
+        if preferred:
+            order.remove(preferred)
+            order.insert(0, preferred)
+        return order
+
+    def set(self, ctrl, field_index: int, value: str) -> str:
+        """
+        값을 쓰고 검증까지 마친 전략 이름을 반환.
+        모든 전략이 실패하면 RuntimeError.
+        """
+        for name in self._order(field_index):
+            if name in _DIRECT_STRATEGIES and not read_field_digits(ctrl):
+                continue   # 읽어서 검증할 수 없으면 직접 쓰기는 신뢰하지 않음
+            try:
+                if name == "keys":
+                    ok = set_by_keys(ctrl, value, self.waits, self._send_keys)
+                else:
+                    ok = _STRATEGIES[name](ctrl, value, self.waits)
+            except Exception as e:
+                logger.debug(f"  기간 필드[{field_index}] '{name}' 전략 불가: {e}")
+                continue
+            if ok:
+                if self._preferred.get(field_index) != name:
+                    logger.debug(f"  기간 필드[{field_index}] 입력 전략 → '{name}'")
+                self._preferred[field_index] = name
+                self.used[name] = self.used.get(name, 0) + 1
+                return name
+            logger.debug(f"  기간 필드[{field_index}] '{name}' 전략 검증 실패 (표시={read_field_digits(ctrl)})")
+        self._preferred.pop(field_index, None)
+        raise RuntimeError(f"기간 필드[{field_index}] 모든 입력 전략 실패: {value}")
+
+
+# ── 단독 실행 테스트 (가짜 DateTimePicker: 직접 쓰기 vs 키 입력) ───────────────
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from sim.fake_uia import FakeDatePane
+
+    days = [f"2026-02-{d:02d} 00:00" for d in range(1, 29)]
+    profile = Path(tempfile.mkdtemp()) / "wait_profile.json"
+
+    for mode in ("value", "keys"):
+        pane = FakeDatePane("1204", supports_value=True)
+        di = DateInput(WaitEngine(profile), mode=mode, send_keys=pane.keyboard)
+        t0 = time.perf_counter()
+        for v in days:
+            di.set(pane, 0, v)
+            assert _verified(pane, v), (pane.text, v)
+        elapsed = time.perf_counter() - t0
+        print(f"{mode:>5}: {len(days)}회 {elapsed:6.2f}초 ({elapsed / len(days) * 1000:6.1f} ms/필드)")
+
+    pane = FakeDatePane("1206", supports_value=False)
+    di = DateInput(WaitEngine(profile), mode="auto", send_keys=pane.keyboard)
+    di.set(pane, 1, days[0])
+    print(f" auto: ValuePattern 미지원 컨트롤 → {di.used}")
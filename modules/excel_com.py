@@ -0,0 +1,228 @@
+"""
+Excel.Application 연결 계층.
+
+예전에는 _wait_for_excel이 0.5초마다 CoInitialize + GetActiveObject를 새로 호출했고
+parse_open_excel이 또 다른 COM 참조를 얻었다. 이제 스레드당 dispatch 하나를 캐시하고
+통합문서 준비는 다음 두 신호 중 먼저 오는 것으로 판단한다:
+  - Application.WorkbookOpen 이벤트 (win32com WithEvents, 메시지 펌프)
+  - 같은 dispatch의 Workbooks.Count > 0 (EXCEL_READY_POLL_SEC 간격)
+
+ExcelConnection 인터페이스:
+    conn.app()                   캐시된 Application 객체 (Excel 객체 모델)
+    conn.wait_workbook(timeout)  통합문서가 열릴 때까지 대기 후 app 반환
+    conn.close_active()          활성 통합문서를 저장 없이 닫기
+    conn.pid() / conn.reset()    연결된 Excel 프로세스 ID / 연결 버리기 (modules.excel_processes)
+    conn.attach(pids)            지정 PID 인스턴스로 다시 연결 (내보내기가 새 Excel을 띄운 경우)
+    conn.spawned                 내보내기 후 새로 생긴 Excel PID를 돌려주는 함수 (excel_processes가 설정)
+                                 wait_workbook은 연결 중인 인스턴스가 그 안에 없으면 새 인스턴스로 옮긴다
+
+Windows에서는 ComExcelConnection, 테스트/시뮬레이션에서는 sim.fake_excel의
+FakeExcelConnection을 use_connection()으로 끼운다.
+"""
+import threading
+import time
+from typing import Any, Callable, Iterable
+from loguru import logger
+
+from config import EXCEL_READY_POLL_SEC
+
+_WM_GETOBJECT = 0x003D
+_OBJID_NATIVEOM = 0xFFFFFFF0   # -16: 창의 Excel 객체 모델(Window) 요청
+
+
+class ExcelConnection:
+    """Excel.Application 연결. 하위 클래스는 _connect()와 (선택) _pump()를 구현."""
+
+    def __init__(self) -> None:
+        self._app: Any = None
+        self._opened = threading.Event()
+        self._target: list[int] = []     # 붙을 Excel PID 후보 (비어 있으면 실행 중인 아무 인스턴스)
+        self.spawned: Callable[[], set[int]] | None = None
+        self.connects = 0
+
+    # ── 하위 클래스 구현 ─────────────────────────────────────────────────────
+
+    def _connect(self) -> Any:
+        raise NotImplementedError
+
+    def _alive(self, app: Any) -> bool:
+        try:
+            app.Workbooks.Count
+            return True
+        except Exception:
+            return False
+
+    def _pump(self) -> None:
+        """대기 중 이벤트 전달이 필요한 구현은 메시지 펌프."""
+
+    # ── 공통 ─────────────────────────────────────────────────────────────────
+
+    def on_workbook_open(self, *_args) -> None:
+        self._opened.set()
+
+    def app(self) -> Any:
+        """캐시된 Application. 끊겼으면(Excel 재시작 등) 다시 연결."""
+        if self._app is None or not self._alive(self._app):
+            self._app = self._connect()
+            self.connects += 1
+        return self._app
+
+    def _follow_spawned(self) -> None:
+        """내보내기로 새 Excel이 떴는데 다른(이전) 인스턴스에 붙어 있으면 새 인스턴스로 재연결."""
+        if self.spawned is None:
+            return
+        try:
+            new = self.spawned()
+            current = self.pid()
+        except Exception:
+            return
+        if new and current not in new and sorted(new, reverse=True) != self._target:
+            logger.info(f"Excel 새 인스턴스 감지 (pid={sorted(new)}, 연결 중 pid={current}) - 재연결")
+            self.attach(new)
+
+    def wait_workbook(self, timeout_sec: float = 30.0) -> Any:
+        """
+        통합문서가 열릴 때까지 대기. WorkbookOpen 이벤트 또는 Workbooks.Count > 0.
+        Excel 자체가 아직 없으면 연결을 재시도하고, 새 인스턴스가 생기면 그쪽으로 옮긴다.
+        """
+        deadline = time.monotonic() + timeout_sec
+        last_error: Exception | None = None
+        while True:
+            self._follow_spawned()
+            try:
+                app = self.app()
+                if self._opened.is_set() or app.Workbooks.Count > 0:
+                    self._opened.clear()
+                    logger.debug("Excel 통합문서 확인됨")
+                    return app
+            except Exception as e:
+                last_error = e
+                self._app = None
+            if time.monotonic() >= deadline:
+                break
+            self._pump()
+            self._opened.wait(EXCEL_READY_POLL_SEC)
+        raise TimeoutError(f"Excel이 {timeout_sec}초 내에 열리지 않았습니다. ({last_error or '통합문서 없음'})")
+
+    def pid(self) -> int | None:
+        """연결 중인 Excel 프로세스 ID. 연결 전이면 None."""
+        return None
+
+    def reset(self) -> None:
+        """캐시된 Application 버림 (프로세스 종료/교체 후 다음 app()에서 재연결)."""
+        self._app = None
+        self._target = []
+        self._opened.clear()
+
+    def attach(self, pids: Iterable[int]) -> None:
+        """다음 app()에서 지정 PID 중 하나(큰 번호부터)에 연결. 이전 인스턴스 연결은 버린다."""
+        self.reset()
+        self._target = sorted(pids, reverse=True)
+
+    def close_active(self) -> None:
+        wb = self.app().ActiveWorkbook
+        if wb:
+            wb.Close(SaveChanges=False)
+
+
+class ComExcelConnection(ExcelConnection):
+    """win32com 구현. 생성한 스레드에서만 사용 (스레드당 하나 - connection() 참고)."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._events = None
+        try:
+            import pythoncom
+            pythoncom.CoInitialize()
+        except Exception:
+            pass
+
+    def _connect_pid(self) -> Any:
+        """
+        지정 PID의 통합문서 창(EXCEL7)에서 Application을 얻는다.
+        GetActiveObject는 ROT에 먼저 등록된 인스턴스만 돌려주므로 새로 뜬 Excel에 붙을 수 없다.
+        """
+        import pythoncom
+        import win32com.client
+        import win32gui
+        from modules.excel_processes import _main_windows
+
+        def collect(hwnd, found):
+            if win32gui.GetClassName(hwnd) == "EXCEL7":
+                found.append(hwnd)
+            return True
+
+        for pid in self._target:
+            for top in _main_windows(pid):
+                found: list[int] = []
+                try:
+                    win32gui.EnumChildWindows(top, collect, found)
+                except Exception:
+                    continue
+                for hwnd in found:
+                    try:
+                        lres = win32gui.SendMessage(hwnd, _WM_GETOBJECT, 0, _OBJID_NATIVEOM)
+                        ptr = pythoncom.ObjectFromLresult(lres, pythoncom.IID_IDispatch, 0)
+                        return win32com.client.Dispatch(ptr).Application
+                    except Exception:
+                        continue
+        raise RuntimeError(f"Excel COM 연결 실패: pid={self._target}의 통합문서 창 없음")
+
+    def _connect(self) -> Any:
+        import win32com.client
+        if self._target:
+            app = self._connect_pid()
+        else:
+            try:
+                app = win32com.client.GetActiveObject("Excel.Application")
+            except Exception as e:
+                raise RuntimeError(f"Excel COM 연결 실패: {e}")
+
+        owner = self
+
+        class _AppEvents:
+            def OnWorkbookOpen(self, *args):
+                owner.on_workbook_open(*args)
+
+        try:
+            self._events = win32com.client.WithEvents(app, _AppEvents)
+        except Exception as e:
+            self._events = None
+            logger.debug(f"Excel 이벤트 연결 실패 - Workbooks.Count 폴링만 사용: {e}")
+        logger.debug("Excel COM 연결")
+        return app
+
+    def pid(self) -> int | None:
+        if self._app is None:
+            return None
+        import win32process
+        return win32process.GetWindowThreadProcessId(self._app.Hwnd)[1]
+
+    def _pump(self) -> None:
+        if self._events is None:
+            return
+        try:
+            import pythoncom
+            pythoncom.PumpWaitingMessages()
+        except Exception:
+            pass
+
+
+_local = threading.local()
+_override: ExcelConnection | None = None
+
+
+def connection() -> ExcelConnection:
+    """현재 스레드의 Excel 연결 (use_connection으로 지정한 것이 있으면 그것)."""
+    if _override is not None:
+        return _override
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = ComExcelConnection()
+    return conn
+
+
+def use_connection(conn: ExcelConnection | None) -> None:
+    """모든 스레드에서 쓸 연결 지정 (가짜 Excel 주입용). None이면 기본 COM 연결로 복귀."""
+    global _override
+    _override = conn
@@ -1,22 +1,17 @@
 """
 "엑셀로 보기"로 열린 Excel 인스턴스에서 데이터를 파싱한다. (D15~D17)
 
-win32com.client.GetActiveObject("Excel.Application")로 현재 열린 Excel에 접근.
+modules.excel_com의 스레드별 Excel.Application 연결(ExcelConnection)로 현재 열린 Excel에 접근.
+sim.fake_excel의 가짜 연결을 넘기면 Windows 없이도 동작한다.
 컬럼 구조:
   A(0): 코드   B(1): 성명
   C(2): 고객(받음)   D(3): 기사(받음)
   E(4): 고객(걸음)   F(5): 기사(걸음)
   G(6): 합계(참고용, 사용 안 함)
 
-반환값: list[dict] - 파싱된 행 목록
-  {
-    "날짜": "2026-02-18",
-    "코드": "A001",
-    "성명": "홍길동",
-    "수신합계": 12,
-    "발신합계": 8,
-    "총합계": 20,
-  }
+반환값: DayBatch - 파싱된 행 목록 (modules.records)
+  CallRecord(date="2026-02-18", code="A001", name="홍길동", recv=12, sent=8, total=20)
+    수신합계 = C + D,  발신합계 = E + F,  총합계 = 수신합계 + 발신합계
 """
 import time
 from typing import Any
@@ -25,7 +20,12 @@ from loguru import logger
 from config import (
     COL_CODE, COL_NAME, COL_C, COL_D, COL_E, COL_F,
     EXCEL_HEADER_ROWS,
+    OFFICE_DIALOG_WAIT_SEC,
 )
+from modules import excel_com, office_dialogs
+from modules.excel_com import ExcelConnection
+from modules.records import CallRecord, DayBatch
+from modules.tracing import shared_tracer, traced
 
 
 def _safe_int(value: Any, cell_ref: str = "") -> int:
@@ -39,169 +39,175 @@ def _safe_int(value: Any, cell_ref: str = "") -> int:
         return 0
 
 
-def _get_excel_com():
+def _col_letter(col_0based: int) -> str:
+    return chr(ord("A") + col_0based)
+
+
+def _coerce_int_column(kept: list[tuple[int, Any]], col_0based: int) -> list[int]:
     """
-    현재 열린 Excel COM 인스턴스를 반환.
-    백그라운드 스레드 안전을 위해 pythoncom.CoInitialize() 포함.
+    한 컬럼 전체를 한 번에 int로 변환.
+    int/float는 바로 변환하고, 그 밖의 값만 _safe_int로 넘겨 셀 단위 WARN을 남긴다.
     """
-    try:
-        import pythoncom
-        pythoncom.CoInitialize()
-    except Exception:
-        pass
-
-    import win32com.client
-    try:
-        return win32com.client.GetActiveObject("Excel.Application")
-    except Exception as e:
-        raise RuntimeError(f"Excel COM 연결 실패: {e}")
+    letter = _col_letter(col_0based)
+    out: list[int] = []
+    append = out.append
+    for row_no, vals in kept:
+        v = vals[col_0based] if col_0based < len(vals) else None
+        t = type(v)
+        if t is float or t is int:
+            append(int(v))
+        elif v is None or v == "":
+            append(0)
+        else:
+            append(_safe_int(v, f"{letter}{row_no}"))
+    return out
+
+
+def build_rows(date_str: str, values, first_row: int = 1) -> DayBatch:
+    """
+    2차원 셀 값(행 시퀀스)을 파싱 결과 CallRecord 목록으로 변환.
+    Range.Value2 결과(tuple of tuple), 그리드 텍스트 등 모든 추출 경로에서 공통 사용.
 
+    Args:
+        date_str: 루프 날짜 (YYYY-MM-DD)
+        values: 행별 셀 값 시퀀스. 인덱스는 config의 COL_* (0-based) 기준.
+        first_row: values[0]의 행 번호 (경고 로그의 셀 위치 표시용)
 
-def _wait_for_excel(timeout_sec: float = 30.0) -> Any:
-    """
-    Excel이 완전히 로드될 때까지 대기.
-    ActiveWorkbook이 생길 때까지 폴링.
+    Returns:
+        parse_open_excel()과 동일한 형태의 행 목록.
     """
-    deadline = time.time() + timeout_sec
-    while time.time() < deadline:
+    # 1. 코드/성명 추출 + 스킵 판정
+    kept: list[tuple[int, Any]] = []
+    keys: list[tuple[str, str]] = []
+    skipped = 0
+
+    for offset, vals in enumerate(values):
+        row_no = first_row + offset
         try:
-            xl = _get_excel_com()
-            wb = xl.ActiveWorkbook
-            if wb is not None:
-                logger.debug("Excel ActiveWorkbook 확인됨")
-                return xl
-        except Exception:
-            pass
-        time.sleep(0.5)
-    raise TimeoutError(f"Excel이 {timeout_sec}초 내에 열리지 않았습니다.")
-
-
-def _click_close_in_window(win) -> bool:
-    """
-    win 하위에서 '닫기'가 포함된 Button을 찾아 클릭.
-    성공하면 True, 못 찾으면 False.
+            code = str((vals[COL_CODE] if COL_CODE < len(vals) else None) or "").strip()
+            name = str((vals[COL_NAME] if COL_NAME < len(vals) else None) or "").strip()
+        except Exception as e:
+            logger.warning(f"[{date_str}] 행 {row_no} 파싱 실패(스킵): {e}")
+            skipped += 1
+            continue
+
+        # 코드/성명이 모두 비어있으면 합계행 등 → 스킵
+        if not code and not name:
+            skipped += 1
+            continue
+
+        kept.append((row_no, vals))
+        keys.append((code, name))
+
+    # 2. C~F 컬럼 일괄 숫자 변환
+    col_c = _coerce_int_column(kept, COL_C)
+    col_d = _coerce_int_column(kept, COL_D)
+    col_e = _coerce_int_column(kept, COL_E)
+    col_f = _coerce_int_column(kept, COL_F)
+
+    # 3. 행 조립
+    rows = DayBatch(date_str)
+    append = rows.append
+    for (code, name), c, d, e, f in zip(keys, col_c, col_d, col_e, col_f):
+        수신합계 = c + d
+        발신합계 = e + f
+        append(CallRecord(date_str, code, name, 수신합계, 발신합계, 수신합계 + 발신합계))
+
+    if skipped:
+        logger.debug(f"[{date_str}] 빈 행 스킵 {skipped}행")
+    return rows
+
+
+# ── COM 호출 수 메트릭 ────────────────────────────────────────────────────────
+# parse_open_excel()이 시트 접근/범위 읽기에 사용한 COM 왕복 횟수 (_Counted 프록시로 실측)
+# 통합문서 열림 대기(wait_workbook)의 폴링은 포함하지 않는다. modules.metrics가 게시.
+_com_stats: dict[str, int] = {"last_parse": 0, "total": 0, "parses": 0}
+_PLAIN = (str, int, float, bool, tuple, type(None))
+
+
+class _Counted:
     """
-    try:
-        for btn in win.descendants(control_type="Button"):
-            try:
-                name = btn.window_text() or ""
-                if "닫기" in name or "Close" in name:
-                    btn.click_input()
-                    time.sleep(0.4)
-                    logger.info(f"인증 마법사 [닫기] 클릭 완료: '{name}'")
-                    return True
-            except Exception:
-                continue
-    except Exception:
-        pass
-    return False
-
-
-def _dismiss_office_activation_dialog(timeout_sec: float = 10.0) -> None:
+    COM 객체 프록시. 속성 읽기(값)와 메서드 호출을 각각 왕복 1회로 센다.
+    돌려받은 COM 객체도 같은 카운터로 감싼다 (값/튜플은 그대로).
     """
-    Excel 창을 전면으로 이동한 뒤 인증 마법사 다이얼로그를 닫는다.
 
-    Excel 프로세스 PID로 소속 창 전체를 열거하고
-    메인 Excel 창이 아닌 창에서 [닫기] 버튼을 찾아 클릭한다.
-    버튼을 찾지 못해도 키보드 입력은 보내지 않는다 (엉뚱한 창 오작동 방지).
-    """
-    try:
-        import win32process
-        from pywinauto import findwindows, Application
-
-        # 1. Excel 창 (메인) 탐색 및 전면 이동
-        xl_handles = findwindows.find_windows(title_re=r".*Excel.*")
-        if not xl_handles:
-            logger.debug("Excel 창 없음 - 인증 마법사 스킵")
-            return
-
-        xl_handle = xl_handles[0]
-        xl_app = Application(backend="uia").connect(handle=xl_handle)
-        xl_win = xl_app.window(handle=xl_handle)
-        xl_win.set_focus()
-        time.sleep(0.5)
-        logger.debug("Excel 창 전면 이동 완료")
-
-        # 2. Excel 프로세스 PID
-        _, excel_pid = win32process.GetWindowThreadProcessId(xl_handle)
-
-        # 3. 해당 PID 소속 창 전체 열거 → 메인 창 제외 = 다이얼로그 후보
-        deadline = time.time() + timeout_sec
-        while time.time() < deadline:
-            try:
-                all_wins = findwindows.find_windows(process=excel_pid)
-            except Exception:
-                all_wins = []
-
-            other_wins = [h for h in all_wins if h != xl_handle]
-
-            if not other_wins:
-                logger.debug("인증 마법사 없음 - 정상 진행")
-                return
-
-            for hwnd in other_wins:
-                try:
-                    dlg_app = Application(backend="uia").connect(handle=hwnd)
-                    dlg = dlg_app.window(handle=hwnd)
-                    dlg.set_focus()
-                    time.sleep(0.2)
-                    title = dlg.window_text() or "(제목없음)"
-                    logger.debug(f"  다이얼로그 발견: '{title}'")
-
-                    if _click_close_in_window(dlg):
-                        logger.info("인증 마법사 닫기 완료")
-                        time.sleep(0.5)
-                        return
-
-                    # 닫기 버튼 미발견 시 키보드 입력 없이 그냥 넘어감
-                    logger.debug(f"  닫기 버튼 미발견(스킵): '{title}'")
-                except Exception:
-                    continue
-
-            time.sleep(0.5)
-
-        logger.debug("인증 마법사 대기 타임아웃 - 정상 진행")
+    __slots__ = ("_obj", "_calls")
 
-    except Exception as e:
-        logger.debug(f"인증 마법사 처리 예외(무시): {e}")
+    def __init__(self, obj: Any, calls: list[int]) -> None:
+        self._obj = obj
+        self._calls = calls
 
+    def _wrap(self, value: Any) -> Any:
+        return value if isinstance(value, _PLAIN) else _Counted(value, self._calls)
 
-def parse_open_excel(date_str: str, timeout_sec: float = 30.0) -> list[dict]:
-    """
-    현재 열려있는 Excel ActiveSheet에서 데이터를 파싱한다.
+    def __getattr__(self, name: str) -> Any:
+        self._calls[0] += 1   # 거부(예외)된 접근도 왕복 1회
+        value = getattr(self._obj, name)
+        if callable(value):
+            self._calls[0] -= 1
+            return _Counted(value, self._calls)   # 메서드는 호출 시점에 센다
+        return self._wrap(value)
 
-    Args:
-        date_str: 루프 날짜 (YYYY-MM-DD). 엑셀 날짜값 무시하고 이 값 사용.
-        timeout_sec: Excel 인스턴스 대기 최대 시간(초).
+    def __call__(self, *args, **kwargs) -> Any:
+        self._calls[0] += 1
+        return self._wrap(self._obj(*args, **kwargs))
 
-    Returns:
-        파싱된 행 목록. 빈 시트면 [].
-    """
-    logger.info(f"[{date_str}] Excel 파싱 시작")
 
-    # 1. Excel 로드 대기
-    _wait_for_excel(timeout_sec)
+def _record_com_calls(n: int) -> None:
+    _com_stats["last_parse"] = n
+    _com_stats["total"] += n
+    _com_stats["parses"] += 1
+
 
-    # 2. 인증 마법사가 있으면 닫기
-    _dismiss_office_activation_dialog()
+def get_com_stats() -> dict[str, int]:
+    """COM 호출 수 통계 사본 (last_parse / total / parses)."""
+    return dict(_com_stats)
 
-    # 3. 인증 마법사 처리 후 fresh COM reference 재취득
+
+def _open_active_sheet(date_str: str, conn: ExcelConnection, calls: list[int]):
+    """ActiveSheet (호출 수를 calls에 세는 프록시). 실패 시 RuntimeError."""
     try:
-        xl = _get_excel_com()
+        xl = _Counted(conn.app(), calls)
     except Exception as e:
         raise RuntimeError(f"Excel COM 재연결 실패: {e}")
-
-    # 4. ActiveWorkbook / ActiveSheet 접근
     try:
         wb = xl.ActiveWorkbook
         if wb is None:
             raise RuntimeError("ActiveWorkbook이 None - 열린 통합문서가 없습니다.")
         ws = wb.ActiveSheet
         logger.debug(f"[{date_str}] 시트 접근 성공: '{ws.Name}'")
+        return ws
     except Exception as e:
         raise RuntimeError(f"ActiveSheet 접근 실패: {e}")
 
-    # 5. 사용된 마지막 행 파악
+
+def _parse_active_sheet(date_str: str, timeout_sec: float, conn: ExcelConnection) -> DayBatch:
+    calls = [0]
+    try:
+        return _read_active_sheet(date_str, timeout_sec, conn, calls)
+    finally:
+        _record_com_calls(calls[0])
+
+
+def _read_active_sheet(date_str: str, timeout_sec: float, conn: ExcelConnection,
+                       calls: list[int]) -> DayBatch:
+    # 2. 통합문서 열림 대기 (WorkbookOpen 이벤트 / Workbooks.Count - 같은 dispatch 재사용)
+    with shared_tracer.span("wait_workbook"):
+        conn.wait_workbook(timeout_sec)
+
+    # 3. ActiveWorkbook / ActiveSheet 접근
+    #    모달 다이얼로그가 떠 있으면 COM 호출이 거부되므로 감시 스레드 처리 후 한 번 재시도
+    try:
+        with shared_tracer.span("open_active_sheet", retry=0):
+            ws = _open_active_sheet(date_str, conn, calls)
+    except RuntimeError as e:
+        logger.debug(f"[{date_str}] {e} - 다이얼로그 처리 대기 후 재시도")
+        with shared_tracer.span("wait_office_dialogs"):
+            office_dialogs.shared_watcher.wait_clear(OFFICE_DIALOG_WAIT_SEC)
+        with shared_tracer.span("open_active_sheet", retry=1):
+            ws = _open_active_sheet(date_str, conn, calls)
+
+    # 4. 사용된 마지막 행 파악
     try:
         last_row = ws.UsedRange.Rows.Count
     except Exception as e:
@@ -211,61 +217,60 @@ def parse_open_excel(date_str: str, timeout_sec: float = 30.0) -> list[dict]:
 
     if last_row <= EXCEL_HEADER_ROWS:
         logger.warning(f"[{date_str}] 데이터 없음 (헤더만 존재, 총 {last_row}행)")
-        return []
+        return DayBatch(date_str)
 
-    # 6. 행 파싱
-    rows: list[dict] = []
-    skipped = 0
+    # 5. 데이터 블록 전체를 Range.Value2 한 번으로 읽기 (셀 단위 COM 왕복 제거)
+    first_row = EXCEL_HEADER_ROWS + 1
+    last_col = _col_letter(max(COL_CODE, COL_NAME, COL_C, COL_D, COL_E, COL_F))
+    try:
+        block = ws.Range(f"A{first_row}:{last_col}{last_row}").Value2
+    except Exception as e:
+        raise RuntimeError(f"Range.Value2 읽기 실패: {e}")
 
-    for row_idx in range(EXCEL_HEADER_ROWS + 1, last_row + 1):  # 1-based
-        try:
-            # ri=row_idx: 루프 변수 클로저 캡처 방지
-            def cell(col_0based: int, ri: int = row_idx) -> Any:
-                return ws.Cells(ri, col_0based + 1).Value  # COM은 1-based
-
-            code = str(cell(COL_CODE) or "").strip()
-            name = str(cell(COL_NAME) or "").strip()
-
-            # 코드/성명이 모두 비어있으면 합계행 등 → 스킵
-            if not code and not name:
-                skipped += 1
-                continue
-
-            col_c = _safe_int(cell(COL_C), f"C{row_idx}")
-            col_d = _safe_int(cell(COL_D), f"D{row_idx}")
-            col_e = _safe_int(cell(COL_E), f"E{row_idx}")
-            col_f = _safe_int(cell(COL_F), f"F{row_idx}")
-
-            수신합계 = col_c + col_d
-            발신합계 = col_e + col_f
-            총합계   = 수신합계 + 발신합계
-
-            rows.append({
-                "날짜":   date_str,
-                "코드":   code,
-                "성명":   name,
-                "수신합계": 수신합계,
-                "발신합계": 발신합계,
-                "총합계":  총합계,
-            })
+    # 단일 행이면 COM이 1차원 tuple을 돌려줄 수 있어 2차원으로 맞춘다
+    if block and not isinstance(block[0], tuple):
+        block = (block,)
 
-        except Exception as e:
-            logger.warning(f"[{date_str}] 행 {row_idx} 파싱 실패(스킵): {e}")
-            skipped += 1
-            continue
+    # 6. 일괄 변환 + 행 조립
+    rows = build_rows(date_str, block or (), first_row)
+    skipped = (last_row - EXCEL_HEADER_ROWS) - len(rows)
 
-    logger.info(f"[{date_str}] 파싱 완료 - {len(rows)}행 (스킵 {skipped}행)")
+    logger.info(
+        f"[{date_str}] 파싱 완료 - {len(rows)}행 (스킵 {skipped}행, COM 호출 {calls[0]}회)"
+    )
     return rows
 
 
-def close_excel_without_save() -> None:
+@traced()
+def parse_open_excel(date_str: str, timeout_sec: float = 30.0,
+                     conn: ExcelConnection | None = None) -> DayBatch:
+    """
+    현재 열려있는 Excel ActiveSheet에서 데이터를 파싱한다.
+
+    Args:
+        date_str: 루프 날짜 (YYYY-MM-DD). 엑셀 날짜값 무시하고 이 값 사용.
+        timeout_sec: Excel 인스턴스 대기 최대 시간(초).
+        conn: Excel 연결. None이면 excel_com.connection() (스레드당 하나).
+
+    Returns:
+        파싱된 행 목록. 빈 시트면 [].
+    """
+    logger.info(f"[{date_str}] Excel 파싱 시작")
+
+    # 1. 인증 마법사 등은 백그라운드 감시 스레드가 닫는다 (기다리지 않음)
+    office_dialogs.shared_watcher.ensure_running()
+    try:
+        return _parse_active_sheet(date_str, timeout_sec, conn or excel_com.connection())
+    finally:
+        office_dialogs.shared_watcher.end_date()
+
+
+@traced()
+def close_excel_without_save(conn: ExcelConnection | None = None) -> None:
     """열린 Excel을 저장 없이 닫는다."""
     try:
-        xl = _get_excel_com()
-        wb = xl.ActiveWorkbook
-        if wb:
-            wb.Close(SaveChanges=False)
-            logger.debug("Excel 닫기 완료 (저장 안 함)")
+        (conn or excel_com.connection()).close_active()
+        logger.debug("Excel 닫기 완료 (저장 안 함)")
     except Exception as e:
         logger.warning(f"Excel 닫기 실패(무시): {e}")
 
@@ -278,9 +283,42 @@ if __name__ == "__main__":
     setup_logger("TEST")
 
     test_date = "2026-02-18"
+
+    # python -m modules.excel_parser bench → Excel 없이 build_rows 벤치마크
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        import random
+        rng = random.Random(0)
+        for n in (300, 3000, 30000):
+            block = tuple(
+                (f"{1000 + i}", f"상담원{i}",
+                 float(rng.randint(0, 200)), None, float(rng.randint(0, 30)), "")
+                for i in range(n)
+            ) + ((None, None, None, None, None, 3428.0),)
+            t0 = time.perf_counter()
+            result = build_rows(test_date, block, EXCEL_HEADER_ROWS + 1)
+            elapsed = time.perf_counter() - t0
+            print(f"{n:>6}행: {elapsed * 1000:8.2f} ms ({len(result)}행)")
+        sys.exit(0)
+
+    # python -m modules.excel_parser fake → 가짜 Excel(sim.fake_excel)로 준비 감지 + 파싱
+    if len(sys.argv) > 1 and sys.argv[1] == "fake":
+        from sim.fake_excel import FakeExcelConnection
+        from sim.fake_uia import synthetic_grid
+
+        conn = FakeExcelConnection()
+        for delay in (0.0, 0.2, 0.7):
+            conn.open_workbook(synthetic_grid(300), delay_sec=delay)
+            t0 = time.perf_counter()
+            result = parse_open_excel(test_date, timeout_sec=5, conn=conn)
+            elapsed = time.perf_counter() - t0
+            close_excel_without_save(conn)
+            print(f"열림 지연 {delay:.1f}초 → 파싱 완료 {elapsed:.3f}초 ({len(result)}행, 연결 {conn.connects}회)")
+        sys.exit(0)
+
     try:
         result = parse_open_excel(test_date, timeout_sec=10)
         for r in result:
             print(r)
+        print(f"COM 호출: {get_com_stats()}")
     except Exception as ex:
         print(f"오류: {ex}")
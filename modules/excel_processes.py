@@ -0,0 +1,393 @@
+"""
+"엑셀로보기"가 띄운 Excel 프로세스의 수명 관리.
+
+close_excel_without_save는 통합문서만 닫으므로 Excel 프로세스가 남고,
+파싱 중 오류가 나면 다음 GetActiveObject가 엉뚱한(또는 응답 없는) 인스턴스에 붙는다.
+
+ExcelLifecycle:
+  clean_start()        실행 시작 시 이전 실행이 남긴 인스턴스(EXCEL_PID_REGISTRY 기록),
+                       응답 없는 인스턴스, 창 없는 고아 인스턴스를 종료.
+                       기록은 PID와 프로세스 생성 시각 쌍 - Windows는 PID를 재사용하므로
+                       생성 시각이 같을 때만 이전 실행 잔여로 본다.
+                       기록에 없는 사용자 Excel(창 있음, 응답 정상)은 건드리지 않는다.
+  before_export(conn)  내보내기 직전 Excel PID 스냅샷. 연결 중인 인스턴스가 사라졌으면 연결을 버리고,
+                       conn.spawned를 설정해 새 인스턴스가 뜨면 wait_workbook이 그쪽으로 재연결하게 한다
+  after_date(d, conn)  내보내기로 새로 생긴 PID를 기록하고
+                       - 응답 없음이 EXCEL_HUNG_DEADLINE_SEC 이상 지속 → 강제 종료
+                       - 재사용(EXCEL_REUSE_INSTANCE) 시 통합문서를 가진 인스턴스 하나만 남기고 종료
+                         (연결이 이전 인스턴스에 머물러 있으면 새 인스턴스를 남기고 연결을 버림)
+                       - 남긴 인스턴스의 메모리가 EXCEL_RSS_RECYCLE_MB 초과 → 종료 후 다음 날짜에 새로
+  report()             인스턴스별 상주 메모리(working set)와 사용 날짜 수
+
+Win32 호출(win32process/win32api/ctypes)은 함수 안에서만 가져오며,
+생성자에 대체 함수를 넘기면 Windows 없이도 동작한다.
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable
+from loguru import logger
+
+from config import (
+    EXCEL_PID_REGISTRY,
+    EXCEL_REUSE_INSTANCE,
+    EXCEL_HUNG_DEADLINE_SEC,
+    EXCEL_RSS_RECYCLE_MB,
+)
+
+_EXCEL_EXE = "excel.exe"
+_PROCESS_QUERY = 0x0400 | 0x0010   # PROCESS_QUERY_INFORMATION | PROCESS_VM_READ
+_PROCESS_TERMINATE = 0x0001
+
+
+# ── Win32 기본 구현 ──────────────────────────────────────────────────────────
+
+def _list_excel_pids() -> set[int]:
+    import win32api
+    import win32process
+
+    pids = set()
+    for pid in win32process.EnumProcesses():
+        try:
+            h = win32api.OpenProcess(_PROCESS_QUERY, False, pid)
+        except Exception:
+            continue
+        try:
+            if win32process.GetModuleFileNameEx(h, 0).lower().endswith(_EXCEL_EXE):
+                pids.add(pid)
+        except Exception:
+            pass
+        finally:
+            win32api.CloseHandle(h)
+    return pids
+
+
+def _rss_bytes(pid: int) -> int:
+    import win32api
+    import win32process
+
+    h = win32api.OpenProcess(_PROCESS_QUERY, False, pid)
+    try:
+        return int(win32process.GetProcessMemoryInfo(h)["WorkingSetSize"])
+    finally:
+        win32api.CloseHandle(h)
+
+
+def _created_at(pid: int) -> float:
+    """프로세스 생성 시각 (epoch 초). 같은 PID라도 재사용된 프로세스면 값이 다르다."""
+    import win32api
+    import win32process
+
+    h = win32api.OpenProcess(_PROCESS_QUERY, False, pid)
+    try:
+        created = win32process.GetProcessTimes(h)["CreationTime"]
+    finally:
+        win32api.CloseHandle(h)
+    return created.timestamp() if hasattr(created, "timestamp") else float(created)
+
+
+def _main_windows(pid: int) -> list[int]:
+    import win32gui
+    import win32process
+
+    found: list[int] = []
+
+    def collect(hwnd, _):
+        if win32gui.GetClassName(hwnd) == "XLMAIN" and win32process.GetWindowThreadProcessId(hwnd)[1] == pid:
+            found.append(hwnd)
+        return True
+
+    win32gui.EnumWindows(collect, None)
+    return found
+
+
+def _is_hung(pid: int) -> bool:
+    import ctypes
+
+    return any(ctypes.windll.user32.IsHungAppWindow(h) for h in _main_windows(pid))
+
+
+def _is_orphan(pid: int) -> bool:
+    """메인 창이 없거나 보이지 않는 인스턴스 (사용자가 쓰는 Excel이 아님)."""
+    import win32gui
+
+    return not any(win32gui.IsWindowVisible(h) for h in _main_windows(pid))
+
+
+def _kill(pid: int) -> None:
+    import win32api
+
+    h = win32api.OpenProcess(_PROCESS_TERMINATE, False, pid)
+    try:
+        win32api.TerminateProcess(h, 1)
+    finally:
+        win32api.CloseHandle(h)
+
+
+# ── 수명 관리자 ──────────────────────────────────────────────────────────────
+
+class ExcelLifecycle:
+    def __init__(
+        self,
+        list_pids: Callable[[], set[int]] = _list_excel_pids,
+        rss_bytes: Callable[[int], int] = _rss_bytes,
+        created_at: Callable[[int], float] = _created_at,
+        is_hung: Callable[[int], bool] = _is_hung,
+        is_orphan: Callable[[int], bool] = _is_orphan,
+        kill: Callable[[int], None] = _kill,
+        registry: Path = EXCEL_PID_REGISTRY,
+        reuse: bool = EXCEL_REUSE_INSTANCE,
+        hung_deadline_sec: float = EXCEL_HUNG_DEADLINE_SEC,
+        rss_recycle_mb: float = EXCEL_RSS_RECYCLE_MB,
+    ) -> None:
+        self._list = list_pids
+        self._rss = rss_bytes
+        self._created_at = created_at
+        self._is_hung = is_hung
+        self._is_orphan = is_orphan
+        self._kill = kill
+        self.registry = registry
+        self.reuse = reuse
+        self.hung_deadline_sec = hung_deadline_sec
+        self.rss_recycle_mb = rss_recycle_mb
+        self.owned: dict[int, dict] = {}      # pid → {"dates": n, "rss_mb": x, "created": t}
+        self._before: set[int] = set()
+        self._stats = {"spawned": 0, "killed": 0, "hung_killed": 0, "recycled": 0, "peak_rss_mb": 0.0}
+
+    # ── PID 기록 파일 ────────────────────────────────────────────────────────
+
+    def _save_registry(self) -> None:
+        """{pid: 생성 시각}을 같은 폴더 임시 파일에 쓴 뒤 교체 (원자적)."""
+        data = {str(pid): info["created"] for pid, info in sorted(self.owned.items())}
+        self.registry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.registry.with_name(f".{self.registry.name}.{os.getpid()}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write(json.dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.registry)
+
+    def _load_registry(self) -> dict[int, float | None]:
+        """pid → 기록된 생성 시각. 예전 형식(PID 목록)은 생성 시각을 몰라 None."""
+        try:
+            data = json.loads(self.registry.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+        if isinstance(data, list):
+            return {int(pid): None for pid in data}
+        return {int(pid): created for pid, created in data.items()}
+
+    def _creation_matches(self, pid: int, recorded: float | None) -> bool:
+        """기록된 생성 시각과 현재 프로세스 생성 시각이 같은지 (확인 불가면 False)."""
+        if recorded is None:
+            return False
+        try:
+            return self._created_at(pid) == recorded
+        except Exception:
+            return False
+
+    # ── 종료 ─────────────────────────────────────────────────────────────────
+
+    def _terminate(self, pid: int, reason: str) -> None:
+        try:
+            self._kill(pid)
+            self._stats["killed"] += 1
+            logger.info(f"Excel 프로세스 종료 (pid={pid}, {reason})")
+        except Exception as e:
+            logger.warning(f"Excel 프로세스 종료 실패 (pid={pid}): {e}")
+        self.owned.pop(pid, None)
+
+    def _hung_past_deadline(self, pid: int) -> bool:
+        """응답 없음이 deadline 동안 이어지는지 확인 (회복하면 False)."""
+        deadline = time.monotonic() + self.hung_deadline_sec
+        while self._is_hung(pid):
+            if time.monotonic() >= deadline:
+                return True
+            time.sleep(min(1.0, self.hung_deadline_sec))
+        return False
+
+    # ── 공개 인터페이스 ──────────────────────────────────────────────────────
+
+    def clean_start(self) -> None:
+        """이전 실행 잔여/응답 없음/고아 Excel 인스턴스 정리."""
+        try:
+            alive = self._list()
+        except Exception as e:
+            logger.debug(f"Excel 프로세스 정리 불가: {e}")
+            return
+        previous = self._load_registry()
+        for pid in sorted(alive):
+            reason = None
+            try:
+                if pid in previous and self._creation_matches(pid, previous[pid]):
+                    reason = "이전 실행 잔여"
+                elif self._is_hung(pid):
+                    reason = "응답 없음"
+                elif self._is_orphan(pid):
+                    reason = "창 없는 고아"
+            except Exception:
+                continue
+            if reason:
+                self._terminate(pid, reason)
+            else:
+                logger.debug(f"  사용자 Excel 유지 (pid={pid})")
+        self.owned.clear()
+        self._save_registry()
+
+    def _spawned(self) -> set[int]:
+        """before_export 이후 새로 생긴 Excel PID."""
+        return self._list() - self._before
+
+    def before_export(self, conn=None) -> None:
+        try:
+            self._before = self._list()
+        except Exception:
+            self._before = set()
+            return
+        if conn is None:
+            return
+        try:
+            current = conn.pid()
+        except Exception:
+            current = None
+        if current is not None and current not in self._before:
+            logger.debug(f"연결 중인 Excel(pid={current})이 종료됨 - 연결 재설정")
+            conn.reset()
+        conn.spawned = self._spawned
+
+    def after_date(self, date_str: str, conn=None) -> None:
+        """날짜 하나의 Excel 처리 후 호출 (파싱 실패 시에도)."""
+        if conn is not None:
+            conn.spawned = None
+        try:
+            alive = self._list()
+        except Exception as e:
+            logger.debug(f"Excel 프로세스 확인 불가: {e}")
+            return
+
+        fresh = alive - self._before
+        for pid in fresh - self.owned.keys():
+            try:
+                created = self._created_at(pid)
+            except Exception:
+                created = None
+            self.owned[pid] = {"dates": 0, "rss_mb": 0.0, "created": created}
+            self._stats["spawned"] += 1
+            logger.debug(f"[{date_str}] 내보내기로 생긴 Excel pid={pid}")
+        for pid in list(self.owned):
+            if pid not in alive:
+                self.owned.pop(pid)
+
+        keep = None
+        if conn is not None:
+            try:
+                keep = conn.pid()
+            except Exception:
+                keep = None
+        # 이번 내보내기가 새 인스턴스에 열렸는데 연결은 이전 인스턴스에 머물러 있으면
+        # 통합문서를 가진 쪽은 새 인스턴스 - 그것을 남기고 이전 연결은 버린다
+        if fresh and keep not in fresh:
+            if keep is not None:
+                logger.info(f"[{date_str}] 통합문서가 새 Excel(pid={sorted(fresh)})에 열림 "
+                            f"- 연결 중 pid={keep} 연결 재설정")
+                conn.reset()
+            active = fresh
+        else:
+            active = {keep} if keep is not None else set()
+
+        for pid in list(self.owned):
+            info = self.owned[pid]
+            if pid in active:
+                info["dates"] += 1
+            if self._is_hung(pid) and self._hung_past_deadline(pid):
+                self._stats["hung_killed"] += 1
+                self._terminate(pid, f"응답 없음 {self.hung_deadline_sec:g}초 초과")
+                if pid == keep and conn is not None:
+                    conn.reset()
+                continue
+            if not self.reuse or (active and pid not in active):
+                self._terminate(pid, "재사용 대상 아님")
+                if pid == keep and conn is not None:
+                    conn.reset()
+                continue
+            try:
+                info["rss_mb"] = round(self._rss(pid) / 2**20, 1)
+            except Exception:
+                continue
+            self._stats["peak_rss_mb"] = max(self._stats["peak_rss_mb"], info["rss_mb"])
+            if info["rss_mb"] > self.rss_recycle_mb:
+                self._stats["recycled"] += 1
+                self._terminate(pid, f"메모리 {info['rss_mb']:.0f}MB > {self.rss_recycle_mb:g}MB")
+                if pid == keep and conn is not None:
+                    conn.reset()
+
+        self._save_registry()
+        if self.owned:
+            logger.debug(f"[{date_str}] Excel 인스턴스: {self.report()}")
+
+    def report(self) -> str:
+        if not self.owned:
+            return "관리 중인 Excel 없음"
+        return ", ".join(
+            f"pid={pid} {info['rss_mb']:.0f}MB/{info['dates']}일" for pid, info in sorted(self.owned.items())
+        )
+
+    def stats(self) -> dict:
+        return dict(self._stats, instances=len(self.owned))
+
+
+shared_lifecycle = ExcelLifecycle()
+
+
+# ── 단독 실행 테스트 (가짜 프로세스 테이블) ───────────────────────────────────
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
+    procs = {10: {"rss": 80 << 20, "hung": False, "orphan": False, "created": 5.0},   # 사용자 Excel (PID 재사용)
+             11: {"rss": 90 << 20, "hung": False, "orphan": True, "created": 2.0},    # 지난 실행 고아
+             12: {"rss": 95 << 20, "hung": False, "orphan": False, "created": 3.0}}   # 지난 실행 잔여 (창 있음)
+    next_pid = [100]
+
+    class _Conn:
+        current = None
+        spawned = None
+
+        def pid(self):
+            return self.current
+
+        def reset(self):
+            self.current = None
+
+    lc = ExcelLifecycle(
+        list_pids=lambda: set(procs),
+        rss_bytes=lambda p: procs[p]["rss"],
+        created_at=lambda p: procs[p]["created"],
+        is_hung=lambda p: procs[p]["hung"],
+        is_orphan=lambda p: procs[p]["orphan"],
+        kill=lambda p: procs.pop(p),
+        registry=Path(tempfile.mkdtemp()) / "excel_pids.json",
+        hung_deadline_sec=0.05, rss_recycle_mb=400,
+    )
+    # 지난 실행 기록: pid 10은 생성 시각이 달라 (다른 프로세스가 PID 재사용) 유지, pid 12는 종료
+    lc.registry.write_text(json.dumps({"10": 1.0, "12": 3.0}), encoding="utf-8")
+    conn = _Conn()
+    lc.clean_start()
+    print(f"정리 후: 전체 pid {sorted(procs)}")
+    for day in range(1, 9):
+        lc.before_export(conn)
+        if conn.current is None or day == 4:   # 4일차: 로지가 새 인스턴스를 또 띄움 (연결은 이전 것에 머묾)
+            pid = next_pid[0]
+            next_pid[0] += 1
+            procs[pid] = {"rss": 150 << 20, "hung": False, "orphan": False, "created": 100.0 + day}
+            if day != 4:
+                conn.current = pid
+        procs[conn.current if day != 4 else pid]["rss"] += 60 << 20
+        if day == 6:
+            procs[conn.current]["hung"] = True
+        lc.after_date(f"2026-02-{day:02d}", conn)
+        print(f"{day}일차: {lc.report()}  | 전체 pid {sorted(procs)}")
+    print(lc.stats())
+    print(f"PID 기록: {lc.registry.read_text(encoding='utf-8')}")
@@ -0,0 +1,124 @@
+"""
+Report 그리드(aid 1780) 클립보드 복사 → TSV 파싱 추출 백엔드.
+
+그리드에서 Ctrl+A, Ctrl+C로 전체 행을 탭 구분 텍스트로 복사한 뒤
+문자열 하나를 파싱한다. Excel 실행이나 셀 단위 UIA 왕복이 없다.
+
+  parse_tsv(date_str, text)   순수 Python. 헤더행/합계행 제거 후 excel_parser.build_rows
+                              (COL_* 매핑, 코드·성명 모두 빈 행 스킵 규칙 공통)
+  copy_grid_text(grid, waits) Windows 클립보드 사용 (win32clipboard). 기존 텍스트는 복원.
+"""
+import csv
+import io
+import time
+from loguru import logger
+
+from config import COL_CODE, COL_NAME, GRID_TOTAL_ROW_LABEL
+from modules.excel_parser import build_rows
+from modules.records import DayBatch
+
+_HEADER_CODE_LABEL = "코드"     # 그리드 첫 컬럼 헤더 (헤더 포함 복사 시 제거)
+_CLIPBOARD_OPEN_RETRIES = 10
+
+
+def _is_header(vals: list[str]) -> bool:
+    return len(vals) > COL_CODE and vals[COL_CODE].strip() == _HEADER_CODE_LABEL
+
+
+def _is_total(vals: list[str]) -> bool:
+    code = vals[COL_CODE].strip() if len(vals) > COL_CODE else ""
+    name = vals[COL_NAME].strip() if len(vals) > COL_NAME else ""
+    return not code and name == GRID_TOTAL_ROW_LABEL
+
+
+def parse_tsv(date_str: str, text: str) -> DayBatch:
+    """
+    클립보드 TSV 텍스트 → parse_open_excel()과 동일한 형태의 행 목록.
+    따옴표로 감싼 셀(탭/줄바꿈 포함)도 처리한다.
+    """
+    values = [
+        vals for vals in csv.reader(io.StringIO(text), delimiter="\t")
+        if vals and not _is_header(vals) and not _is_total(vals)
+    ]
+    return build_rows(date_str, values)
+
+
+# ── Windows 클립보드 ─────────────────────────────────────────────────────────
+
+def _open_clipboard() -> None:
+    import win32clipboard
+
+    for _ in range(_CLIPBOARD_OPEN_RETRIES):
+        try:
+            win32clipboard.OpenClipboard()
+            return
+        except Exception:
+            time.sleep(0.05)   # 다른 프로그램이 잠시 점유 중
+    win32clipboard.OpenClipboard()
+
+
+def _read_text() -> str | None:
+    import win32clipboard
+
+    _open_clipboard()
+    try:
+        if win32clipboard.IsClipboardFormatAvailable(win32clipboard.CF_UNICODETEXT):
+            return win32clipboard.GetClipboardData(win32clipboard.CF_UNICODETEXT)
+        return None
+    finally:
+        win32clipboard.CloseClipboard()
+
+
+def _write_text(text: str) -> None:
+    import win32clipboard
+
+    _open_clipboard()
+    try:
+        win32clipboard.EmptyClipboard()
+        win32clipboard.SetClipboardData(win32clipboard.CF_UNICODETEXT, text)
+    finally:
+        win32clipboard.CloseClipboard()
+
+
+def copy_grid_text(grid, waits) -> str:
+    """
+    그리드 전체 선택 후 복사한 텍스트를 반환. 복사 완료는 클립보드 시퀀스 번호 변화로 감지.
+    작업자가 쓰던 클립보드 텍스트는 읽은 뒤 되돌려 놓는다.
+    """
+    import win32clipboard
+
+    previous = _read_text()
+    seq0 = win32clipboard.GetClipboardSequenceNumber()
+
+    grid.set_focus()
+    grid.type_keys("^a^c", set_foreground=False)
+    if not waits.wait_until(
+        "clipboard.copy",
+        lambda: win32clipboard.GetClipboardSequenceNumber() != seq0,
+        legacy=1.0, ceiling=10,
+    ):
+        raise RuntimeError("그리드 클립보드 복사 감지 실패")
+
+    text = _read_text() or ""
+    if previous is not None:
+        try:
+            _write_text(previous)
+        except Exception as e:
+            logger.debug(f"클립보드 복원 실패(무시): {e}")
+    return text
+
+
+# ── 단독 실행 테스트 (합성 TSV 파싱 벤치마크) ─────────────────────────────────
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, str(__import__("pathlib").Path(__file__).parent.parent))
+    from sim.fake_uia import GRID_COLUMNS, synthetic_grid
+
+    for n_agents in (300, 3000, 30000, 300000):
+        data = synthetic_grid(n_agents)
+        text = "\r\n".join("\t".join(r) for r in [GRID_COLUMNS] + data) + "\r\n"
+        t0 = time.perf_counter()
+        rows = parse_tsv("2026-02-18", text)
+        elapsed = time.perf_counter() - t0
+        assert len(rows) == n_agents, (len(rows), n_agents)
+        print(f"{n_agents:>7}행 ({len(text) / 1e6:5.1f} MB): {elapsed * 1000:8.1f} ms")
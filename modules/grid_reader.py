@@ -0,0 +1,258 @@
+"""
+로지 Report 그리드(Table, aid='1780')를 UIA 트리에서 직접 읽는다.
+
+"엑셀로보기" → Excel 실행 → COM 파싱 경로를 대체하는 추출 백엔드.
+그리드 구조 (debug_controls_output.txt):
+  [Table] name='Report' aid='1780'
+    [Thumb]
+    [Header] name='Report Header'
+    [Custom] name='Report Row'
+      [DataItem] 코드 / 성명 / 고객(받음) / 기사(받음) / 고객(걸음) / 기사(걸음) / 합계(건)
+    ...
+    [Custom] name='Report Row'   ← 맨 아래 합계행 (코드 없음, 성명='합계')
+
+그리드는 가상화되어 화면에 보이는 행만 UIA 트리에 노출되므로
+맨 위로 스크롤 → 보이는 행 수집 → 한 페이지 아래로 스크롤을 반복한다.
+
+조회 완료 감지(wait_for_refresh)도 여기서 담당한다. 조회 직전 그리드 지문
+(보이는 행 수, 스크롤 뷰 비율, 첫 행, 마지막 보이는 행)을 잡아 두고, 클릭 후
+지문이 바뀌어 LOGI_QUERY_STABLE_SEC 동안 유지되면 완료로 본다.
+폴링 간격은 LOGI_POLL_FAST_SEC에서 시작해 LOGI_POLL_INTERVAL_SEC까지 늘린다.
+
+pywinauto에 의존하지 않으므로 sim.fake_uia의 가짜 트리로도 동작한다.
+"""
+import time
+from loguru import logger
+
+from config import (
+    COL_CODE, COL_NAME,
+    GRID_TOTAL_ROW_LABEL,
+    GRID_SCROLL_MAX_PAGES,
+    LOGI_QUERY_WAIT_SEC,
+    LOGI_QUERY_STABLE_SEC,
+    LOGI_POLL_FAST_SEC,
+    LOGI_POLL_INTERVAL_SEC,
+    LOGI_POLL_MAX_SEC,
+)
+from modules.excel_parser import build_rows
+from modules.records import DayBatch
+
+_ROW_CONTROL_TYPE  = "Custom"     # 'Report Row'
+_CELL_CONTROL_TYPE = "DataItem"
+_SCROLL_NO_CHANGE  = -1           # UIA_ScrollPatternNoScroll
+_SCROLL_SETTLE_SEC = 0.05         # 스크롤 후 트리 갱신 대기
+
+
+def _read_visible_rows(table) -> list[list[str]]:
+    """현재 화면에 보이는 Report Row들의 셀 텍스트 목록."""
+    result: list[list[str]] = []
+    for row in table.children(control_type=_ROW_CONTROL_TYPE):
+        try:
+            cells = row.children(control_type=_CELL_CONTROL_TYPE)
+            result.append([(c.window_text() or "") for c in cells])
+        except Exception as e:
+            logger.debug(f"  그리드 행 읽기 실패(스킵): {e}")
+    return result
+
+
+def _scroll_percent(table) -> float | None:
+    """세로 스크롤 위치(0~100). ScrollPattern 미지원 시 None."""
+    try:
+        pct = table.iface_scroll.CurrentVerticalScrollPercent
+        return None if pct < 0 else float(pct)
+    except Exception:
+        return None
+
+
+def _scroll_to_top(table) -> None:
+    try:
+        table.iface_scroll.SetScrollPercent(_SCROLL_NO_CHANGE, 0)
+        time.sleep(_SCROLL_SETTLE_SEC)
+    except Exception as e:
+        logger.debug(f"  그리드 맨 위 스크롤 실패(무시): {e}")
+
+
+def _scroll_page_down(table) -> bool:
+    """한 페이지 아래로 스크롤. 실패하면 False."""
+    try:
+        table.scroll("down", "page")
+        time.sleep(_SCROLL_SETTLE_SEC)
+        return True
+    except Exception as e:
+        logger.debug(f"  그리드 스크롤 실패: {e}")
+        return False
+
+
+def _is_total_row(vals: list[str]) -> bool:
+    code = vals[COL_CODE].strip() if len(vals) > COL_CODE else ""
+    name = vals[COL_NAME].strip() if len(vals) > COL_NAME else ""
+    return not code and name == GRID_TOTAL_ROW_LABEL
+
+
+def walk_grid(table, max_pages: int = GRID_SCROLL_MAX_PAGES) -> list[list[str]]:
+    """
+    가상화된 그리드 전체를 스크롤하며 모든 행의 셀 텍스트를 수집.
+
+    페이지 간 겹치는 행은 (코드, 성명) 키로 제거한다.
+    스크롤 위치가 100%에 도달하거나, 스크롤 후 새 행이 없으면 종료.
+    ScrollPattern으로 위치를 알 수 없으면 경고 후 새 행이 없을 때까지 페이지 스크롤만으로 진행.
+    """
+    _scroll_to_top(table)
+
+    collected: list[list[str]] = []
+    seen: set[tuple] = set()
+    no_pattern = False
+
+    for page in range(max_pages):
+        added = 0
+        for vals in _read_visible_rows(table):
+            key = tuple(v.strip() for v in vals[:max(COL_CODE, COL_NAME) + 1])
+            if key in seen:
+                continue
+            seen.add(key)
+            collected.append(vals)
+            added += 1
+
+        pct = _scroll_percent(table)
+        if pct is None:
+            if not no_pattern:
+                logger.warning("  그리드 스크롤 위치 확인 불가(ScrollPattern 없음) - 새 행이 없을 때까지 스크롤")
+                no_pattern = True
+        elif pct >= 100.0:
+            break
+        if page > 0 and added == 0:
+            break
+        if not _scroll_page_down(table):
+            break
+    else:
+        logger.warning(f"  그리드 스크롤 최대 페이지({max_pages}) 도달 - 일부 행 누락 가능")
+
+    return [vals for vals in collected if not _is_total_row(vals)]
+
+
+def _row_texts(row) -> tuple:
+    return tuple((c.window_text() or "") for c in row.children(control_type=_CELL_CONTROL_TYPE))
+
+
+def grid_fingerprint(table) -> tuple:
+    """
+    그리드 내용 지문: (보이는 행 수, 스크롤 뷰 비율, 첫 행 셀, 마지막 보이는 행 셀).
+    셀 텍스트는 첫/마지막 행만 읽으므로 UIA 호출이 행 수와 무관하게 적다.
+    """
+    rows = table.children(control_type=_ROW_CONTROL_TYPE)
+    try:
+        view = round(float(table.iface_scroll.CurrentVerticalViewSize), 2)
+    except Exception:
+        view = None
+    if not rows:
+        return (0, view, (), ())
+    return (len(rows), view, _row_texts(rows[0]), _row_texts(rows[-1]))
+
+
+def wait_for_refresh(
+    get_table,
+    before: tuple | None,
+    timeout: float = LOGI_POLL_MAX_SEC,
+    stable_sec: float = LOGI_QUERY_STABLE_SEC,
+    same_grace_sec: float = LOGI_QUERY_WAIT_SEC,
+    fast_sec: float = LOGI_POLL_FAST_SEC,
+    slow_sec: float = LOGI_POLL_INTERVAL_SEC,
+) -> tuple[float, tuple | None]:
+    """
+    조회 클릭 후 그리드가 새 결과로 바뀌고 안정될 때까지 대기.
+
+    Args:
+        get_table: 그리드 wrapper를 반환하는 함수 (읽기 실패 시 다시 호출)
+        before: 조회 직전 grid_fingerprint() (= 이전 날짜 결과)
+
+    완료 판정:
+      - 지문이 before와 다르고 비어 있지 않으며 stable_sec 동안 유지
+      - 지문이 before와 같거나 비어 있으면 (같은 결과/0행 날짜)
+        same_grace_sec 동안 변화가 없을 때 확정
+    Returns:
+        (클릭 후 경과 초, 최종 지문). 타임아웃이면 경고 후 마지막 지문 반환.
+    """
+    t0 = time.perf_counter()
+    table = None
+    last: tuple | None = None
+    since = t0
+    interval = fast_sec
+
+    while True:
+        try:
+            if table is None:
+                table = get_table()
+            fp = grid_fingerprint(table)
+        except Exception as e:
+            logger.debug(f"  그리드 지문 읽기 실패(재탐색): {e}")
+            table, fp = None, None
+
+        now = time.perf_counter()
+        if fp is not None:
+            if fp != last:
+                last, since = fp, now
+                interval = fast_sec
+            else:
+                settled = now - since
+                fresh = fp != before and fp[0] > 0
+                if settled >= (stable_sec if fresh else same_grace_sec):
+                    if not fresh:
+                        logger.debug("  조회 결과가 이전 날짜와 같거나 비어 있음 - 유예 후 완료 처리")
+                    return now - t0, fp
+
+        if now - t0 >= timeout:
+            logger.warning("조회 완료 감지 타임아웃 - 강제 진행")
+            return now - t0, last
+
+        time.sleep(interval)
+        interval = min(slow_sec, interval * 1.5)
+
+
+def read_grid_rows(table, date_str: str) -> DayBatch:
+    """
+    Report 그리드에서 해당 날짜의 파싱 결과를 반환.
+
+    Returns:
+        excel_parser.parse_open_excel()과 동일한 형태의 행 목록.
+    """
+    t0 = time.perf_counter()
+    values = walk_grid(table)
+    rows = build_rows(date_str, values)
+    logger.info(
+        f"[{date_str}] 그리드 읽기 완료 - {len(rows)}행 "
+        f"({time.perf_counter() - t0:.2f}초)"
+    )
+    return rows
+
+
+# ── 단독 실행 테스트 (가짜 UIA 트리 벤치마크) ─────────────────────────────────
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, str(__import__("pathlib").Path(__file__).parent.parent))
+    from utils.logger import setup_logger
+    from sim.fake_uia import build_logi_tree, synthetic_grid
+
+    setup_logger("TEST")
+
+    if len(sys.argv) > 1 and sys.argv[1] == "refresh":
+        # 조회 완료 감지: 그리드가 0.3초 뒤 새 결과로 바뀌는 상황
+        import threading
+        root = build_logi_tree(synthetic_grid(300, seed=1))
+        table = root.child_window(auto_id="1780", control_type="Table")
+        for seed, delay in ((2, 0.3), (3, 0.8), (1, 0.0)):
+            before = grid_fingerprint(table)
+            new_data = synthetic_grid(300, seed=seed)
+            threading.Timer(delay, table.set_data, args=(new_data,)).start()
+            elapsed, fp = wait_for_refresh(lambda: table, before)
+            print(f"갱신 {delay:.1f}초 후 → 완료 감지 {elapsed:.2f}초 ({fp[0]}행 표시)")
+        sys.exit(0)
+
+    for n_agents in (40, 300, 3000):
+        data = synthetic_grid(n_agents)
+        root = build_logi_tree(data)
+        table = root.child_window(auto_id="1780", control_type="Table")
+        t0 = time.perf_counter()
+        result = read_grid_rows(table, "2026-02-18")
+        elapsed = time.perf_counter() - t0
+        assert len(result) == n_agents, (len(result), n_agents)
+        print(f"{n_agents:>5}명: {elapsed * 1000:8.1f} ms  (스크롤 {table.scroll_calls}회)")
@@ -0,0 +1,55 @@
+"""
+단계별 지연 시간 히스토그램.
+
+날짜마다 측정한 소요 시간(초)을 모아 실행 종료 시 분포를 로그로 남긴다.
+    hist = LatencyHistogram("조회 완료")
+    hist.add(0.42)
+    logger.info(hist.summary())
+"""
+import bisect
+
+_DEFAULT_EDGES = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """q(0~100) 백분위수 (최근접 순위). 표본이 없으면 0."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(q / 100.0 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+class LatencyHistogram:
+    def __init__(self, name: str, edges: tuple[float, ...] = _DEFAULT_EDGES) -> None:
+        self.name = name
+        self.edges = tuple(edges)
+        self.counts = [0] * (len(self.edges) + 1)   # 마지막 칸 = 상한 초과
+        self.samples: list[float] = []
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.counts[bisect.bisect_left(self.edges, seconds)] += 1
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def percentile(self, q: float) -> float:
+        return percentile(self.samples, q)
+
+    def summary(self) -> str:
+        """한 줄 요약 + 구간별 건수. 예: '조회 완료 n=28 p50=0.41s p95=0.88s max=1.20s | ≤0.5s:20 ≤1s:7 ≤2s:1'"""
+        if not self.samples:
+            return f"{self.name} n=0"
+        head = (
+            f"{self.name} n={len(self.samples)} "
+            f"p50={self.percentile(50):.2f}s p95={self.percentile(95):.2f}s "
+            f"max={max(self.samples):.2f}s"
+        )
+        buckets = []
+        for i, n in enumerate(self.counts):
+            if not n:
+                continue
+            label = f"≤{self.edges[i]:g}s" if i < len(self.edges) else f">{self.edges[-1]:g}s"
+            buckets.append(f"{label}:{n}")
+        return f"{head} | {' '.join(buckets)}"
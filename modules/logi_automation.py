@@ -9,27 +9,33 @@
   - 조회 버튼: "조회(V)"
   - 엑셀 내보내기: 그리드 우클릭 → "엑셀로보기"
   - 실행 파일: C:\\SmartD2\\update.exe
+
+pywinauto는 함수 안에서만 가져온다 (sim.fake_logi로 Windows 없이 실행 가능).
 """
+import re
 import subprocess
 import time
 from datetime import date, timedelta
 from loguru import logger
-from pywinauto import Application, findwindows
-from pywinauto.keyboard import send_keys
 
 from config import (
     LOGI_WINDOW_TITLE_RE,
     LOGI_MENU_EMPLOYEE,
     LOGI_SCREEN_NAME,
-    LOGI_QUERY_WAIT_SEC,
-    LOGI_POLL_INTERVAL_SEC,
-    LOGI_POLL_MAX_SEC,
     CHECKBOX_LABEL,
     CHECKBOX_TARGET_STATE,
     PERIOD_FMT,
 )
+from modules import grid_clipboard, grid_reader
+from modules.control_cache import ControlCache
+from modules.latency import LatencyHistogram
+from modules.wait_profile import WaitEngine
+from modules.date_input import DateInput
+from modules.records import DayBatch
+from modules.tracing import shared_tracer, traced
 
 LOGI_EXEC_PATH  = r"C:\SmartD2\update.exe"
+# 기존 고정 대기(초) - 이제 WaitEngine의 준비 조건 대기로 대체되며 절약 시간 보고 기준으로만 쓰인다
 LOGIN_WAIT_SEC  = 12    # 로그인 후 메인 화면 로드 대기
 MENU_WAIT_SEC   = 1.5   # 메뉴 클릭 후 화면 전환 대기
 
@@ -38,15 +44,58 @@ MENU_WAIT_SEC   = 1.5   # 메뉴 클릭 후 화면 전환 대기
 # 내부 헬퍼
 # ─────────────────────────────────────────────────────────────────────────────
 
+_logi_handle: int | None = None   # 마지막으로 찾은 로지 메인 창 핸들
+
+
 def _find_logi_handles() -> list:
+    """
+    로지 메인 창 핸들 목록. 직전에 찾은 핸들이 아직 유효하고 제목이 맞으면
+    최상위 창 전체를 정규식으로 훑지 않고 그대로 반환한다.
+    """
+    from pywinauto import findwindows, handleprops
+
+    global _logi_handle
+    h = _logi_handle
     try:
-        return findwindows.find_windows(title_re=LOGI_WINDOW_TITLE_RE)
+        if h and handleprops.iswindow(h) and re.match(LOGI_WINDOW_TITLE_RE, handleprops.text(h) or ""):
+            return [h]
     except Exception:
-        return []
+        pass
+    try:
+        handles = findwindows.find_windows(title_re=LOGI_WINDOW_TITLE_RE)
+    except Exception:
+        handles = []
+    _logi_handle = handles[0] if handles else None
+    return handles
+
 
+def _find_main_handle() -> int | None:
+    """
+    상단 메뉴(LOGI_MENU_EMPLOYEE)가 있는 로지 창 핸들. 없으면 None.
+    로그인 창도 LOGI_WINDOW_TITLE_RE에 맞으므로 창 존재만으로는 로그인 완료를 알 수 없다.
+    """
+    from pywinauto import Desktop, findwindows
+
+    global _logi_handle
+    try:
+        handles = findwindows.find_windows(title_re=LOGI_WINDOW_TITLE_RE)
+    except Exception:
+        return None
+    for h in handles:
+        try:
+            win = Desktop(backend="uia").window(handle=h)
+            if win.child_window(title=LOGI_MENU_EMPLOYEE, control_type="MenuItem").exists(timeout=0):
+                _logi_handle = h
+                return h
+        except Exception:
+            continue
+    return None
+
+
+def _connect_or_start():
+    """이미 실행 중인 로지에 연결하거나, 없으면 실행 후 연결. pywinauto Application 반환."""
+    from pywinauto import Application
 
-def _connect_or_start() -> Application:
-    """이미 실행 중인 로지에 연결하거나, 없으면 실행 후 연결."""
     handles = _find_logi_handles()
     if handles:
         logger.debug("기존 로지 창에 연결")
@@ -81,43 +130,27 @@ _AID_DATE_END   = "1206"
 _AID_TABLE      = "1780"
 
 
-def _set_datetime_field(win, field_index: int, value: str) -> None:
+def _set_datetime_field(controls: ControlCache, field_index: int, value: str,
+                        date_input: DateInput) -> None:
     """
     기간 입력 Pane 컨트롤에 값 세팅. (D10)
-    DevExpress DateTimePicker는 파트별 순서대로 입력해야 함:
-      클릭 → 년도 입력 → 월 입력 → 일 입력 → 시간 입력 → Enter
-    (각 파트 입력 후 커서가 자동으로 다음 파트로 이동함)
+    ValuePattern/DTM 메시지로 직접 쓰고, 안 되면 파트별 키 입력 (modules.date_input).
+    표시 값이 다르거나 입력에 실패하면 컨트롤을 다시 찾아 한 번 재시도.
 
     value 형식: "YYYY-MM-DD HH:MM"  (예: "2026-02-01 00:00")
     """
     aid = _AID_DATE_START if field_index == 0 else _AID_DATE_END
+    name = f"date{field_index}"
 
-    # "2026-02-01 00:00" → year="2026", month="02", day="01", hour="00"
-    date_part, time_part = value.split(" ")
-    year, month, day = date_part.split("-")
-    hour = time_part[:2]
-
-    try:
-        ctrl = win.child_window(auto_id=aid)
-        ctrl.click_input()
-        time.sleep(0.3)
-
-        # 년도 → 월 → 일 → 시간 순서로 각 파트를 개별 입력
-        send_keys(year)
-        time.sleep(0.15)
-        send_keys(month)
-        time.sleep(0.15)
-        send_keys(day)
-        time.sleep(0.15)
-        send_keys(hour)
-        time.sleep(0.15)
-        send_keys("{ENTER}")
-        time.sleep(0.2)
-
-        logger.info(f"  기간 필드[{field_index}] 입력 완료 (aid={aid}): {value}")
-        return
-    except Exception as e:
-        logger.warning(f"  기간 필드[{field_index}] 입력 실패: {e}")
+    for attempt in range(2):
+        try:
+            with shared_tracer.span("_set_datetime_field", field=field_index, retry=attempt) as sp:
+                sp["strategy"] = date_input.set(controls.get(name), field_index, value)
+            logger.info(f"  기간 필드[{field_index}] 입력 완료 (aid={aid}, {sp['strategy']}): {value}")
+            return
+        except Exception as e:
+            logger.warning(f"  기간 필드[{field_index}] 입력 실패: {e}")
+        controls.invalidate(name)   # 재입력 시 컨트롤 다시 탐색
 
     raise RuntimeError(
         f"기간 필드[{field_index}] 입력 실패 (aid={aid}) - "
@@ -125,16 +158,20 @@ def _set_datetime_field(win, field_index: int, value: str) -> None:
     )
 
 
-def _force_checkbox(win, label: str, target: bool) -> None:
+def _force_checkbox(controls: ControlCache, label: str, target: bool, waits: WaitEngine) -> None:
     """체크박스를 목표 상태로 강제 설정. (D11)"""
     try:
-        chk = win.child_window(title=label, control_type="CheckBox")
+        chk = controls.get("checkbox")
         # toggle_state: 0=off, 1=on
         current = chk.get_toggle_state()
         is_checked = (current == 1)
         if is_checked != target:
             chk.click_input()
-            time.sleep(0.1)
+            waits.wait_until(
+                "checkbox",
+                lambda: (chk.get_toggle_state() == 1) == target,
+                legacy=0.1, ceiling=1.0,
+            )
             logger.debug(f"체크박스 '{label}': {is_checked} → {target}")
         else:
             logger.debug(f"체크박스 '{label}' 이미 목표 상태({target})")
@@ -142,37 +179,6 @@ def _force_checkbox(win, label: str, target: bool) -> None:
         logger.warning(f"체크박스 '{label}' 처리 실패(무시): {e}")
 
 
-def _wait_for_query_complete(query_win) -> None:
-    """
-    조회 완료 대기. (D12)
-    Table(name='Report', aid='1780') row count 2회 연속 동일 → 완료 판정.
-    """
-    time.sleep(LOGI_QUERY_WAIT_SEC)
-
-    prev_count = -1
-    stable = 0
-    deadline = time.time() + LOGI_POLL_MAX_SEC
-
-    while time.time() < deadline:
-        try:
-            table = query_win.child_window(auto_id=_AID_TABLE, control_type="Table")
-            # Custom(Report Row) 자식 수로 행 수 추정
-            row_count = len(table.children(control_type="Custom"))
-            if row_count == prev_count and row_count >= 0:
-                stable += 1
-                if stable >= 2:
-                    logger.info(f"  조회 완료 감지 ({row_count}행)")
-                    return
-            else:
-                stable = 0
-                prev_count = row_count
-        except Exception:
-            pass
-        time.sleep(LOGI_POLL_INTERVAL_SEC)
-
-    logger.warning("조회 완료 감지 타임아웃 - 강제 진행")
-
-
 # ─────────────────────────────────────────────────────────────────────────────
 # 공개 인터페이스
 # ─────────────────────────────────────────────────────────────────────────────
@@ -190,14 +196,27 @@ class LogiAutomation:
         logi.login()
         logi.query_date("2026-02-18")
         logi.open_excel()
+
+    그리드 직접 읽기 (EXTRACT_MODE="grid"):
+        logi.query_date("2026-02-18")
+        rows = logi.read_grid_rows("2026-02-18")
+
+    클립보드 TSV (EXTRACT_MODE="clipboard"):
+        logi.query_date("2026-02-18")
+        rows = logi.read_clipboard_rows("2026-02-18")
     """
 
     def __init__(self, logi_id: str = "", logi_pw: str = "") -> None:
         self._id = logi_id
         self._pw = logi_pw
-        self._app: Application | None = None
+        self._app = None         # pywinauto Application
         self._main_win = None
         self._query_win = None   # "기간별수신콜수" 패널/창
+        self._controls = ControlCache()
+        self.lookup_latency = LatencyHistogram("컨트롤 탐색")
+        self.query_latency = LatencyHistogram("조회 완료")
+        self.waits = WaitEngine()   # 실행 종료 시 waits.save() / waits.report()
+        self._date_input = DateInput(self.waits)
 
     # ── 0. GUI 모드 진입점 ────────────────────────────────────────────────────
 
@@ -206,6 +225,8 @@ class LogiAutomation:
         사용자가 이미 기간별수신콜수 화면을 열어둔 상태에서 연결.
         로그인/내비게이션 없이 실행 중인 로지 창에 바로 붙는다.
         """
+        from pywinauto import Application
+
         handles = _find_logi_handles()
         if not handles:
             raise RuntimeError(
@@ -225,15 +246,17 @@ class LogiAutomation:
                 "로지에서 [직원] -> [기간별수신콜수] 화면으로 이동한 후 다시 시도하세요."
             )
 
-        self._query_win = panel
+        self._bind_query_win(panel)
         logger.info("기간별수신콜수 화면 연결 완료")
 
     # ── 1. 로그인 ─────────────────────────────────────────────────────────────
 
     def login(self) -> None:
         """로지 실행 → 로그인 → 메인 화면 확인."""
+        from pywinauto import Application
+        from pywinauto.keyboard import send_keys
+
         self._app = _connect_or_start()
-        time.sleep(1)
 
         main_win = self._app.window(title_re=LOGI_WINDOW_TITLE_RE)
         main_win.wait("visible", timeout=20)
@@ -255,16 +278,29 @@ class LogiAutomation:
                 login_btn = main_win.child_window(title_re=".*로그인.*", control_type="Button")
                 login_btn.click_input()
                 logger.info("로그인 버튼 클릭")
-                time.sleep(LOGIN_WAIT_SEC)
+                self.waits.wait_until(
+                    "login",
+                    lambda: not login_btn.exists(timeout=0),
+                    legacy=LOGIN_WAIT_SEC, ceiling=30,
+                )
         except Exception:
             logger.debug("로그인 창 없음 또는 이미 로그인 상태")
 
         # 메인 창 재연결 (로그인 후 창 제목이 바뀔 수 있음)
-        time.sleep(2)
-        handles = _find_logi_handles()
-        if handles:
-            self._app = Application(backend="uia").connect(handle=handles[0])
-            self._main_win = self._app.window(title_re=LOGI_WINDOW_TITLE_RE)
+        # 로그인 완료 신호: 상단 "직원" 메뉴가 있는 창이 나타남
+        found: list[int] = []
+
+        def _main_ready() -> bool:
+            h = _find_main_handle()
+            if h is not None:
+                found[:] = [h]
+            return h is not None
+
+        # 예전 "login.main"은 로그인 창에도 바로 충족돼 학습값이 0에 가까우므로 새 단계명 사용
+        self.waits.wait_until("login.menu", _main_ready, legacy=2, ceiling=20)
+        if found:
+            self._app = Application(backend="uia").connect(handle=found[0])
+            self._main_win = self._app.window(handle=found[0])
             self._main_win.wait("visible", timeout=20)
             logger.info("로지 메인 화면 확인 완료")
         else:
@@ -318,6 +354,20 @@ class LogiAutomation:
 
         return None
 
+    def _bind_query_win(self, panel) -> None:
+        """
+        조회 화면 확정. 날짜마다 쓰는 컨트롤의 검색 조건을 등록하고
+        실제 탐색은 첫 사용 시 한 번만 한다 (ControlCache).
+        """
+        self._query_win = panel
+        c = self._controls
+        c.invalidate()
+        c.register("checkbox", lambda: panel.child_window(title=CHECKBOX_LABEL, control_type="CheckBox"))
+        c.register("date0", lambda: panel.child_window(auto_id=_AID_DATE_START))
+        c.register("date1", lambda: panel.child_window(auto_id=_AID_DATE_END))
+        c.register("query_btn", lambda: panel.child_window(title_re=r"조\s*회.*", control_type="Button"))
+        c.register("grid", self._find_grid)
+
     def _navigate_to_query_screen(self) -> None:
         """
         메인 창 상단 메뉴에서 "직원" -> "기간별수신콜수" 클릭.
@@ -330,14 +380,18 @@ class LogiAutomation:
         panel = self._find_query_panel()
         if panel:
             logger.debug(f"'{LOGI_SCREEN_NAME}' 화면 이미 활성")
-            self._query_win = panel
+            self._bind_query_win(panel)
             return
 
         # "직원" 메뉴 클릭
         try:
             menu_employee = win.child_window(title=LOGI_MENU_EMPLOYEE, control_type="MenuItem")
             menu_employee.click_input()
-            time.sleep(MENU_WAIT_SEC)
+            sub_item = win.child_window(title=LOGI_SCREEN_NAME, control_type="MenuItem")
+            self.waits.wait_until(
+                "menu.open", lambda: sub_item.exists(timeout=0),
+                legacy=MENU_WAIT_SEC, ceiling=5,
+            )
             logger.debug(f"메뉴 '{LOGI_MENU_EMPLOYEE}' 클릭")
         except Exception as e:
             logger.error(f"메뉴 '{LOGI_MENU_EMPLOYEE}' 클릭 실패: {e}")
@@ -345,29 +399,29 @@ class LogiAutomation:
 
         # "기간별수신콜수" 클릭
         try:
-            sub_item = win.child_window(title=LOGI_SCREEN_NAME, control_type="MenuItem")
             sub_item.click_input()
-            time.sleep(MENU_WAIT_SEC)
             logger.info(f"'{LOGI_SCREEN_NAME}' 화면 진입")
         except Exception as e:
             logger.error(f"'{LOGI_SCREEN_NAME}' 메뉴 클릭 실패: {e}")
             raise
 
         # 패널 로드 대기 후 저장
-        deadline = time.time() + 10
-        while time.time() < deadline:
-            panel = self._find_query_panel()
-            if panel:
-                self._query_win = panel
-                return
-            time.sleep(0.5)
+        found = []
+        if self.waits.wait_until(
+            "menu.screen",
+            lambda: found.append(self._find_query_panel()) or found[-1] is not None,
+            legacy=MENU_WAIT_SEC, ceiling=10,
+        ):
+            self._bind_query_win(found[-1])
+            return
 
         # 찾지 못하면 메인 창 폴백
         logger.warning(f"'{LOGI_SCREEN_NAME}' 패널 탐색 실패 - 메인 창으로 폴백")
-        self._query_win = win
+        self._bind_query_win(win)
 
     # ── 3. 날짜 조회 ──────────────────────────────────────────────────────────
 
+    @traced()
     def query_date(self, date_str: str) -> None:
         """
         특정 날짜의 데이터 조회. (D8~D12)
@@ -380,56 +434,86 @@ class LogiAutomation:
 
         logger.info(f"[{date_str}] 기간 설정: {start_val} ~ {end_val}")
 
-        win = self._query_win
+        controls = self._controls
+        self._note_lookup()
 
         # 체크박스 강제 설정 (D11)
-        _force_checkbox(win, CHECKBOX_LABEL, CHECKBOX_TARGET_STATE)
+        _force_checkbox(controls, CHECKBOX_LABEL, CHECKBOX_TARGET_STATE, self.waits)
 
         # 시작 기간 입력 (field_index=0)
-        _set_datetime_field(win, 0, start_val)
+        _set_datetime_field(controls, 0, start_val, self._date_input)
 
         # 종료 기간 입력 (field_index=1)
-        _set_datetime_field(win, 1, end_val)
+        _set_datetime_field(controls, 1, end_val, self._date_input)
+
+        # 조회 직전 그리드 지문 (= 이전 날짜 결과) - 완료 감지 기준
+        def get_table():
+            return controls.get("grid")
+        try:
+            before = grid_reader.grid_fingerprint(get_table())
+        except Exception as e:
+            logger.debug(f"  조회 전 그리드 지문 읽기 실패: {e}")
+            before = None
 
         # 조회 버튼 클릭 - 실제 name='조 회(V)' (공백 포함)
         try:
-            query_btn = win.child_window(
-                title_re=r"조\s*회.*",
-                control_type="Button",
-            )
+            query_btn = controls.get("query_btn")
             query_btn.click_input()
             logger.info(f"  '조회(V)' 버튼 클릭")
         except Exception as e:
+            controls.invalidate("query_btn")
             logger.error(f"[{date_str}] 조회 버튼 클릭 실패: {e}")
             raise
 
-        # 완료 대기
-        _wait_for_query_complete(win)
-        logger.info(f"[{date_str}] 조회 완료")
+        # 완료 대기 (D12) - 그리드 지문 변화 + 안정 감지
+        with shared_tracer.span("wait_for_refresh"):
+            elapsed, fp = grid_reader.wait_for_refresh(get_table, before)
+        self.query_latency.add(elapsed)
+        shown = fp[0] if fp else "?"
+        logger.info(f"[{date_str}] 조회 완료 ({elapsed:.2f}초, 표시 {shown}행)")
 
     # ── 4. 엑셀로보기 ─────────────────────────────────────────────────────────
 
-    def open_excel(self) -> None:
-        """
-        그리드 우클릭 → 컨텍스트 메뉴 → "엑셀로보기" 클릭. (D13)
-        """
-        win = self._query_win
+    def _note_lookup(self) -> None:
+        """직전 날짜 동안 누적된 컨트롤 탐색 시간을 히스토그램에 기록."""
+        sec = self._controls.take_lookup_sec()
+        if sec > 0:
+            self.lookup_latency.add(sec)
+            logger.debug(
+                f"  컨트롤 탐색 {sec * 1000:.1f} ms "
+                f"(누적 적중 {self._controls.hits} / 재탐색 {self._controls.misses})"
+            )
+
+    def lookup_summary(self) -> str:
+        """컨트롤 탐색 시간 분포 (마지막 날짜 포함)."""
+        self._note_lookup()
+        return self.lookup_latency.summary()
 
-        # 그리드 탐색 - Table name='Report', aid='1780'
+    def _find_grid(self):
+        """Report 그리드(Table, aid='1780') 탐색. 없으면 RuntimeError."""
+        win = self._query_win
         try:
             grid = win.child_window(auto_id=_AID_TABLE, control_type="Table")
             grid.wait("visible", timeout=5)
+            return grid
         except Exception:
             # 폴백: Table 타입 중 첫 번째
             try:
                 grid = win.child_window(control_type="Table")
                 grid.wait("visible", timeout=3)
+                return grid
             except Exception:
                 raise RuntimeError("그리드 컨트롤을 찾을 수 없습니다. (aid=1780)")
 
+    @traced()
+    def open_excel(self) -> None:
+        """
+        그리드 우클릭 → 컨텍스트 메뉴 → "엑셀로보기" 클릭. (D13)
+        """
+        grid = self._controls.get("grid")
+
         # 그리드 우클릭
         grid.click_input(button="right")
-        time.sleep(0.5)
 
         # 컨텍스트 메뉴에서 "엑셀로보기" 클릭
         try:
@@ -438,11 +522,44 @@ class LogiAutomation:
                 title_re=r".*엑셀로보기.*|.*엑셀로 보기.*",
                 control_type="MenuItem",
             )
+            self.waits.wait_until(
+                "excel.menu", lambda: excel_item.exists(timeout=0), legacy=0.5, ceiling=3,
+            )
             excel_item.click_input()
             logger.info("'엑셀로보기' 클릭 완료")
         except Exception as e:
             logger.error(f"'엑셀로보기' 메뉴 클릭 실패: {e}")
             raise
 
-        # Excel이 열릴 때까지 대기 (excel_parser._wait_for_excel에서 추가 대기)
-        time.sleep(2)
+        # 메뉴가 닫혀 명령이 전달될 때까지만 대기 (Excel 준비는 excel_parser._wait_for_excel 담당)
+        self.waits.wait_until(
+            "excel.launch", lambda: not excel_item.exists(timeout=0), legacy=2, ceiling=3,
+        )
+
+    # ── 5. 그리드 직접 읽기 ───────────────────────────────────────────────────
+
+    @traced()
+    def read_grid_rows(self, date_str: str) -> DayBatch:
+        """
+        Excel 없이 Report 그리드의 UIA 트리에서 직접 행을 읽는다.
+        query_date() 이후 호출. 반환 형태는 parse_open_excel()과 동일.
+        """
+        grid = self._controls.get("grid")
+        return grid_reader.read_grid_rows(grid, date_str)
+
+    # ── 6. 클립보드 복사 ──────────────────────────────────────────────────────
+
+    @traced()
+    def read_clipboard_rows(self, date_str: str) -> DayBatch:
+        """
+        Report 그리드 전체를 클립보드로 복사(Ctrl+A, Ctrl+C)해 TSV로 파싱.
+        query_date() 이후 호출. 반환 형태는 parse_open_excel()과 동일.
+        """
+        t0 = time.perf_counter()
+        text = grid_clipboard.copy_grid_text(self._controls.get("grid"), self.waits)
+        rows = grid_clipboard.parse_tsv(date_str, text)
+        logger.info(
+            f"[{date_str}] 클립보드 읽기 완료 - {len(rows)}행 "
+            f"({len(text):,}자, {time.perf_counter() - t0:.2f}초)"
+        )
+        return rows
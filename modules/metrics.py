@@ -0,0 +1,269 @@
+"""
+Prometheus textfile 메트릭 (node_exporter textfile collector용).
+
+체크포인트 말고는 기계가 읽을 결과가 남지 않아 RPA 박스 모니터링에서
+실행 상태를 볼 수 없었다. 날짜 처리 후(업로드 워커)와 실행 종료 시
+METRICS_TEXTFILE_PATH에 현재 값을 통째로 다시 쓴다.
+
+  - 쓰기는 원자적: 같은 폴더 임시 파일에 쓴 뒤 os.replace (수집기가 반쯤 쓴 파일을 읽지 않음)
+  - 날짜 루프(UI 스레드)에서는 호출하지 않는다. 워커/outbox flusher에서 METRICS_MIN_INTERVAL_SEC마다 최대 1회.
+  - 단계 지연 히스토그램은 modules.tracing의 span에서 계산 (TRACE_ENABLED=False면 생략)
+
+    shared_metrics.begin("2026-02", session.quota, planned=28)
+    shared_metrics.count_rows(300)          # 업로드 워커: 로컬 저장 성공 시
+    shared_metrics.update(state)            # 업로드 워커: 날짜 처리 후 (간격 제한)
+    shared_metrics.finish(state)            # 실행 종료 (항상 기록)
+
+카운터(_total)는 프로세스 누적이라 실행마다 0부터 다시 시작한다 (Prometheus가 리셋으로 처리).
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from loguru import logger
+
+from config import METRICS_ENABLED, METRICS_TEXTFILE_PATH, METRICS_MIN_INTERVAL_SEC
+from modules import checkpoint, excel_parser, outbox, telegram_sender
+from modules.sheets_quota import SheetsQuota, shared_quota
+from modules.tracing import Tracer, shared_tracer
+
+_PREFIX = "logi"
+_STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)   # 초
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Exposition:
+    """텍스트 노출 형식 작성기 (메트릭마다 HELP/TYPE 한 번)."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+
+    def metric(self, name: str, kind: str, help_text: str, samples) -> None:
+        """samples: (라벨 dict, 값) 목록. 비어 있으면 메트릭 자체를 생략."""
+        samples = list(samples)
+        if not samples:
+            return
+        full = f"{_PREFIX}_{name}"
+        self.lines.append(f"# HELP {full} {help_text}")
+        self.lines.append(f"# TYPE {full} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{full}{_labels(labels)} {_fmt(value)}")
+
+    def histogram(self, name: str, help_text: str, series: dict[str, list[float]],
+                  edges: tuple[float, ...], label: str) -> None:
+        if not series:
+            return
+        full = f"{_PREFIX}_{name}"
+        self.lines.append(f"# HELP {full} {help_text}")
+        self.lines.append(f"# TYPE {full} histogram")
+        for key, samples in sorted(series.items()):
+            ordered = sorted(samples)
+            i = 0
+            for edge in edges:
+                while i < len(ordered) and ordered[i] <= edge:
+                    i += 1
+                self.lines.append(f"{full}_bucket{_labels({label: key, 'le': _fmt(float(edge))})} {i}")
+            self.lines.append(f"{full}_bucket{_labels({label: key, 'le': '+Inf'})} {len(ordered)}")
+            self.lines.append(f"{full}_sum{_labels({label: key})} {_fmt(round(sum(ordered), 6))}")
+            self.lines.append(f"{full}_count{_labels({label: key})} {len(ordered)}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """같은 폴더 임시 파일에 쓴 뒤 교체 - 읽는 쪽은 이전 또는 새 파일 전체만 본다."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class RunMetrics:
+    def __init__(
+        self,
+        path: Path = METRICS_TEXTFILE_PATH,
+        enabled: bool = METRICS_ENABLED,
+        tracer: Tracer = shared_tracer,
+        min_interval_sec: float = METRICS_MIN_INTERVAL_SEC,
+        upload_outbox: outbox.Outbox = outbox.shared_outbox,
+    ) -> None:
+        self.path = path
+        self.enabled = enabled
+        self.tracer = tracer
+        self.outbox = upload_outbox
+        self.min_interval_sec = min_interval_sec
+        self._lock = threading.Lock()
+        self.month = ""
+        self._quota: SheetsQuota = shared_quota
+        self._planned = 0
+        self._rows = 0
+        self._started = 0.0
+        self._last_write = 0.0
+        self._last_success: float | None = None
+        self._running = False
+        self.writes = 0
+
+    def begin(self, month: str, quota: SheetsQuota | None = None, planned: int = 0) -> None:
+        """실행 시작. 이전 실행들의 마지막 완료 시각을 체크포인트에서 읽어 둔다."""
+        with self._lock:
+            self.month = month
+            self._quota = quota or shared_quota
+            self._planned = planned
+            self._rows = 0
+            self._started = time.time()
+            self._last_write = 0.0
+            self._running = True
+        if self.enabled:
+            self._last_success = checkpoint.last_completed_at()
+
+    def count_rows(self, n: int) -> None:
+        with self._lock:
+            self._rows += n
+
+    def mark_success(self, ts: float | None = None) -> None:
+        self._last_success = ts or time.time()
+
+    def render(self, state: "checkpoint.RunState") -> str:
+        now = time.time()
+        labels = {"month": self.month}
+        out = _Exposition()
+        out.metric("run_in_progress", "gauge", "실행 중이면 1", [(labels, int(self._running))])
+        out.metric("run_start_timestamp_seconds", "gauge", "이번 실행 시작 시각",
+                   [(labels, round(self._started, 3))])
+        out.metric("dates_planned", "gauge", "이번 실행 처리 대상 날짜 수", [(labels, self._planned)])
+        out.metric("dates_done", "gauge", "체크포인트상 완료 날짜 수",
+                   [(labels, len(state.done_dates))])
+        out.metric("dates_failed", "gauge", "체크포인트상 실패 날짜 수",
+                   [(labels, len(state.failed_dates))])
+        out.metric("rows_parsed_total", "counter", "이번 실행에서 파싱·로컬 저장한 행 수",
+                   [(labels, self._rows)])
+
+        q = self._quota.stats()
+        out.metric("sheets_requests_total", "counter", "Sheets API 요청 수 (재시도 포함)",
+                   [({"kind": "read"}, q["reads"]), ({"kind": "write"}, q["writes"])])
+        out.metric("sheets_throttled_total", "counter", "Sheets 429 응답 수", [({}, q["throttled"])])
+        out.metric("sheets_retries_total", "counter", "Sheets 재시도 수", [({}, q["retried"])])
+        out.metric("sheets_failures_total", "counter", "Sheets 최종 실패 수", [({}, q["failed"])])
+        out.metric("sheets_uncertain_appends_total", "counter", "결과 불명으로 재시도하지 않은 append 수",
+                   [({}, q["uncertain"])])
+        out.metric("sheets_bytes_total", "counter", "Sheets 송수신 바이트",
+                   [({"direction": "sent"}, q["bytes_sent"]), ({"direction": "received"}, q["bytes_received"])])
+        out.metric("sheets_wait_seconds_total", "counter", "Sheets 쿼터/백오프 대기 시간",
+                   [({"reason": "bucket"}, round(q["bucket_wait_sec"], 3)),
+                    ({"reason": "backoff"}, round(q["backoff_wait_sec"], 3))])
+
+        c = excel_parser.get_com_stats()
+        out.metric("excel_com_calls_total", "counter", "Excel 파싱에 쓴 COM 왕복 수 (실측)", [({}, c["total"])])
+        out.metric("excel_parses_total", "counter", "Excel 파싱 횟수", [({}, c["parses"])])
+
+        f = outbox.get_flush_stats()
+        out.metric("outbox_pending_batches", "gauge", "Sheets 게시 대기 날짜 배치 수 (outbox)",
+                   [({}, len(self.outbox))])
+        out.metric("outbox_pending_rows", "gauge", "Sheets 게시 대기 행 수 (outbox)",
+                   [({}, self.outbox.pending_rows())])
+        out.metric("outbox_flushes_total", "counter", "outbox 게시 시도 수",
+                   [({"result": "ok"}, f["flushes"]), ({"result": "error"}, f["failures"])])
+
+        t = telegram_sender.get_send_stats()
+        out.metric("telegram_attempts_total", "counter", "Telegram sendDocument 시도 수",
+                   [({"result": "ok"}, t["attempts"] - t["failed_attempts"]),
+                    ({"result": "error"}, t["failed_attempts"])])
+        out.metric("telegram_gave_up_total", "counter", "재시도 후 최종 실패한 전송 수", [({}, t["gave_up"])])
+
+        out.histogram("stage_duration_seconds", "단계별 소요 시간 (modules.tracing span)",
+                      self.tracer.stage_seconds(), _STAGE_BUCKETS, "stage")
+
+        if self._last_success is not None:
+            out.metric("last_success_timestamp_seconds", "gauge", "마지막 월 전체 완료 시각 (CSV 전송 성공)",
+                       [({}, round(self._last_success, 3))])
+            out.metric("seconds_since_last_success", "gauge", "마지막 월 전체 완료 후 경과 시간",
+                       [({}, round(now - self._last_success, 3))])
+        out.metric("metrics_updated_timestamp_seconds", "gauge", "이 파일 작성 시각", [({}, round(now, 3))])
+        return out.text()
+
+    def update(self, state: "checkpoint.RunState") -> bool:
+        """실행 중 파일 갱신 (간격 제한). begin() 전이면 무시. 기록했으면 True."""
+        if not self.enabled or not self._running:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_write < self.min_interval_sec:
+                return False
+            self._last_write = now
+        return self._write(state)
+
+    def _write(self, state: "checkpoint.RunState") -> bool:
+        """실패해도 예외 없음."""
+        try:
+            write_atomic(self.path, self.render(state))
+            self.writes += 1
+            return True
+        except Exception as e:
+            logger.debug(f"메트릭 파일 기록 실패(무시): {e}")
+            return False
+
+    def finish(self, state: "checkpoint.RunState") -> None:
+        """실행 종료 - 진행 중 표시를 내리고 항상 기록. begin() 없이 끝난 실행은 기록하지 않음."""
+        if not self.enabled or not self._running:
+            return
+        self._running = False
+        if self._write(state):
+            logger.info(f"메트릭 기록: {self.path}")
+
+
+shared_metrics = RunMetrics()
+
+
+# ── 단독 실행 테스트 (31일 분량 span 기준 기록 비용) ───────────────────────────
+if __name__ == "__main__":
+    import random
+    import sys
+    import tempfile
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
+    tracer = Tracer(enabled=True)
+    rng = random.Random(0)
+    for day in range(31):
+        for stage, mean in (("query_date", 0.6), ("parse_open_excel", 0.3), ("upsert_rows", 0.4),
+                            ("_set_datetime_field", 0.02), ("write_day", 0.01)):
+            tracer.add(stage, rng.expovariate(1 / mean), date=f"2026-01-{day + 1:02d}")
+
+    path = Path(tempfile.gettempdir()) / "logi_rpa_test.prom"
+    metrics = RunMetrics(path=path, enabled=True, tracer=tracer, min_interval_sec=0,
+                         upload_outbox=outbox.Outbox(Path(tempfile.mkdtemp())))
+    metrics.begin("2026-01", SheetsQuota(), planned=31)
+    metrics.mark_success(time.time() - 86400 * 3)
+    state = checkpoint.RunState("2026-01")
+    state.status = {f"2026-01-{d:02d}": checkpoint.DONE for d in range(1, 30)}
+    state.status["2026-01-30"] = checkpoint.FAILED
+    metrics.count_rows(29 * 300)
+
+    n = 200
+    t0 = time.perf_counter()
+    for _ in range(n):
+        metrics.update(state)
+    per_write = (time.perf_counter() - t0) / n
+    metrics.finish(state)
+
+    text = path.read_text(encoding="utf-8")
+    print(text[:1200])
+    print(f"... {len(text.splitlines())}줄 / {len(text):,}B | 기록 1회 {per_write * 1000:.2f} ms")
@@ -0,0 +1,234 @@
+"""
+상담원(코드) × 일자 월간 행렬 (NumPy) 과 피벗/순위 보고서.
+
+월 CSV는 (날짜, 코드) 세로형이라 인센티브 계산 담당자가 직접 피벗해야 했다.
+CallRecord 묶음(month_store.iter_month 등)에서 바로 행렬을 만든다.
+
+  data[layer, agent, day]   layer 0 = 수신합계, 1 = 발신합계   (int32)
+  agents                    코드 오름차순, 성명은 가장 마지막 날짜의 값
+  days                      해당 월 1일 ~ 말일 (데이터 없는 날은 0)
+
+내보내기 (CSV_DIR, export_csv 결과 옆):
+  logi_pivot_{month}_{ts}.csv     코드, 성명, 구분(수신/발신/총), 1일 ~ 말일, 합계
+  logi_ranking_{month}_{ts}.csv   순위, 코드, 성명, 수신/발신/총합계, 활동일수, 일평균
+  logi_pivot_{month}_{ts}.xlsx    위 두 표를 시트 2개로 (openpyxl이 있을 때만, PIVOT_XLSX)
+"""
+import csv
+import time
+from calendar import monthrange
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+import numpy as np
+from loguru import logger
+
+from config import CSV_DIR, PIVOT_FILENAME_FMT, RANKING_FILENAME_FMT, PIVOT_XLSX
+from modules.records import CallRecord
+
+LAYERS = ("수신", "발신")
+_RANKING_HEADERS = ["순위", "코드", "성명", "수신 합계", "발신 합계", "총합계", "활동일수", "일평균"]
+
+
+class MonthMatrix:
+    def __init__(self, month: str, codes: list[str], names: list[str], data: np.ndarray) -> None:
+        self.month = month
+        self.codes = codes
+        self.names = names
+        self.data = data
+
+    @property
+    def n_days(self) -> int:
+        return self.data.shape[2]
+
+    @classmethod
+    def from_chunks(cls, month: str, chunks: Iterable[Iterable[CallRecord]]) -> "MonthMatrix":
+        """
+        CallRecord 묶음들로 행렬 생성. 다른 월의 행은 무시하고,
+        같은 (날짜, 코드)가 여러 번 나오면 마지막 값을 쓴다 (저장소 upsert와 동일).
+        """
+        dates: list[str] = []
+        codes: list[str] = []
+        recv: list[int] = []
+        sent: list[int] = []
+        name_of: dict[str, str] = {}
+        for chunk in chunks:
+            if not chunk:
+                continue
+            d, c, n, rv, st, _ = zip(*chunk)
+            dates += d
+            codes += c
+            recv += rv
+            sent += st
+            name_of.update(zip(c, n))
+
+        n_days = monthrange(int(month[:4]), int(month[5:7]))[1]
+        uniq_dates, date_idx = np.unique(np.array(dates, dtype=str), return_inverse=True)
+        in_month = np.array([d[:7] == month for d in uniq_dates], dtype=bool)[date_idx]
+        if not in_month.any():
+            return cls(month, [], [], np.zeros((len(LAYERS), 0, n_days), dtype=np.int32))
+        day_of_date = np.array([int(d[8:10]) - 1 for d in uniq_dates], dtype=np.intp)
+        day_idx = day_of_date[date_idx][in_month]
+
+        uniq_codes, agent_idx = np.unique(np.array(codes, dtype=str)[in_month], return_inverse=True)
+        data = np.zeros((len(LAYERS), len(uniq_codes), n_days), dtype=np.int32)
+        data[0, agent_idx, day_idx] = np.array(recv, dtype=np.int32)[in_month]
+        data[1, agent_idx, day_idx] = np.array(sent, dtype=np.int32)[in_month]
+        code_list = uniq_codes.tolist()
+        return cls(month, code_list, [name_of[c] for c in code_list], data)
+
+    # ── 집계 ─────────────────────────────────────────────────────────────────
+
+    def totals(self) -> np.ndarray:
+        """상담원별 월 합계 (agent, 3): 수신 / 발신 / 총."""
+        per_layer = self.data.sum(axis=2, dtype=np.int64)
+        return np.column_stack([per_layer[0], per_layer[1], per_layer[0] + per_layer[1]])
+
+    def active_days(self) -> np.ndarray:
+        """상담원별 통화가 1건 이상인 날짜 수."""
+        return (self.data.sum(axis=0) > 0).sum(axis=1)
+
+    def day_totals(self) -> np.ndarray:
+        """일자별 전체 합계 (3, day): 수신 / 발신 / 총."""
+        per_layer = self.data.sum(axis=1, dtype=np.int64)
+        return np.vstack([per_layer, per_layer.sum(axis=0)])
+
+    def ranking(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        총합계 내림차순(동점은 코드 순) 상담원 인덱스와 순위.
+        순위는 동점 공동 순위 (1, 2, 2, 4 ...).
+        """
+        total = self.totals()[:, 2]
+        order = np.lexsort((np.arange(len(total)), -total))   # 코드가 이미 오름차순
+        sorted_desc = -total[order]
+        ranks = np.searchsorted(sorted_desc, sorted_desc, side="left") + 1
+        return order, ranks
+
+    # ── 표 ───────────────────────────────────────────────────────────────────
+
+    def pivot_table(self) -> list[list]:
+        """와이드 피벗 표 (헤더 포함). 상담원당 수신/발신/총 3행 + 맨 아래 일자별 합계."""
+        header = ["코드", "성명", "구분"] + [f"{d}일" for d in range(1, self.n_days + 1)] + ["합계"]
+        table: list[list] = [header]
+        layers = np.concatenate([self.data, self.data.sum(axis=0, keepdims=True)]).astype(np.int64)
+        labels = LAYERS + ("총",)
+        for a, (code, name) in enumerate(zip(self.codes, self.names)):
+            for k, label in enumerate(labels):
+                days = layers[k, a].tolist()
+                table.append([code, name, label] + days + [sum(days)])
+        for k, days in enumerate(self.day_totals().tolist()):
+            table.append(["", "합계", labels[k]] + days + [sum(days)])
+        return table
+
+    def ranking_table(self) -> list[list]:
+        """순위 표 (헤더 포함)."""
+        totals = self.totals()
+        active = self.active_days()
+        order, ranks = self.ranking()
+        table: list[list] = [_RANKING_HEADERS]
+        for a, rank in zip(order.tolist(), ranks.tolist()):
+            recv, sent, total = totals[a].tolist()
+            days = int(active[a])
+            table.append([rank, self.codes[a], self.names[a], recv, sent, total, days,
+                          round(total / days, 1) if days else 0])
+        return table
+
+
+def build_month(month: str, chunks: Iterable[Iterable[CallRecord]] | None = None) -> MonthMatrix:
+    """월 행렬 생성. chunks를 생략하면 로컬 월 저장소에서 읽는다."""
+    if chunks is None:
+        from modules import month_store
+        chunks = month_store.iter_month(month)
+    t0 = time.perf_counter()
+    matrix = MonthMatrix.from_chunks(month, chunks)
+    logger.debug(
+        f"[{month}] 월 행렬 {len(matrix.codes)}명 × {matrix.n_days}일 "
+        f"({(time.perf_counter() - t0) * 1000:.1f}ms)"
+    )
+    return matrix
+
+
+def _write_csv(path: Path, table: list[list]) -> None:
+    with path.open("w", encoding="utf-8-sig", newline="") as f:
+        csv.writer(f).writerows(table)
+
+
+def _write_xlsx(path: Path, sheets: dict[str, list[list]]) -> bool:
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        logger.warning("openpyxl 미설치 - 피벗 XLSX 생략 (CSV만 저장)")
+        return False
+    wb = Workbook(write_only=True)
+    for title, table in sheets.items():
+        ws = wb.create_sheet(title)
+        for row in table:
+            ws.append(row)
+    wb.save(str(path))
+    return True
+
+
+def export_pivot(matrix: MonthMatrix, xlsx: bool = PIVOT_XLSX) -> list[Path]:
+    """
+    피벗/순위 CSV (+ XLSX)를 CSV_DIR에 저장.
+
+    Returns:
+        저장된 파일 경로 목록 [피벗 CSV, 순위 CSV, (XLSX)]
+    """
+    CSV_DIR.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d-%H%M")
+    pivot = matrix.pivot_table()
+    ranking = matrix.ranking_table()
+
+    paths = [
+        CSV_DIR / PIVOT_FILENAME_FMT.format(month=matrix.month, ts=ts, ext="csv"),
+        CSV_DIR / RANKING_FILENAME_FMT.format(month=matrix.month, ts=ts),
+    ]
+    _write_csv(paths[0], pivot)
+    _write_csv(paths[1], ranking)
+    if xlsx:
+        path = CSV_DIR / PIVOT_FILENAME_FMT.format(month=matrix.month, ts=ts, ext="xlsx")
+        if _write_xlsx(path, {"피벗": pivot, "순위": ranking}):
+            paths.append(path)
+
+    logger.info(f"[{matrix.month}] 피벗 저장 완료: {', '.join(p.name for p in paths)}")
+    return paths
+
+
+# ── 단독 실행 테스트 (1년치 합성 데이터 벤치마크) ─────────────────────────────
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from modules.excel_parser import build_rows
+    from sim.fake_uia import synthetic_grid
+
+    grid = [r for r in synthetic_grid(300) if r[0]]
+    year = {
+        f"2026-{m:02d}": [build_rows(f"2026-{m:02d}-{d:02d}", grid)
+                          for d in range(1, monthrange(2026, m)[1] + 1)]
+        for m in range(1, 13)
+    }
+    n_rows = sum(len(b) for batches in year.values() for b in batches)
+
+    t0 = time.perf_counter()
+    matrices = [MonthMatrix.from_chunks(month, batches) for month, batches in year.items()]
+    t_build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for m in matrices:
+        m.totals()
+        m.ranking()
+        m.day_totals()
+    t_agg = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    tables = [(m.pivot_table(), m.ranking_table()) for m in matrices]
+    t_table = time.perf_counter() - t0
+
+    print(f"1년 {n_rows:,}행 → 12개월 행렬 {t_build * 1000:.1f}ms | "
+          f"합계/순위 {t_agg * 1000:.1f}ms | 피벗/순위 표 {t_table * 1000:.1f}ms")
+
+    feb = matrices[1]
+    flat = sum(r.total for b in year["2026-02"] for r in b)
+    assert int(feb.totals()[:, 2].sum()) == flat, "행렬 합계가 원본과 다름"
+    for row in feb.ranking_table()[:4]:
+        print(row)
@@ -0,0 +1,215 @@
+"""
+로컬 월 데이터 저장소 (SQLite). CSV Export의 원본 데이터.
+
+파싱된 날짜별 행을 PROCESSED_DIR/month_store.sqlite3 에 기록한다.
+CSV/Telegram 단계는 Sheets를 다시 다운로드하지 않고 이 저장소를 읽는다.
+업로드에서만 실패한 날짜도 다음 실행에서 이 저장소의 행을 그대로 다시 게시한다 (read_days).
+Sheets는 게시 대상일 뿐이며, 필요할 때만 reconcile()로 차이를 점검한다.
+
+테이블:
+  days  (date PK, month, row_count, updated_at)   ← 0행인 날짜도 기록
+  calls (date, seq PK, code, month, name, recv, sent, total)
+        seq = 그 날짜의 파싱 순번. 코드가 같은 행(코드 없이 성명만 있는 행 등)도 모두 보존해
+        days.row_count와 저장된 행 수가 항상 같다.
+"""
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+from loguru import logger
+
+from config import MONTH_STORE_PATH, CSV_CHUNK_ROWS
+from modules.records import CallRecord, to_int
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    date       TEXT PRIMARY KEY,
+    month      TEXT NOT NULL,
+    row_count  INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS calls (
+    date   TEXT NOT NULL,
+    code   TEXT NOT NULL,
+    month  TEXT NOT NULL,
+    name   TEXT NOT NULL,
+    recv   INTEGER NOT NULL,
+    sent   INTEGER NOT NULL,
+    total  INTEGER NOT NULL,
+    seq    INTEGER NOT NULL,
+    PRIMARY KEY (date, seq)
+);
+CREATE INDEX IF NOT EXISTS calls_month ON calls (month, date, seq);
+"""
+_COLUMNS = "date, code, month, name, recv, sent, total, seq"
+_checked: set[str] = set()   # 스키마 확인을 마친 저장소 경로
+
+
+def _migrate_code_key(conn: sqlite3.Connection) -> None:
+    """예전 PRIMARY KEY (date, code) 테이블을 (date, seq) 키로 옮긴다 (기존 행은 그대로)."""
+    pk = [name for _, name, _, _, _, key in conn.execute("PRAGMA table_info(calls)") if key]
+    if "code" not in pk:
+        return
+    conn.executescript(f"""
+        BEGIN;
+        ALTER TABLE calls RENAME TO calls_by_code;
+        DROP INDEX IF EXISTS calls_month;
+        {_SCHEMA}
+        INSERT INTO calls ({_COLUMNS}) SELECT {_COLUMNS} FROM calls_by_code;
+        DROP TABLE calls_by_code;
+        COMMIT;
+    """)
+    logger.info("로컬 저장소 calls 테이블 키 변경: (date, code) → (date, seq)")
+
+
+def _connect(path: Path = MONTH_STORE_PATH) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    if str(path) not in _checked:
+        _migrate_code_key(conn)
+        _checked.add(str(path))
+    return conn
+
+
+def write_day(date_str: str, rows: list[CallRecord], path: Path = MONTH_STORE_PATH) -> None:
+    """해당 날짜의 행 전체를 교체 기록 (재수집 시 최신 파싱 결과가 원본)."""
+    month = date_str[:7]
+    with closing(_connect(path)) as conn, conn:
+        conn.execute("DELETE FROM calls WHERE date = ?", (date_str,))
+        conn.executemany(
+            f"INSERT INTO calls ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (date_str, r.code, month, r.name, r.recv, r.sent, r.total, i)
+                for i, r in enumerate(rows)
+            ],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO days VALUES (?, ?, ?, ?)",
+            (date_str, month, len(rows), datetime.now().isoformat(timespec="seconds")),
+        )
+    logger.debug(f"[{date_str}] 로컬 저장소 기록 ({len(rows)}행)")
+
+
+def stored_dates(month: str, path: Path = MONTH_STORE_PATH) -> set[str]:
+    """저장소에 기록된 날짜 (0행 날짜 포함)."""
+    with closing(_connect(path)) as conn:
+        return {d for (d,) in conn.execute("SELECT date FROM days WHERE month = ?", (month,))}
+
+
+def read_month(month: str, path: Path = MONTH_STORE_PATH) -> list[CallRecord]:
+    """월 전체 행 (SHEET_HEADERS 순서, 헤더 제외). 날짜 → 파싱 순."""
+    with closing(_connect(path)) as conn:
+        cur = conn.execute(
+            "SELECT date, code, name, recv, sent, total FROM calls "
+            "WHERE month = ? ORDER BY date, seq",
+            (month,),
+        )
+        return list(map(CallRecord._make, cur))
+
+
+def read_days(dates: list[str], path: Path = MONTH_STORE_PATH) -> dict[str, list[CallRecord]]:
+    """날짜 → 저장된 행 (파싱 순). 저장소에 없는 날짜는 빈 목록."""
+    with closing(_connect(path)) as conn:
+        return {
+            d: list(map(CallRecord._make, conn.execute(
+                "SELECT date, code, name, recv, sent, total FROM calls WHERE date = ? ORDER BY seq", (d,)
+            )))
+            for d in dates
+        }
+
+
+def iter_month(month: str, chunk_rows: int = CSV_CHUNK_ROWS,
+               path: Path = MONTH_STORE_PATH) -> Iterator[list[CallRecord]]:
+    """read_month()와 같은 순서로 chunk_rows행씩 내주는 제너레이터."""
+    with closing(_connect(path)) as conn:
+        cur = conn.execute(
+            "SELECT date, code, name, recv, sent, total FROM calls "
+            "WHERE month = ? ORDER BY date, seq",
+            (month,),
+        )
+        while True:
+            batch = cur.fetchmany(chunk_rows)
+            if not batch:
+                return
+            yield list(map(CallRecord._make, batch))
+
+
+def import_sheet_rows(
+    month: str,
+    sheet_rows: Iterable[list],
+    dates: Iterable[str],
+    path: Path = MONTH_STORE_PATH,
+) -> int:
+    """
+    시트에서 읽은 행(헤더 제외) 중 dates에 해당하는 날짜만 저장소에 기록한다.
+    저장소 도입 이전에 완료된 날짜를 한 번만 가져올 때 사용.
+
+    이미 저장소에 있는 날짜는 건드리지 않는다 (로컬이 시트보다 최신일 수 있음).
+    시트에 행이 없는 날짜도 0행으로 기록 - 다음 실행에서 다시 내려받지 않도록.
+    """
+    wanted = set(dates)
+    by_date: dict[str, list[CallRecord]] = {d: [] for d in wanted}
+    for vals in sheet_rows:
+        if len(vals) < 6 or vals[0] not in wanted:
+            continue
+        by_date[vals[0]].append(CallRecord.from_values(vals))
+    for date_str in sorted(by_date):
+        write_day(date_str, by_date[date_str], path)
+    n = sum(len(r) for r in by_date.values())
+    empty = sum(1 for r in by_date.values() if not r)
+    logger.info(f"[{month}] 시트 → 로컬 저장소 가져오기: {len(by_date)}일 / {n}행 (0행 {empty}일)")
+    return n
+
+
+def merge_sheet_rows(month: str, sheet_rows: Iterable[list], path: Path = MONTH_STORE_PATH) -> int:
+    """
+    시트 행(헤더 제외) 중 로컬 저장소에 없는 (날짜, 코드) 행을 해당 날짜에 덧붙인다.
+    같은 키는 로컬 값을 유지 (저장소가 원본). 스냅샷 게시 전에 다른 PC가 쓴 행,
+    저장소 도입 이전 날짜, 수동 입력 행이 덮어써 지워지지 않도록 한다. 추가된 행 수 반환.
+    """
+    by_date: dict[str, list[CallRecord]] = {}
+    for vals in sheet_rows:
+        if len(vals) >= 6 and vals[0]:
+            by_date.setdefault(vals[0], []).append(CallRecord.from_values(vals))
+    stored = stored_dates(month, path)
+    local_by_date = read_days(sorted(by_date), path)
+    added = 0
+    for date_str in sorted(by_date):
+        local = local_by_date[date_str]
+        keys = {r.key for r in local}
+        extra = [r for r in by_date[date_str] if r.key not in keys]
+        if extra or date_str not in stored:
+            write_day(date_str, local + extra, path)
+            added += len(extra)
+    if added:
+        logger.info(f"[{month}] 시트에만 있던 행 {added}행을 로컬 저장소에 병합")
+    return added
+
+
+def diff_rows(local: list[list], sheet: list[list]) -> dict:
+    """
+    로컬/시트 행을 (날짜, 코드) 키로 비교.
+
+    Returns:
+        {"missing_in_sheet": [...], "missing_locally": [...], "mismatched": [(local, sheet), ...]}
+    """
+    def norm(vals) -> tuple:
+        vals = list(vals) + [""] * (6 - len(vals))
+        return tuple(str(v) for v in vals[:3]) + tuple(str(to_int(v)) for v in vals[3:6])
+
+    local_map = {(str(r[0]), str(r[1])): norm(r) for r in local}
+    sheet_map = {(str(r[0]), str(r[1])): norm(r) for r in sheet if len(r) >= 2 and (r[0] or r[1])}
+
+    return {
+        "missing_in_sheet": [local_map[k] for k in sorted(local_map.keys() - sheet_map.keys())],
+        "missing_locally":  [sheet_map[k] for k in sorted(sheet_map.keys() - local_map.keys())],
+        "mismatched": [
+            (local_map[k], sheet_map[k])
+            for k in sorted(local_map.keys() & sheet_map.keys())
+            if local_map[k] != sheet_map[k]
+        ],
+    }
@@ -0,0 +1,232 @@
+"""
+Office 인증 마법사 등 Excel 다이얼로그를 백그라운드에서 닫는 감시 스레드.
+
+예전에는 날짜마다 parse_open_excel이 Excel 창을 전면으로 올리고
+Excel PID의 모든 창에서 Button을 훑으며 최대 10초 동안 기다렸다.
+이제 세션 동안 하나의 스레드가 최상위 창 목록만 가볍게 폴링해
+Excel 프로세스 소속의 새 창(XLMAIN 제외)이 보이면 [닫기]를 누른다.
+
+  - 폴링 간격 OFFICE_DIALOG_POLL_SEC. 다이얼로그 없이 OFFICE_DIALOG_IDLE_DATES일이
+    지나면 간격을 2배씩 늘려 OFFICE_DIALOG_POLL_MAX_SEC까지 감속, 나타나면 즉시 복귀.
+  - 같은 핸들은 한 번만 처리 (닫기 버튼이 없는 창에 반복 시도하지 않음).
+  - 키보드 입력은 보내지 않는다 (엉뚱한 창 오작동 방지).
+
+parse_open_excel은 shared_watcher.ensure_running()만 호출하고 기다리지 않는다.
+COM 호출이 거부되면(다이얼로그가 모달로 떠 있는 경우) wait_clear() 후 한 번 재시도한다.
+"""
+import threading
+import time
+from typing import Callable, Iterable
+from loguru import logger
+
+from config import OFFICE_DIALOG_POLL_SEC, OFFICE_DIALOG_POLL_MAX_SEC, OFFICE_DIALOG_IDLE_DATES
+from modules.tracing import traced
+
+_EXCEL_MAIN_CLASS = "XLMAIN"
+
+
+def _click_close_in_window(win) -> bool:
+    """
+    win 하위에서 '닫기'가 포함된 Button을 찾아 클릭.
+    성공하면 True, 못 찾으면 False.
+    """
+    try:
+        for btn in win.descendants(control_type="Button"):
+            try:
+                name = btn.window_text() or ""
+                if "닫기" in name or "Close" in name:
+                    btn.click_input()
+                    logger.info(f"인증 마법사 [닫기] 클릭 완료: '{name}'")
+                    return True
+            except Exception:
+                continue
+    except Exception:
+        pass
+    return False
+
+
+def _list_excel_dialogs() -> list[int]:
+    """Excel 프로세스 소속의 보이는 최상위 창 중 메인 창(XLMAIN)이 아닌 핸들."""
+    import win32gui
+    import win32process
+
+    windows: list[tuple[int, int, str]] = []
+
+    def collect(hwnd, _):
+        if win32gui.IsWindowVisible(hwnd):
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            windows.append((hwnd, pid, win32gui.GetClassName(hwnd)))
+        return True
+
+    win32gui.EnumWindows(collect, None)
+    excel_pids = {pid for _, pid, cls in windows if cls == _EXCEL_MAIN_CLASS}
+    return [h for h, pid, cls in windows if pid in excel_pids and cls != _EXCEL_MAIN_CLASS]
+
+
+@traced("dismiss_office_dialog")
+def _dismiss_dialog(hwnd: int) -> bool:
+    from pywinauto import Application
+
+    dlg = Application(backend="uia").connect(handle=hwnd).window(handle=hwnd)
+    title = dlg.window_text() or "(제목없음)"
+    logger.debug(f"  다이얼로그 발견: '{title}'")
+    dlg.set_focus()
+    if _click_close_in_window(dlg):
+        return True
+    logger.debug(f"  닫기 버튼 미발견(스킵): '{title}'")
+    return False
+
+
+class OfficeDialogWatcher:
+    """
+    Args:
+        list_dialogs: 현재 보이는 다이얼로그 후보 핸들 목록을 반환 (기본: Win32 창 열거)
+        dismiss: 핸들 하나를 닫고 성공 여부 반환 (기본: UIA [닫기] 클릭)
+    """
+
+    def __init__(
+        self,
+        list_dialogs: Callable[[], Iterable[int]] = _list_excel_dialogs,
+        dismiss: Callable[[int], bool] = _dismiss_dialog,
+        poll_sec: float = OFFICE_DIALOG_POLL_SEC,
+        poll_max_sec: float = OFFICE_DIALOG_POLL_MAX_SEC,
+        idle_dates: int = OFFICE_DIALOG_IDLE_DATES,
+    ) -> None:
+        self._list = list_dialogs
+        self._dismiss = dismiss
+        self.poll_sec = poll_sec
+        self.poll_max_sec = poll_max_sec
+        self.idle_dates = idle_dates
+        self.interval = poll_sec
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._clear = threading.Event()
+        self._clear.set()
+        self._thread: threading.Thread | None = None
+        self._handled: set[int] = set()
+        self._quiet_dates = 0
+        self._seen_this_date = 0
+        self._stats = {"appeared": 0, "dismissed": 0, "unclosable": 0, "dates": 0, "dates_with_dialog": 0}
+
+    # ── 수명 ─────────────────────────────────────────────────────────────────
+
+    def ensure_running(self) -> None:
+        """스레드가 없으면 시작 (여러 번 호출해도 하나만 동작)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="office-dialogs", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=self.poll_max_sec + 1)
+        self._thread = None
+
+    def __enter__(self) -> "OfficeDialogWatcher":
+        self.ensure_running()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.stop()
+
+    # ── 감시 루프 ────────────────────────────────────────────────────────────
+
+    def poll_once(self) -> int:
+        """새 다이얼로그를 한 번 확인/처리. 처리한 새 다이얼로그 수 반환."""
+        handles = list(self._list())
+        fresh = [h for h in handles if h not in self._handled]
+        if handles and not fresh:
+            # 닫지 못한 창만 남음 - 새 다이얼로그는 아니므로 대기 해제
+            self._clear.set()
+        if not fresh:
+            if not handles:
+                self._clear.set()
+                self._handled.clear()   # 핸들 재사용 대비
+            return 0
+
+        self._clear.clear()
+        with self._lock:
+            self.interval = self.poll_sec
+            self._quiet_dates = 0
+        for hwnd in fresh:
+            self._handled.add(hwnd)
+            self._count("appeared")
+            with self._lock:
+                self._seen_this_date += 1
+            try:
+                ok = self._dismiss(hwnd)
+            except Exception as e:
+                logger.debug(f"  다이얼로그 처리 예외(무시): {e}")
+                ok = False
+            self._count("dismissed" if ok else "unclosable")
+        return len(fresh)
+
+    def _run(self) -> None:
+        logger.debug("Office 다이얼로그 감시 시작")
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except ImportError as e:
+                logger.debug(f"Office 다이얼로그 감시 불가 (Windows 전용): {e}")
+                self._clear.set()
+                return
+            except Exception as e:
+                logger.debug(f"Office 다이얼로그 감시 예외(계속): {e}")
+            self._stop.wait(self.interval)
+        logger.debug("Office 다이얼로그 감시 종료")
+
+    # ── 날짜 단위 통계/감속 ──────────────────────────────────────────────────
+
+    def end_date(self) -> None:
+        """날짜 하나의 Excel 처리가 끝났을 때 호출. 조용한 날이 이어지면 폴링 감속."""
+        with self._lock:
+            self._stats["dates"] += 1
+            if self._seen_this_date:
+                self._stats["dates_with_dialog"] += 1
+                self._quiet_dates = 0
+            else:
+                self._quiet_dates += 1
+                if self._quiet_dates >= self.idle_dates and self.interval < self.poll_max_sec:
+                    self.interval = min(self.poll_max_sec, self.interval * 2)
+                    logger.debug(f"Office 다이얼로그 {self._quiet_dates}일 연속 없음 - 폴링 {self.interval:.2f}초")
+            self._seen_this_date = 0
+
+    def wait_clear(self, timeout: float) -> bool:
+        """처리 중인 다이얼로그가 없어질 때까지 대기. 없으면 즉시 True."""
+        return self._clear.wait(timeout)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, poll_sec=round(self.interval, 3))
+
+
+shared_watcher = OfficeDialogWatcher()
+
+
+# ── 단독 실행 테스트 (가짜 창 목록) ───────────────────────────────────────────
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, str(__import__("pathlib").Path(__file__).parent.parent))
+
+    visible: set[int] = set()
+
+    def fake_dismiss(hwnd: int) -> bool:
+        visible.discard(hwnd)
+        return True
+
+    w = OfficeDialogWatcher(lambda: list(visible), fake_dismiss, poll_sec=0.02, poll_max_sec=0.2, idle_dates=3)
+    with w:
+        for day in range(12):
+            if day in (0, 7):
+                visible.add(1000 + day)   # 인증 마법사 등장
+            time.sleep(0.1)
+            w.end_date()
+            print(f"{day + 1:>2}일차 폴링 {w.interval:.2f}초 {w.stats()}")
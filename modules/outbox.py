@@ -0,0 +1,415 @@
+"""
+Sheets 게시 대기열 (durable outbox) + 백그라운드 flusher.
+
+Google이 느리거나 멈추면 날짜마다 upsert_rows가 재시도 끝에 실패했고, 업로드 워커가
+막혀 UI 단계까지 대기했다 (한 세션 장애로 한 달 전체가 실패 기록).
+이제 업로드 워커는 파싱 결과를 outbox에 추가만 하고, 게시는 flusher 스레드가 따로 한다.
+장애 중에도 조회/파싱은 제 속도로 진행되고, 쌓인 배치는 복구 후(또는 다음 실행에서) 게시된다.
+
+파일 (OUTBOX_DIR):
+  segment_{첫 seq:08d}.jsonl   한 줄 = 한 날짜 배치 {"seq", "date", "ts", "rows"} (추가만 함)
+  acked.log                    게시 완료된 seq (추가만 함)
+  - 미확인 항목 = 세그먼트 항목 - acked. 재시작 시 새 세그먼트에 이어 쓴다 (깨진 마지막 줄 무시)
+  - 항목이 모두 확인된 세그먼트는 삭제, 전부 비면 acked.log도 삭제
+
+flusher (SHEETS_FLUSH_MAX_ROWS 행 또는 가장 오래된 항목이 SHEETS_FLUSH_MAX_SEC 지나면 게시):
+  - 월별로 묶어 CoalescingWriter 한 번의 flush로 게시 → 성공 시 ack + 체크포인트 mark_done
+  - 실패 시 지수 백오프 (OUTBOX_BACKOFF_*) 뒤 같은 항목 재시도. 재시도 중인 날짜는 PARSED(대기) 유지
+  - drain(): CSV/Telegram 전 outbox가 빌 때까지 대기 (백오프 외에는 즉시 게시)
+  - drain 시간 초과/stop 때 남은 날짜만 mark_failed('upload') - 실행당 날짜별 한 번
+
+    flusher = OutboxFlusher(shared_outbox, lambda m: sheets_writer(session, m), state).start()
+    flusher.submit("2026-02-01", rows)        # 업로드 워커
+    if flusher.drain(OUTBOX_DRAIN_TIMEOUT_SEC):   # UI 스레드: CSV 단계 전
+        ...
+    flusher.stop()
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+from loguru import logger
+
+from config import (
+    OUTBOX_DIR, OUTBOX_SEGMENT_MAX_BYTES, OUTBOX_FSYNC,
+    OUTBOX_BACKOFF_BASE_SEC, OUTBOX_BACKOFF_MAX_SEC,
+    SHEETS_FLUSH_MAX_ROWS, SHEETS_FLUSH_MAX_SEC,
+)
+from modules import checkpoint
+from modules.records import CallRecord
+from modules.sheets_writer import CoalescingWriter
+from modules.tracing import shared_tracer
+
+_ACK_LOG = "acked.log"
+
+# flusher 누적 통계 (프로세스 단위, modules.metrics가 읽음)
+_flush_stats = {"flushes": 0, "failures": 0, "acked": 0}
+
+
+def get_flush_stats() -> dict:
+    return dict(_flush_stats)
+
+
+class OutboxEntry(NamedTuple):
+    seq: int
+    date: str
+    rows: list[CallRecord]
+    added: float            # 추가 시각 (epoch초) - 보류 시간 계산용
+
+
+class Outbox:
+    """append-only 세그먼트 + 확인 로그. 첫 사용 시 디스크에서 미확인 항목을 읽는다."""
+
+    def __init__(self, directory: Path = OUTBOX_DIR,
+                 segment_max_bytes: int = OUTBOX_SEGMENT_MAX_BYTES, fsync: bool = OUTBOX_FSYNC) -> None:
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._entries: dict[int, OutboxEntry] = {}   # seq → 미확인 항목 (seq 순)
+        self._segment_of: dict[int, Path] = {}
+        self._active: Path | None = None
+        self._next_seq = 1
+
+    # ── 로드 ─────────────────────────────────────────────────────────────────
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        acked: set[int] = set()
+        ack_path = self.directory / _ACK_LOG
+        if ack_path.exists():
+            for token in ack_path.read_text(encoding="utf-8").split():
+                if token.isdigit():
+                    acked.add(int(token))
+        for seg in sorted(self.directory.glob("segment_*.jsonl")):
+            with seg.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"outbox: {seg.name}의 깨진 줄 무시 (추가 중 종료)")
+                        continue
+                    seq = rec["seq"]
+                    self._next_seq = max(self._next_seq, seq + 1)
+                    if seq in acked:
+                        continue
+                    rows = [CallRecord._make(r) for r in rec["rows"]]
+                    self._entries[seq] = OutboxEntry(seq, rec["date"], rows, rec["ts"])
+                    self._segment_of[seq] = seg
+        self._loaded = True
+        if self._entries:
+            logger.info(f"outbox: 이전 실행의 미게시 배치 {len(self._entries)}건 "
+                        f"({self._pending_rows()}행) - 게시 대기")
+        self._compact()
+
+    # ── 추가/조회/확인 ────────────────────────────────────────────────────────
+
+    def append(self, date_str: str, rows: list[CallRecord]) -> int:
+        """날짜 배치 한 줄 추가 (OUTBOX_FSYNC면 디스크 반영까지). seq 반환."""
+        with self._lock:
+            self._ensure_loaded()
+            seq = self._next_seq
+            self._next_seq += 1
+            added = time.time()
+            line = json.dumps({"seq": seq, "date": date_str, "ts": round(added, 3),
+                               "rows": [list(r) for r in rows]}, ensure_ascii=False) + "\n"
+            if self._active is None or (self._active.exists()
+                                        and self._active.stat().st_size >= self.segment_max_bytes):
+                self._active = self.directory / f"segment_{seq:08d}.jsonl"
+            self._write(self._active, line)
+            self._entries[seq] = OutboxEntry(seq, date_str, list(rows), added)
+            self._segment_of[seq] = self._active
+            return seq
+
+    def _write(self, path: Path, text: str) -> None:
+        with path.open("a", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def pending(self) -> list[OutboxEntry]:
+        """미확인 항목 (추가 순)."""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._entries.values())
+
+    def pending_dates(self) -> set[str]:
+        with self._lock:
+            self._ensure_loaded()
+            return {e.date for e in self._entries.values()}
+
+    def _pending_rows(self) -> int:
+        return sum(len(e.rows) for e in self._entries.values())
+
+    def pending_rows(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return self._pending_rows()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._entries)
+
+    def ack(self, seqs: list[int]) -> None:
+        """게시 완료 기록 후 필요 없어진 세그먼트 정리."""
+        if not seqs:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            self._write(self.directory / _ACK_LOG, " ".join(map(str, seqs)) + "\n")
+            for seq in seqs:
+                self._entries.pop(seq, None)
+                self._segment_of.pop(seq, None)
+            self._compact()
+
+    def _compact(self) -> None:
+        live = set(self._segment_of.values())
+        for seg in self.directory.glob("segment_*.jsonl"):
+            if seg not in live and (seg != self._active or not self._entries):
+                seg.unlink(missing_ok=True)
+        if not self._entries:
+            # 세그먼트를 모두 지운 뒤 확인 로그 삭제 (반대 순서면 그사이 종료 시 확인된 항목을 다시 게시)
+            (self.directory / _ACK_LOG).unlink(missing_ok=True)
+            self._active = None
+
+
+shared_outbox = Outbox()
+
+
+class OutboxFlusher:
+    """outbox → Sheets 게시 스레드 (실행 단위)."""
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        writer_factory: Callable[[str], CoalescingWriter],
+        state: checkpoint.RunState,
+        max_rows: int = SHEETS_FLUSH_MAX_ROWS,
+        max_age_sec: float = SHEETS_FLUSH_MAX_SEC,
+        backoff_base_sec: float = OUTBOX_BACKOFF_BASE_SEC,
+        backoff_max_sec: float = OUTBOX_BACKOFF_MAX_SEC,
+        on_flush: Callable[[], None] | None = None,
+        store: checkpoint.StateStore = checkpoint.shared_store,
+    ) -> None:
+        """
+        Args:
+            writer_factory: 월 → 그 월 시트에 게시하는 CoalescingWriter (pipeline.sheets_writer)
+            state: 이번 실행 월의 체크포인트 상태. 다른 월 항목은 그 월 상태를 로드해 기록.
+            on_flush: 게시 시도 후 호출 (메트릭 갱신 등). flusher 스레드에서 실행.
+        """
+        self.outbox = outbox
+        self.writer_factory = writer_factory
+        self.max_rows = max(1, max_rows)
+        self.max_age_sec = max_age_sec
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.on_flush = on_flush
+        self.store = store
+        self._states = {state.month: state}
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stop = False
+        self._urgent = False          # drain()/kick(): 보류 시간 없이 게시
+        self._failures = 0            # 연속 실패 횟수
+        self.flushes = 0              # 이 flusher의 게시 성공 횟수 (writer는 배치마다 새로 생성)
+        self._retry_at = 0.0          # 백오프 종료 시각 (monotonic)
+        self._gave_up: set[str] = set()   # 이번 실행에서 업로드 실패로 기록한 날짜
+
+    # ── 제어 (다른 스레드에서 호출) ──────────────────────────────────────────────
+
+    def start(self) -> "OutboxFlusher":
+        self._thread = threading.Thread(target=self._loop, name="outbox-flusher", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, date_str: str, rows: list[CallRecord]) -> int:
+        """배치를 outbox에 추가 (디스크 기록 후 반환). 게시는 flusher가 한다."""
+        seq = self.outbox.append(date_str, rows)
+        with self._cond:
+            self._cond.notify_all()
+        return seq
+
+    def kick(self) -> None:
+        """보류 시간을 기다리지 않고 지금 쌓인 항목을 게시하도록 요청."""
+        with self._cond:
+            self._urgent = True
+            self._cond.notify_all()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """
+        outbox가 빌 때까지 대기 (보류 없이 게시). 비었으면 True,
+        시간 초과면 남은 날짜를 업로드 실패로 기록하고 False.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._urgent = True
+            self._cond.notify_all()
+            while len(self.outbox):
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    break
+                self._cond.wait(1.0 if left is None else min(left, 1.0))
+            else:
+                return True
+        self._give_up()
+        return False
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """스레드 종료. 게시 중이면 timeout까지만 기다린다 (남은 항목은 다음 실행에서 게시)."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if len(self.outbox):
+            logger.warning(f"outbox 미게시 {len(self.outbox)}건 ({self.outbox.pending_rows()}행) - 다음 실행에서 게시")
+            self._give_up()
+
+    def _give_up(self) -> None:
+        """이번 실행에 게시하지 못한 날짜를 업로드 실패로 한 번만 기록 (항목은 outbox에 남아 다음 실행에서 게시)."""
+        for d in self.outbox.pending_dates():
+            if d not in self._gave_up:
+                self._gave_up.add(d)
+                checkpoint.mark_failed(self._state_for(d[:7]), d, "upload", self.store)
+
+    # ── flusher 스레드 ────────────────────────────────────────────────────────
+
+    def _next_batch(self) -> list[OutboxEntry] | None:
+        """게시할 항목 (같은 월, 최대 max_rows행 - 최소 1건). 아직 아니면 None. _cond 보유 상태에서 호출."""
+        entries = self.outbox.pending()
+        if not entries:
+            self._urgent = False
+            self._cond.wait()
+            return None
+        now = time.monotonic()
+        if now < self._retry_at:
+            self._cond.wait(self._retry_at - now)
+            return None
+        total = sum(len(e.rows) for e in entries)
+        age = time.time() - entries[0].added
+        if not (self._urgent or total >= self.max_rows or age >= self.max_age_sec):
+            self._cond.wait(self.max_age_sec - age)
+            return None
+        month = entries[0].date[:7]
+        batch, rows = [], 0
+        for e in entries:
+            if e.date[:7] != month:
+                continue
+            if batch and rows + len(e.rows) > self.max_rows:
+                break
+            batch.append(e)
+            rows += len(e.rows)
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                if self._stop:
+                    return
+                batch = self._next_batch()
+            if batch:
+                try:
+                    self._publish(batch)
+                except Exception as e:
+                    # 체크포인트 기록 실패 등 - 스레드가 죽으면 drain()이 끝나지 않으므로 삼킨다
+                    logger.error(f"outbox flusher 오류: {e}")
+                if self.on_flush is not None:
+                    self.on_flush()
+                with self._cond:
+                    self._cond.notify_all()
+
+    def _state_for(self, month: str) -> checkpoint.RunState:
+        if month not in self._states:
+            self._states[month] = checkpoint.load(month, self.store)
+        return self._states[month]
+
+    def _publish(self, batch: list[OutboxEntry]) -> None:
+        month = batch[0].date[:7]
+        writer = self.writer_factory(month)
+        last_rows: dict[str, int] = {}
+        for e in batch:
+            writer.add(e.date, e.rows)
+            last_rows[e.date] = len(e.rows)
+        dates = writer.pending_dates
+        span_date = dates[0] if len(dates) == 1 else f"{dates[0]}~{dates[-1]}"
+        state = self._state_for(month)
+        try:
+            with shared_tracer.tags(date=span_date), \
+                    shared_tracer.span("flush", days=len(dates), rows=writer.pending_rows):
+                writer.flush()
+        except Exception as e:
+            self._failures += 1
+            _flush_stats["failures"] += 1
+            delay = min(self.backoff_max_sec, self.backoff_base_sec * 2 ** (self._failures - 1))
+            self._retry_at = time.monotonic() + delay
+            logger.error(f"업로드 실패 ({len(dates)}일: {dates[0]} ~ {dates[-1]}): {e} "
+                         f"- outbox 보관, {delay:.0f}초 후 재시도 (연속 {self._failures}회)")
+            return
+        self._failures = 0
+        self._retry_at = 0.0
+        self.flushes += 1
+        _flush_stats["flushes"] += 1
+        _flush_stats["acked"] += len(batch)
+        self.outbox.ack([e.seq for e in batch])
+        still_pending = self.outbox.pending_dates()   # 같은 날짜를 그사이 다시 추가했으면 그 게시 후 완료
+        for d in dates:
+            if d not in still_pending:
+                checkpoint.mark_done(state, d, last_rows[d], self.store)
+        logger.info(f"업로드 완료 (flush #{self.flushes}) - {', '.join(dates)}")
+
+
+# ── 단독 실행 테스트 (장애 중 적재 → 복구 후 게시, 재시작 시 미확인 항목 복원) ─────
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
+    tmp = Path(tempfile.mkdtemp())
+    store = checkpoint.StateStore(tmp / "state.sqlite3", legacy_dir=tmp)
+    state = checkpoint.load("2026-02", store)
+    box = Outbox(tmp / "outbox", segment_max_bytes=64 * 1024)
+
+    sheet: dict[tuple, CallRecord] = {}
+    outage = {"on": True}
+
+    def publish(rows: list[CallRecord]) -> int:
+        if outage["on"]:
+            raise RuntimeError("[503] Backend error")
+        for r in rows:
+            sheet[r.key] = r
+        return len(rows)
+
+    def make_rows(d: str) -> list[CallRecord]:
+        return [CallRecord(d, f"{i:04d}", f"상담원{i}", i, 1, i + 1) for i in range(300)]
+
+    flusher = OutboxFlusher(box, lambda m: CoalescingWriter(publish), state, max_rows=3000, max_age_sec=0.05,
+                            backoff_base_sec=0.05, backoff_max_sec=0.2, store=store).start()
+    t0 = time.perf_counter()
+    for day in range(1, 29):
+        flusher.submit(f"2026-02-{day:02d}", make_rows(f"2026-02-{day:02d}"))
+    per_append = (time.perf_counter() - t0) / 28
+    time.sleep(0.5)
+    assert len(box) == 28 and not sheet, "장애 중에는 outbox에 남아야 함"
+    assert not state.failed_dates, "재시도 중에는 실패로 기록하지 않음"
+    assert not flusher.drain(timeout=0.1)
+    flusher.stop()
+    assert len(state.failed_dates) == 28 and set(state.attempts.values()) == {1}, "실행당 한 번만 실패 기록"
+
+    # 재시작: 디스크에서 미확인 28건 복원 → 복구 후 drain
+    box2 = Outbox(tmp / "outbox", segment_max_bytes=64 * 1024)
+    assert len(box2) == 28
+    outage["on"] = False
+    flusher2 = OutboxFlusher(box2, lambda m: CoalescingWriter(publish), state,
+                             max_rows=3000, max_age_sec=60, store=store).start()
+    assert flusher2.drain(timeout=10)
+    flusher2.stop()
+    assert len(sheet) == 28 * 300 and len(state.done_dates) == 28
+    assert not list((tmp / "outbox").iterdir()), "모두 게시되면 파일 정리"
+    print(f"추가 1건(300행, fsync): {per_append * 1000:.2f} ms | 통계 {get_flush_stats()}")
@@ -0,0 +1,262 @@
+"""
+날짜 루프 파이프라인.
+
+  [UI 스레드]      조회 → 내보내기/그리드 읽기 → 파싱   (로지/Excel은 단일 스레드 유지)
+        │  bounded queue (PIPELINE_QUEUE_SIZE)
+        ▼
+  [업로드 워커]    로컬 저장소 기록 → 체크포인트 mark_parsed → outbox 추가 (디스크)
+        │
+        ▼
+  [outbox flusher] 행 수/보류 시간 기준으로 모아 flush(Sheets upsert) → ack → 체크포인트 mark_done
+                   (modules.outbox - 실패 시 백오프 후 재시도, 실행 종료 후엔 다음 실행이 이어서 게시)
+
+N일차 파싱이 끝나면 업로드를 기다리지 않고 바로 N+1일차 조회를 시작한다.
+Sheets가 느리거나 멈춰도 업로드 워커는 디스크 추가만 하므로 UI 단계는 막히지 않는다.
+- 체크포인트: 행을 실은 flush가 성공한 날짜만 mark_done
+  실패는 단계('query'/'parse'/'upload')와 함께 기록 → plan_days()가 다음 실행의 작업을 나눈다
+- 업로드에서만 실패했는데 outbox에 없는 날짜는 upload_cached()가 로컬 저장소에서 outbox로 다시 넣는다
+- CSV/Telegram 전에 flusher.drain()으로 outbox가 빌 때까지 기다린다
+- 큐가 가득 차면 UI 스레드가 대기 → 파싱 결과가 무한정 쌓이지 않음
+- 단계별 span(modules.tracing): UI 단계는 date/attempt, 워커/flusher 단계는 date 태그
+- 메트릭 파일(modules.metrics)은 워커/flusher가 갱신 (UI 스레드 부담 없음)
+"""
+import itertools
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+from loguru import logger
+
+from config import EXTRACT_MODE, PIPELINE_QUEUE_SIZE, SHEETS_PUBLISH_MODE, SHEETS_ENABLED, PIVOT_ENABLED
+from modules import checkpoint, excel_com, excel_processes, month_matrix, month_store, office_dialogs
+from modules.metrics import shared_metrics
+from modules.outbox import OutboxFlusher, shared_outbox
+from modules.excel_parser import parse_open_excel, close_excel_without_save, get_com_stats
+from modules.records import DayBatch
+from modules.sheets_uploader import SheetsSession, upsert_rows, publish_snapshot, iter_sheet_rows
+from modules.sheets_writer import CoalescingWriter
+from modules.tracing import shared_tracer, traced
+
+_SENTINEL = object()
+
+
+class ExtractError(RuntimeError):
+    """extract_day의 조회 이후 단계 실패. stage는 checkpoint.mark_failed의 failed_at 값."""
+
+    def __init__(self, stage: str, cause: Exception) -> None:
+        super().__init__(str(cause))
+        self.stage = stage
+
+
+@traced()
+def extract_day(logi, date_str: str) -> DayBatch:
+    """
+    UI 단계: 기간 설정 → 조회 → (EXTRACT_MODE에 따라) 엑셀 파싱 / 그리드 읽기 / 클립보드 TSV.
+    조회 실패는 원래 예외 그대로, 그 뒤 단계 실패는 ExtractError("parse")로 올린다.
+    """
+    logi.query_date(date_str)
+    try:
+        return _read_rows(logi, date_str)
+    except Exception as e:
+        raise ExtractError("parse", e) from e
+
+
+def _read_rows(logi, date_str: str) -> DayBatch:
+    if EXTRACT_MODE == "grid":
+        return logi.read_grid_rows(date_str)
+    if EXTRACT_MODE == "clipboard":
+        return logi.read_clipboard_rows(date_str)
+
+    excel = excel_processes.shared_lifecycle
+    excel.before_export(excel_com.connection())
+    try:
+        logi.open_excel()
+        rows = parse_open_excel(date_str)
+        close_excel_without_save()
+        return rows
+    finally:
+        excel.after_date(date_str, excel_com.connection())
+
+
+def start_session() -> None:
+    """날짜 루프 시작 전 준비. Excel 모드면 이전 실행이 남긴 Excel 인스턴스 정리."""
+    if EXTRACT_MODE == "excel":
+        excel_processes.shared_lifecycle.clean_start()
+
+
+def end_session(logi) -> None:
+    """날짜 루프 종료 후 대기 프로파일 저장, 감시 스레드 정지, 단계별 통계 로그."""
+    logger.info(f"지연 분포: {logi.query_latency.summary()}")
+    logger.info(f"지연 분포: {logi.lookup_summary()}")
+    logi.waits.save()
+    logger.info(f"대기 엔진 보고:\n{logi.waits.report()}")
+    if EXTRACT_MODE == "excel":
+        office_dialogs.shared_watcher.stop()
+        logger.info(f"Office 다이얼로그 감시: {office_dialogs.shared_watcher.stats()}")
+        logger.info(f"Excel COM 호출: {get_com_stats()}")
+        lifecycle = excel_processes.shared_lifecycle
+        logger.info(f"Excel 프로세스: {lifecycle.stats()} | {lifecycle.report()}")
+
+
+def sheets_writer(session: SheetsSession, month: str) -> CoalescingWriter:
+    """
+    SHEETS_PUBLISH_MODE에 맞는 게시 함수로 CoalescingWriter 생성.
+    SHEETS_ENABLED=False면 게시하지 않는다 (로컬 저장소 기록만으로 완료 처리).
+    """
+    if not SHEETS_ENABLED:
+        return CoalescingWriter(len)
+    publish = publish_snapshot if SHEETS_PUBLISH_MODE == "snapshot" else upsert_rows
+    return CoalescingWriter(lambda rows: publish(session, month, rows))
+
+
+def plan_days(dates: list[str], state: checkpoint.RunState) -> checkpoint.WorkPlan:
+    """완료되지 않은 날짜를 (업로드만 / 조회부터)로 나눈다. 로컬 저장소에 행이 있어야 업로드만 한다."""
+    cached: set[str] = set()
+    for month in sorted({d[:7] for d in dates}):
+        cached |= month_store.stored_dates(month)
+    return checkpoint.work_plan(dates, state, cached)
+
+
+def start_flusher(session: SheetsSession, state: checkpoint.RunState) -> OutboxFlusher:
+    """shared_outbox를 월별 시트로 게시하는 flusher 시작. 실행이 끝나면 stop()."""
+    return OutboxFlusher(
+        shared_outbox,
+        lambda month: sheets_writer(session, month),
+        state,
+        on_flush=lambda: shared_metrics.update(state),
+    ).start()
+
+
+def upload_cached(dates: list[str], state: checkpoint.RunState, flusher: OutboxFlusher) -> int:
+    """
+    이전 실행에서 업로드만 실패한 날짜(plan_days().upload)를 로지 조회 없이 다시 게시한다.
+    outbox에 이미 남아 있는 날짜는 그대로 두고, 없는 날짜만 로컬 저장소에서 읽어 넣는다.
+    바로 게시하도록 flusher를 깨운다. 새로 넣은 날짜 수 반환.
+    """
+    if not dates:
+        return 0
+    queued = flusher.outbox.pending_dates()
+    missing = [d for d in dates if d not in queued]
+    by_date = month_store.read_days(missing)
+    for d in missing:
+        flusher.submit(d, by_date[d])
+    logger.info(f"캐시 재업로드 - {len(dates)}일 (outbox 잔여 {len(dates) - len(missing)}일 + "
+                f"로컬 저장소 {len(missing)}일 / {sum(map(len, by_date.values()))}행, 로지 조회 없음)")
+    flusher.kick()
+    return len(missing)
+
+
+def run_days(
+    dates: list[str],
+    state: checkpoint.RunState,
+    extract: Callable[[str], DayBatch],
+    flusher: OutboxFlusher,
+    on_extract_error: Callable[[str, Exception], None] | None = None,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+) -> None:
+    """
+    Args:
+        dates: 처리할 날짜 리스트
+        state: checkpoint.load() 반환값 (워커 스레드에서 갱신)
+        extract: 날짜 → 파싱 행 목록. 호출 스레드(UI)에서 순차 실행.
+        flusher: 파싱 행을 넘길 outbox flusher. 게시 완료는 기다리지 않는다 (flusher.drain()).
+        on_extract_error: UI 단계 실패 시 호출 (스크린샷 등). UI 스레드에서 실행.
+        queue_size: 업로드 대기 큐 최대 길이 (백프레셔)
+    """
+    work: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+
+    def _handle(date_str: str, rows: DayBatch | None, failed_at: str | None) -> None:
+        if failed_at is not None:
+            checkpoint.mark_failed(state, date_str, failed_at)
+            return
+        try:
+            with shared_tracer.tags(date=date_str), shared_tracer.span("write_day", rows=len(rows or [])):
+                month_store.write_day(date_str, rows or [])
+        except Exception as e:
+            logger.error(f"[{date_str}] 로컬 저장소 기록 실패: {e}")
+            checkpoint.mark_failed(state, date_str, "parse")
+            return
+        shared_metrics.count_rows(len(rows or []))
+        if not rows:
+            logger.warning(f"[{date_str}] 파싱 결과 없음 - 완료 처리")
+            checkpoint.mark_done(state, date_str, 0)
+            return
+        # flusher가 먼저 mark_done 할 수 있으므로 outbox 추가 전에 기록
+        checkpoint.mark_parsed(state, date_str, len(rows))
+        with shared_tracer.tags(date=date_str), shared_tracer.span("outbox_append", rows=len(rows)):
+            flusher.submit(date_str, rows)
+        logger.debug(f"[{date_str}] outbox 등록 ({len(rows)}행, 대기 {flusher.outbox.pending_rows()}행)")
+
+    def _worker() -> None:
+        while True:
+            item = work.get()
+            if item is _SENTINEL:
+                return
+            try:
+                _handle(*item)
+                shared_metrics.update(state)
+            except Exception as e:
+                # 체크포인트/outbox 기록 실패 등 - 워커가 죽으면 UI 스레드가 put에서 멈추므로 삼킨다
+                logger.error(f"업로드 워커 오류: {e}")
+
+    worker = threading.Thread(target=_worker, name="upload-worker", daemon=True)
+    worker.start()
+
+    total = len(dates)
+    try:
+        for idx, date_str in enumerate(dates, 1):
+            logger.info(f"━━ [{idx}/{total}] {date_str} 처리 시작 ━━")
+            try:
+                with shared_tracer.tags(date=date_str, attempt=checkpoint.attempt_number(state, date_str)):
+                    rows = extract(date_str)
+                item = (date_str, rows, None)
+            except Exception as e:
+                failed_at = e.stage if isinstance(e, ExtractError) else "query"
+                logger.error(f"[{date_str}] 처리 실패 ({failed_at}): {e}")
+                if on_extract_error is not None:
+                    on_extract_error(date_str, e)
+                item = (date_str, None, failed_at)
+
+            t0 = time.perf_counter()
+            work.put(item)   # 큐가 가득 차면 여기서 대기 (백프레셔)
+            waited = time.perf_counter() - t0
+            if waited > 0.5:
+                logger.debug(f"  업로드 대기열 가득 참 - {waited:.1f}초 대기")
+    finally:
+        work.put(_SENTINEL)
+        worker.join()
+
+
+def month_chunks(session: SheetsSession, month: str, state: checkpoint.RunState) -> Iterator[list[list]]:
+    """
+    CSV/Telegram용 월 전체 행 (헤더 제외)을 CSV_CHUNK_ROWS행씩 내준다 - 로컬 저장소 기준.
+
+    체크포인트상 완료인데 저장소에 없는 날짜가 있으면 (저장소 도입 이전 실행분)
+    시트를 구간 단위로 한 번 내려받아 그 날짜만 저장소로 가져온 뒤 읽는다
+    (시트에 행이 없던 날짜도 0행으로 기록되어 다음 실행부터는 내려받지 않음).
+    """
+    missing = set(state.done_dates) - month_store.stored_dates(month)
+    if missing and SHEETS_ENABLED:
+        logger.info(f"[{month}] 로컬 저장소에 없는 완료 날짜 {len(missing)}일 - 시트에서 가져오기")
+        month_store.import_sheet_rows(
+            month, itertools.chain.from_iterable(iter_sheet_rows(session, month)), missing
+        )
+    elif missing:
+        logger.warning(f"[{month}] 로컬 저장소에 없는 완료 날짜 {len(missing)}일: {sorted(missing)}")
+    return month_store.iter_month(month)
+
+
+@traced()
+def month_pivot(month: str) -> list[Path]:
+    """
+    월 저장소로 상담원 × 일자 피벗/순위 파일 생성 (month_chunks 이후 호출).
+    실패해도 CSV 단계에는 영향 없음 - 빈 목록 반환.
+    """
+    if not PIVOT_ENABLED:
+        return []
+    try:
+        return month_matrix.export_pivot(month_matrix.build_month(month))
+    except Exception as e:
+        logger.error(f"[{month}] 피벗 보고서 생성 실패 (CSV는 정상): {e}")
+        return []
@@ -0,0 +1,95 @@
+"""
+파이프라인 공통 행 타입.
+
+예전에는 행마다 한글 키 dict({"날짜": ..., "코드": ..., "수신합계": ...})를 만들고
+시트/CSV 쓰기 직전에 다시 리스트로 옮겼다. 이제 파서가 CallRecord를 만들고
+업로더/CSV/로컬 저장소가 그대로 쓴다.
+
+  CallRecord  NamedTuple (__slots__ = ()) - 필드 순서가 SHEET_HEADERS와 같아
+              레코드 자체가 시트/CSV 행이다 (변환 복사 없음).
+                date=날짜  code=코드  name=성명  recv=수신합계  sent=발신합계  total=총합계
+  DayBatch    한 날짜의 CallRecord 리스트 (list 하위 클래스, .date 속성)
+"""
+from typing import NamedTuple, Sequence
+
+
+def to_int(value) -> int:
+    """시트/CSV 숫자 셀 → int ("1,234" 허용, 변환 실패 시 0)."""
+    try:
+        return int(str(value).replace(",", ""))
+    except ValueError:
+        return 0
+
+
+class CallRecord(NamedTuple):
+    date: str
+    code: str
+    name: str
+    recv: int
+    sent: int
+    total: int
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """유니크 키 (날짜, 코드)."""
+        return self[0], self[1]
+
+    @classmethod
+    def from_values(cls, vals: Sequence) -> "CallRecord":
+        """시트/CSV에서 읽은 행 (숫자 컬럼이 문자열일 수 있음)."""
+        return cls(str(vals[0]), str(vals[1]), str(vals[2]),
+                   to_int(vals[3]), to_int(vals[4]), to_int(vals[5]))
+
+
+class DayBatch(list):
+    """한 날짜의 파싱 결과. 기존 list 사용처(len, 반복, 빈 값 판정)와 호환."""
+
+    __slots__ = ("date",)
+
+    def __init__(self, date: str, records=()) -> None:
+        super().__init__(records)
+        self.date = date
+
+
+# ── 단독 실행 테스트 (dict 행 대비 메모리/처리량) ─────────────────────────────
+if __name__ == "__main__":
+    import csv
+    import io
+    import sys
+    import time
+    import tracemalloc
+    sys.path.insert(0, str(__import__("pathlib").Path(__file__).parent.parent))
+    from modules.excel_parser import build_rows
+    from sim.fake_uia import synthetic_grid
+
+    n_days, n_agents = 365, 300
+    grid = [r for r in synthetic_grid(n_agents) if r[0]]   # 합계행 제외
+    dates = [f"2026-{m:02d}-{d:02d}" for m in range(1, 13) for d in range(1, 32)][:n_days]
+
+    def legacy_dicts(batch: DayBatch) -> list[dict]:
+        """이전 형태: 행마다 한글 키 dict."""
+        return [{"날짜": r.date, "코드": r.code, "성명": r.name,
+                 "수신합계": r.recv, "발신합계": r.sent, "총합계": r.total} for r in batch]
+
+    def legacy_values(row: dict) -> list:
+        return [row["날짜"], row["코드"], row["성명"], row["수신합계"], row["발신합계"], row["총합계"]]
+
+    for label, shape in (("dict (이전)", legacy_dicts), ("CallRecord", lambda b: b)):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        year = [shape(build_rows(d, grid)) for d in dates]
+        t_build = time.perf_counter() - t0
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        out = io.StringIO()
+        writer = csv.writer(out)
+        t0 = time.perf_counter()
+        for day in year:
+            writer.writerows(legacy_values(r) for r in day) if shape is legacy_dicts else writer.writerows(day)
+        t_write = time.perf_counter() - t0
+
+        n = sum(len(d) for d in year)
+        print(f"{label:<12} {n:,}행 | 상주 {current / 2**20:6.1f} MB ({current / n:5.0f} B/행) | "
+              f"파싱 {n / t_build:9,.0f}행/초 | 시트행 변환+CSV {n / t_write:9,.0f}행/초")
+        del year
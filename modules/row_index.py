@@ -0,0 +1,156 @@
+"""
+(날짜, 코드) → 시트 행 번호 인덱스를 로컬에 보존한다.
+
+upsert_rows가 매번 get_all_values()로 시트 전체를 읽어 키 맵을 만드는 대신
+실행 상태 옆 JSON 파일에 인덱스를 저장해 두고, 직접 수행한 update/append의
+행 번호로 갱신한다.
+
+파일 위치: ROW_INDEX_DIR/rowindex_{YYYY-MM}_{spreadsheet_id}.json
+  (로그 정리로 지워지지 않도록 PROCESSED_DIR 아래. 예전 LOG_DIR 파일은 읽어서 옮김)
+  저장은 임시 파일에 쓴 뒤 os.replace - 중간에 종료돼도 반쯤 쓴 인덱스가 남지 않음
+구조:
+{
+  "spreadsheet_id": "1BhUD...",
+  "month": "2026-02",
+  "last_row": 301,                     # 마지막 데이터 행 번호 (헤더만 있으면 1)
+  "rows": {"2026-02-01\\t1096": 2, ...}
+}
+
+사용 전 검증 (batch_get 1회, 셀 2 × (3 + SHEETS_INDEX_SAMPLES)개):
+  - 첫 데이터 행(A2:B2)과 마지막 행(A{last}:B{last})의 키가 인덱스와 일치
+  - 무작위로 고른 중간 행 SHEETS_INDEX_SAMPLES개의 키가 인덱스와 일치
+    (가운데 행 삽입/삭제·정렬처럼 양 끝이 그대로인 변경도 감지)
+  - 마지막 행 다음 행(A{last+1}:B{last+1})이 비어 있음
+불일치(다른 사용자가 행 삽입/삭제/정렬 등)면 A:B 두 컬럼만 읽어 재구성한다.
+"""
+import json
+import os
+import random
+import re
+from pathlib import Path
+from loguru import logger
+
+from config import LOG_DIR, ROW_INDEX_DIR, SHEETS_INDEX_SAMPLES
+
+_HEADER_ROW = 1
+_UPDATED_RANGE_RE = re.compile(r"!\$?[A-Z]+\$?(\d+)")
+
+
+def _index_path(spreadsheet_id: str, month: str) -> Path:
+    return ROW_INDEX_DIR / f"rowindex_{month}_{spreadsheet_id}.json"
+
+
+def _legacy_path(spreadsheet_id: str, month: str) -> Path:
+    return LOG_DIR / f"rowindex_{month}_{spreadsheet_id}.json"
+
+
+def _key_str(key: tuple) -> str:
+    return f"{key[0]}\t{key[1]}"
+
+
+def _empty(spreadsheet_id: str, month: str) -> dict:
+    return {
+        "spreadsheet_id": spreadsheet_id,
+        "month": month,
+        "last_row": _HEADER_ROW,
+        "rows": {},
+    }
+
+
+def load(spreadsheet_id: str, month: str) -> dict:
+    """인덱스 로드. 없거나 깨졌으면 빈 인덱스 (검증 단계에서 재구성됨)."""
+    for path in (_index_path(spreadsheet_id, month), _legacy_path(spreadsheet_id, month)):
+        if path.exists():
+            try:
+                return json.loads(path.read_text(encoding="utf-8"))
+            except Exception as e:
+                logger.warning(f"행 인덱스 파싱 실패, 재구성 예정: {e}")
+            break
+    return _empty(spreadsheet_id, month)
+
+
+def save(index: dict) -> None:
+    """같은 폴더 임시 파일에 쓴 뒤 교체 (원자적). 예전 LOG_DIR 파일은 삭제."""
+    path = _index_path(index["spreadsheet_id"], index["month"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(json.dumps(index, ensure_ascii=False))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _legacy_path(index["spreadsheet_id"], index["month"]).unlink(missing_ok=True)
+    logger.debug(f"행 인덱스 저장: {path} ({len(index['rows'])}키)")
+
+
+def key_to_row(index: dict) -> dict[tuple, int]:
+    """인덱스 → {(날짜, 코드): 행 번호}."""
+    return {tuple(k.split("\t", 1)): r for k, r in index["rows"].items()}
+
+
+def record(index: dict, key: tuple, row: int) -> None:
+    index["rows"][_key_str(key)] = row
+    if row > index["last_row"]:
+        index["last_row"] = row
+
+
+def from_values(spreadsheet_id: str, month: str, values: list[list]) -> dict:
+    """A:B (또는 전체) 값 목록(헤더 포함)으로 인덱스 생성."""
+    index = _empty(spreadsheet_id, month)
+    for i, vals in enumerate(values[_HEADER_ROW:], start=_HEADER_ROW + 1):
+        if len(vals) >= 2 and (vals[0] or vals[1]):
+            record(index, (vals[0], vals[1]), i)
+        elif vals and any(vals):
+            index["last_row"] = i
+    return index
+
+
+def _row_key(values: list[list]) -> tuple | None:
+    if not values or len(values[0]) < 2 or not (values[0][0] or values[0][1]):
+        return None
+    return values[0][0], values[0][1]
+
+
+def verify(ws, index: dict) -> bool:
+    """인덱스가 시트와 일치하는지 경량 검증 (batch_get 1회)."""
+    last = index["last_row"]
+    if last <= _HEADER_ROW:
+        probe = ws.batch_get([f"A{_HEADER_ROW + 1}:B{_HEADER_ROW + 1}"])
+        return _row_key(probe[0]) is None
+
+    by_row = {r: tuple(k.split("\t", 1)) for k, r in index["rows"].items()}
+    first = _HEADER_ROW + 1
+    middle = [r for r in by_row if first < r < last]
+    rows = [first, last] + random.sample(middle, min(SHEETS_INDEX_SAMPLES, len(middle)))
+    probe = ws.batch_get([f"A{r}:B{r}" for r in rows] + [f"A{last + 1}:B{last + 1}"])
+    return (
+        all(_row_key(p) == by_row.get(r) for r, p in zip(rows, probe))
+        and _row_key(probe[-1]) is None
+    )
+
+
+def resolve(ws, spreadsheet_id: str, month: str) -> dict:
+    """
+    검증된 인덱스 반환. 드리프트가 감지되면 A:B 컬럼만 읽어 재구성 후 저장.
+    """
+    index = load(spreadsheet_id, month)
+    try:
+        if verify(ws, index):
+            logger.debug(f"[{month}] 행 인덱스 캐시 사용 ({len(index['rows'])}키)")
+            return index
+    except Exception as e:
+        logger.debug(f"[{month}] 행 인덱스 검증 실패: {e}")
+
+    logger.info(f"[{month}] 행 인덱스 재구성 (A:B 컬럼 읽기)")
+    index = from_values(spreadsheet_id, month, ws.get("A:B"))
+    save(index)
+    return index
+
+
+def appended_start_row(response: dict) -> int | None:
+    """append_rows 응답의 updates.updatedRange → 첫 행 번호."""
+    try:
+        m = _UPDATED_RANGE_RE.search(response["updates"]["updatedRange"])
+        return int(m.group(1)) if m else None
+    except Exception:
+        return None
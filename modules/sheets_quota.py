@@ -0,0 +1,244 @@
+"""
+Google Sheets API 쿼터 제어 + 재시도 계층.
+
+gspread의 HTTPClient를 대체해 모든 Sheets 요청이 이 계층을 지난다.
+  - 읽기/쓰기 토큰 버킷 분리 (SHEETS_READ_PER_MIN / SHEETS_WRITE_PER_MIN)
+  - 429 / 5xx / 네트워크 오류 → full-jitter 지수 백오프 재시도
+    단, values append(POST …:append)는 다시 보내면 행이 중복되므로 429(미반영)만 재시도하고
+    5xx/네트워크 오류는 AppendUncertainError로 올린다 (호출 측이 반영 여부 확인 후 재전송)
+  - Retry-After 헤더가 있으면 그 시간 이상 대기
+  - 요청/스로틀/재시도/대기 시간/송수신 바이트 카운터 (SheetsQuota.stats())
+
+버킷과 카운터는 프로세스 전체에서 공유(shared_quota)되므로
+업로드 워커와 CSV Export 등 여러 호출 경로가 같은 한도를 나눠 쓴다.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import requests
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+from loguru import logger
+
+from config import (
+    SHEETS_READ_PER_MIN,
+    SHEETS_WRITE_PER_MIN,
+    SHEETS_BURST,
+    SHEETS_MAX_RETRIES,
+    SHEETS_BACKOFF_BASE_SEC,
+    SHEETS_BACKOFF_MAX_SEC,
+)
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+_READ_POST_MARKERS = ("batchGetByDataFilter", ":getByDataFilter")
+_APPEND_MARKERS = (":append",)
+
+
+class AppendUncertainError(RuntimeError):
+    """values append가 5xx/네트워크 오류로 끝남 - 서버가 이미 반영했을 수 있어 그대로 재시도하지 않는다."""
+
+
+class TokenBucket:
+    """스레드 안전 토큰 버킷. acquire()는 토큰이 생길 때까지 대기하고 대기 시간(초)을 반환."""
+
+    def __init__(self, per_min: float, burst: int) -> None:
+        self.rate = per_min / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self) -> float:
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                need = (1.0 - self._tokens) / self.rate
+            time.sleep(need)
+            waited += need
+
+    def drain(self) -> None:
+        """429 수신 시 남은 토큰 제거 (다른 스레드도 함께 감속)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = 0.0
+
+
+class SheetsQuota:
+    """읽기/쓰기 버킷 + 재시도 정책 + 카운터."""
+
+    def __init__(
+        self,
+        read_per_min: float = SHEETS_READ_PER_MIN,
+        write_per_min: float = SHEETS_WRITE_PER_MIN,
+        burst: int = SHEETS_BURST,
+        max_retries: int = SHEETS_MAX_RETRIES,
+        backoff_base: float = SHEETS_BACKOFF_BASE_SEC,
+        backoff_max: float = SHEETS_BACKOFF_MAX_SEC,
+    ) -> None:
+        self.read = TokenBucket(read_per_min, burst)
+        self.write = TokenBucket(write_per_min, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._stats = {
+            "reads": 0, "writes": 0,
+            "throttled": 0, "retried": 0, "failed": 0, "uncertain": 0,
+            "bucket_wait_sec": 0.0, "backoff_wait_sec": 0.0,
+            "bytes_sent": 0, "bytes_received": 0,
+        }
+
+    def bucket_for(self, method: str, endpoint: str) -> tuple[str, TokenBucket]:
+        if method.upper() == "GET" or any(m in endpoint for m in _READ_POST_MARKERS):
+            return "reads", self.read
+        return "writes", self.write
+
+    def backoff(self, attempt: int, retry_after: float | None) -> float:
+        """attempt(0부터)번째 재시도 대기 시간: full jitter, Retry-After 하한."""
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        wait = random.uniform(0, cap)
+        if retry_after is not None:
+            wait = max(wait, retry_after)
+        return wait
+
+    def count(self, key: str, value: float = 1) -> None:
+        with self._lock:
+            self._stats[key] += value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+shared_quota = SheetsQuota()
+
+
+def _retry_after_sec(value: str | None) -> float | None:
+    """Retry-After 헤더 (초 또는 HTTP-date) → 초."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def _api_error(response: requests.Response) -> Exception:
+    """gspread APIError 생성. 본문이 JSON이 아니면 requests HTTPError로 대체."""
+    try:
+        return APIError(response)
+    except Exception:
+        return requests.HTTPError(f"{response.status_code} {response.reason}", response=response)
+
+
+class QuotaHTTPClient(HTTPClient):
+    """
+    gspread HTTPClient 대체 구현. 모든 요청에 쿼터 버킷과 재시도 정책을 적용한다.
+    quota 속성을 바꿔 끼우면 별도 버킷을 사용할 수 있다 (테스트/벤치마크).
+    """
+
+    quota: SheetsQuota = shared_quota
+
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Any = None,
+        data: Any = None,
+        json: Any = None,
+        files: Any = None,
+        headers: Any = None,
+    ) -> requests.Response:
+        quota = self.quota
+        kind, bucket = quota.bucket_for(method, endpoint)
+        appending = method.upper() == "POST" and any(m in endpoint for m in _APPEND_MARKERS)
+
+        attempt = 0
+        while True:
+            quota.count("bucket_wait_sec", bucket.acquire())
+            quota.count(kind)
+
+            retry_after = None
+            try:
+                response = self.session.request(
+                    method=method,
+                    url=endpoint,
+                    json=json,
+                    params=params,
+                    data=data,
+                    files=files,
+                    headers=headers,
+                    timeout=self.timeout,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error: Exception = e
+                reason = type(e).__name__
+            else:
+                quota.count("bytes_sent", len(response.request.body or b""))
+                quota.count("bytes_received", len(response.content))
+                if response.ok:
+                    return response
+                error = _api_error(response)
+                reason = str(response.status_code)
+                if response.status_code not in _RETRY_STATUS:
+                    quota.count("failed")
+                    raise error
+                if response.status_code == 429:
+                    quota.count("throttled")
+                    bucket.drain()
+                retry_after = _retry_after_sec(response.headers.get("Retry-After"))
+
+            if appending and reason != "429":
+                quota.count("uncertain")
+                logger.warning(f"Sheets append 결과 불명 ({reason}) - 재시도하지 않음")
+                raise AppendUncertainError(f"append {reason}: {error}") from error
+
+            if attempt >= quota.max_retries:
+                quota.count("failed")
+                logger.warning(f"Sheets 요청 최종 실패 ({method} {reason}, 재시도 {attempt}회)")
+                raise error
+
+            wait = quota.backoff(attempt, retry_after)
+            attempt += 1
+            quota.count("retried")
+            quota.count("backoff_wait_sec", wait)
+            logger.debug(f"Sheets {reason} - {wait:.1f}초 후 재시도 ({attempt}/{quota.max_retries})")
+            time.sleep(wait)
+
+
+# ── 단독 실행 테스트 (로컬 429 주입 서버 대상) ────────────────────────────────
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, str(__import__("pathlib").Path(__file__).parent.parent))
+    from sim.fake_sheets_http import FakeSheetsServer, redirect_session
+
+    with FakeSheetsServer(throttle_rate=0.3, retry_after=0.05) as server:
+        client = QuotaHTTPClient(auth=None, session=redirect_session(server.url))
+        client.quota = SheetsQuota(
+            read_per_min=1200, write_per_min=600, burst=5,
+            max_retries=8, backoff_base=0.02, backoff_max=0.5,
+        )
+        t0 = time.perf_counter()
+        for i in range(40):
+            method = "GET" if i % 2 else "POST"
+            client.request(method, "https://sheets.googleapis.com/v4/spreadsheets/X/values/A1")
+        elapsed = time.perf_counter() - t0
+        print(f"40 요청 완료: {elapsed:.2f}초")
+        print(f"클라이언트 통계: {client.quota.stats()}")
+        print(f"서버 통계: {server.stats}")
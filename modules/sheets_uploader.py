@@ -4,25 +4,39 @@ Google Sheets에 파싱 데이터를 Upsert한다. (D18~D-NEW3)
 - 시트명: YYYY-MM
 - 유니크 키: (날짜, 코드)
 - 동일 키 존재 시 → 업데이트, 없으면 → append
+- 키 → 행 번호 맵은 modules.row_index의 로컬 캐시 사용 (시트 전체 재다운로드 없음)
 - 멱등성 보장: 재실행해도 데이터 중복 없음
+- 스냅샷 게시(publish_snapshot): 로컬 월 저장소 기준 월 전체 블록을 values update 1회로 기록
+  (직전 블록을 이 코드가 썼고 시트가 그대로면 읽지 않음 - flush마다 월 전체를 다시 받으면 일수² 트래픽.
+   처음이거나 시트가 바뀌었으면 한 번 읽어 저장소에 없는 행을 병합한 뒤 쓴다)
 """
+import itertools
+import threading
 from pathlib import Path
+from typing import Iterator, Sequence
 from loguru import logger
 
 import gspread
 from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
 
-from config import SHEET_HEADERS
+from config import SHEET_HEADERS, CSV_CHUNK_ROWS, SHEETS_MAX_RETRIES
+from modules import month_store, row_index
+from modules.records import CallRecord
+from modules.sheets_quota import AppendUncertainError, QuotaHTTPClient, SheetsQuota, shared_quota
+from modules.tracing import traced
 
 _SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive",
 ]
+_POOL_SIZE = 4   # keep-alive 커넥션 풀 크기
 
 
 def _build_client(sa_json_path: Path) -> gspread.Client:
     creds = Credentials.from_service_account_file(str(sa_json_path), scopes=_SCOPES)
-    return gspread.authorize(creds)
+    # 모든 요청이 쿼터 버킷 + 재시도 계층(QuotaHTTPClient)을 거친다
+    return gspread.authorize(creds, http_client=QuotaHTTPClient)
 
 
 def _get_or_create_sheet(spreadsheet: gspread.Spreadsheet, month: str) -> gspread.Worksheet:
@@ -33,35 +47,125 @@ def _get_or_create_sheet(spreadsheet: gspread.Spreadsheet, month: str) -> gsprea
         return ws
     except gspread.WorksheetNotFound:
         ws = spreadsheet.add_worksheet(title=month, rows=5000, cols=len(SHEET_HEADERS))
-        ws.append_row(SHEET_HEADERS, value_input_option="RAW")
+        # 헤더는 append가 아닌 A1 update (재시도해도 중복되지 않음)
+        ws.update(values=[SHEET_HEADERS], range_name="A1:F1", value_input_option="RAW")
         logger.info(f"새 시트 생성: {month}")
         return ws
 
 
-def _row_to_values(row: dict) -> list:
-    """dict → 시트 행 순서 리스트 [날짜, 코드, 성명, 수신합계, 발신합계, 총합계]."""
-    return [
-        row["날짜"],
-        row["코드"],
-        row["성명"],
-        row["수신합계"],
-        row["발신합계"],
-        row["총합계"],
-    ]
+class SheetsSession:
+    """
+    실행(run) 단위로 한 번 만드는 Sheets 연결.
+
+    - 인증된 gspread Client 1개 (서비스 계정 JSON은 최초 1회만 로드)
+    - keep-alive HTTP 커넥션 풀 (AuthorizedSession이 토큰 만료 시에만 갱신)
+    - Spreadsheet / 월별 Worksheet 핸들 캐시 (_get_or_create_sheet 결과 포함)
+    - 읽기/쓰기 쿼터 버킷 + 재시도 (기본: 프로세스 공유 shared_quota)
+
+    사용 예:
+        session = SheetsSession(sa_json_path, spreadsheet_id)
+        upsert_rows(session, "2026-02", rows)
+        read_all_rows(session, "2026-02")
+    """
+
+    def __init__(
+        self,
+        sa_json_path: Path,
+        spreadsheet_id: str,
+        pool_size: int = _POOL_SIZE,
+        quota: SheetsQuota | None = None,
+    ) -> None:
+        self.sa_json_path = sa_json_path
+        self.spreadsheet_id = spreadsheet_id
+        self.quota = quota or shared_quota
+        self._pool_size = pool_size
+        self._client: gspread.Client | None = None
+        self._spreadsheet: gspread.Spreadsheet | None = None
+        self._worksheets: dict[str, gspread.Worksheet] = {}
+        self._lock = threading.Lock()
+
+    def _new_client(self) -> gspread.Client:
+        """인증된 gspread Client 생성 (sim.fake_sheets_api는 로컬 HTTP 대역으로 대체)."""
+        return _build_client(self.sa_json_path)
+
+    @property
+    def client(self) -> gspread.Client:
+        if self._client is None:
+            client = self._new_client()
+            adapter = HTTPAdapter(pool_connections=self._pool_size, pool_maxsize=self._pool_size)
+            client.http_client.session.mount("https://", adapter)
+            client.http_client.quota = self.quota
+            self._client = client
+            logger.debug("Sheets 클라이언트 인증 완료")
+        return self._client
+
+    @property
+    def spreadsheet(self) -> gspread.Spreadsheet:
+        if self._spreadsheet is None:
+            self._spreadsheet = self.client.open_by_key(self.spreadsheet_id)
+        return self._spreadsheet
+
+    def worksheet(self, month: str, create: bool = True) -> gspread.Worksheet | None:
+        """월 시트 핸들. create=False면 없을 때 None."""
+        with self._lock:
+            ws = self._worksheets.get(month)
+            if ws is not None:
+                return ws
+            if create:
+                ws = _get_or_create_sheet(self.spreadsheet, month)
+            else:
+                try:
+                    ws = self.spreadsheet.worksheet(month)
+                except gspread.WorksheetNotFound:
+                    return None
+            self._worksheets[month] = ws
+            return ws
+
+    def invalidate(self) -> None:
+        """캐시된 Spreadsheet/Worksheet 핸들 폐기 (시트 삭제/이름 변경 등)."""
+        with self._lock:
+            self._spreadsheet = None
+            self._worksheets.clear()
+
+
+def _append_once(ws, spreadsheet_id: str, month: str, index: dict,
+                 appends: list[CallRecord]) -> tuple[dict, list[CallRecord], dict | None]:
+    """
+    append_rows를 중복 없이 수행. 결과 불명(AppendUncertainError)이면 A:B로 행 인덱스를
+    재구성해 이미 반영된 행을 빼고 남은 행만 다시 보낸다 (append는 전부 반영되거나 전부 아님).
 
+    Returns:
+        (행 인덱스, 마지막으로 실제 전송한 행, 그 응답) - 모두 반영돼 있었으면 ([], None)
+    """
+    attempt = 0
+    while True:
+        try:
+            return index, appends, ws.append_rows(appends, value_input_option="RAW")
+        except AppendUncertainError as e:
+            if attempt >= SHEETS_MAX_RETRIES:
+                raise
+            attempt += 1
+            logger.warning(f"[{month}] append 결과 불명 - 시트 A:B로 반영 여부 확인 ({e})")
+            index = row_index.from_values(spreadsheet_id, month, ws.get("A:B"))
+            row_index.save(index)
+            landed = row_index.key_to_row(index)
+            appends = [r for r in appends if r[:2] not in landed]
+            if not appends:
+                logger.info(f"[{month}] 불명 append가 이미 반영됨 - 재전송 생략")
+                return index, [], None
 
+
+@traced()
 def upsert_rows(
-    sa_json_path: Path,
-    spreadsheet_id: str,
+    session: SheetsSession,
     month: str,
-    rows: list[dict],
+    rows: list[CallRecord],
 ) -> int:
     """
     Args:
-        sa_json_path: 서비스 계정 JSON 경로
-        spreadsheet_id: Google Spreadsheet ID
+        session: 실행 단위 SheetsSession
         month: 'YYYY-MM'
-        rows: excel_parser.parse_open_excel() 반환값
+        rows: CallRecord 목록 (여러 날짜가 섞여 있어도 됨). 레코드가 곧 시트 행 값.
 
     Returns:
         upsert된 행 수
@@ -70,32 +174,17 @@ def upsert_rows(
         logger.info(f"[{month}] upsert 대상 없음")
         return 0
 
-    client = _build_client(sa_json_path)
-    spreadsheet = client.open_by_key(spreadsheet_id)
-    ws = _get_or_create_sheet(spreadsheet, month)
+    ws = session.worksheet(month)
 
-    # 현재 시트 전체 읽기 (헤더 제외)
-    all_values = ws.get_all_values()
-    if not all_values:
-        existing_data: list[list] = []
-        data_start_row = 2  # 헤더가 없는 경우
-    else:
-        existing_data = all_values[1:]  # 헤더 제외
-        data_start_row = 2
-
-    # (날짜, 코드) → 시트 행 인덱스(1-based) 맵 작성
-    key_to_row: dict[tuple, int] = {}
-    for i, row_vals in enumerate(existing_data):
-        if len(row_vals) >= 2:
-            key = (row_vals[0], row_vals[1])  # (날짜, 코드)
-            key_to_row[key] = data_start_row + i
+    # (날짜, 코드) → 시트 행 인덱스(1-based) 맵: 로컬 인덱스 검증 후 사용, 드리프트 시 A:B 재구성
+    index = row_index.resolve(ws, session.spreadsheet_id, month)
+    key_to_row = row_index.key_to_row(index)
 
     batch_updates: list[dict] = []  # gspread batch_update용
-    appends: list[list] = []
+    appends: list[CallRecord] = []
 
     for row in rows:
-        key = (row["날짜"], row["코드"])
-        values = _row_to_values(row)
+        key = row[:2]   # (날짜, 코드)
 
         if key in key_to_row:
             sheet_row = key_to_row[key]
@@ -103,10 +192,10 @@ def upsert_rows(
             cell_range = f"A{sheet_row}:F{sheet_row}"
             batch_updates.append({
                 "range": cell_range,
-                "values": [values],
+                "values": [row],
             })
         else:
-            appends.append(values)
+            appends.append(row)
 
     upserted = 0
 
@@ -116,30 +205,101 @@ def upsert_rows(
         upserted += len(batch_updates)
         logger.debug(f"[{month}] 업데이트 {len(batch_updates)}행")
 
-    # 신규 append
+    # 신규 append → 응답의 updatedRange로 인덱스 갱신
     if appends:
-        ws.append_rows(appends, value_input_option="RAW")
         upserted += len(appends)
         logger.debug(f"[{month}] 신규 추가 {len(appends)}행")
+        index, sent, resp = _append_once(ws, session.spreadsheet_id, month, index, appends)
+
+        if sent:   # 비었으면 불명 append가 이미 반영돼 재구성한 인덱스에 들어 있음
+            start = row_index.appended_start_row(resp)
+            if start is None:
+                # 행 번호를 알 수 없으면 다음 호출에서 검증 실패 → 재구성
+                logger.debug(f"[{month}] append 위치 확인 불가 - 행 인덱스 무효화")
+                index["last_row"] = 0
+            else:
+                for offset, values in enumerate(sent):
+                    row_index.record(index, (values[0], values[1]), start + offset)
+            row_index.save(index)
 
     logger.info(f"[{month}] Sheets upsert 완료 — 총 {upserted}행")
     return upserted
 
 
+@traced()
+def publish_snapshot(
+    session: SheetsSession,
+    month: str,
+    rows: list[CallRecord],
+) -> int:
+    """
+    월 시트 전체 블록을 values update 한 번으로 다시 쓴다. (스냅샷 게시)
+
+    로컬 월 저장소(원본)의 행에 rows를 (날짜, 코드) 키로 병합하고 날짜/코드 순으로 정렬해
+    A1부터 덮어쓴다. upsert_rows의 batch_update + append_rows 2회 쓰기를 1회로 줄인다.
+
+    행 인덱스가 직전 스냅샷의 것이고 검증(row_index.verify)을 통과하면 시트는 읽지 않는다.
+    아니면(첫 게시, 다른 PC/수동 편집, upsert 모드로 쓴 시트) 시트를 한 번 읽어 저장소에 없는 행을
+    month_store.merge_sheet_rows로 합친 뒤 쓴다 - 블록에 없는 행을 덮어써 지우지 않도록.
+    블록이 짧아지면 이 코드가 쓴(또는 방금 합친) 마지막 행까지만 빈 행으로 지운다.
+
+    Returns:
+        게시된 데이터 행 수 (헤더 제외)
+    """
+    if not rows:
+        logger.info(f"[{month}] 스냅샷 게시 대상 없음")
+        return 0
+
+    ws = session.worksheet(month)
+
+    index = row_index.load(session.spreadsheet_id, month)
+    try:
+        owned = bool(index.get("snapshot")) and row_index.verify(ws, index)
+    except Exception as e:
+        logger.debug(f"[{month}] 행 인덱스 검증 실패: {e}")
+        owned = False
+    if owned:
+        written = index["last_row"]
+    else:
+        logger.info(f"[{month}] 스냅샷 전 시트 읽기 - 로컬 저장소에 없는 행 병합")
+        sheet_rows = list(itertools.chain.from_iterable(iter_sheet_rows(session, month)))
+        month_store.merge_sheet_rows(month, sheet_rows)
+        written = 1 + len(sheet_rows)
+
+    merged: dict[tuple, Sequence] = {r.key: r for r in month_store.read_month(month)}
+    for row in rows:
+        merged[row[:2]] = row
+
+    block = [SHEET_HEADERS] + [list(merged[k]) for k in sorted(merged)]
+    written = min(written, ws.row_count)
+    padded = block + [[""] * len(SHEET_HEADERS)] * max(0, written - len(block))
+
+    if len(block) > ws.row_count:
+        ws.add_rows(len(block) - ws.row_count)
+    ws.update(
+        values=padded,
+        range_name=f"A1:F{len(padded)}",
+        value_input_option="RAW",
+    )
+
+    index = row_index.from_values(session.spreadsheet_id, month, block)
+    index["snapshot"] = True   # 다음 스냅샷은 이 블록 기준 (검증 통과 시 시트를 읽지 않음)
+    row_index.save(index)
+
+    logger.info(f"[{month}] Sheets 스냅샷 게시 완료 — 총 {len(block) - 1}행 (신규/갱신 {len(rows)}행)")
+    return len(block) - 1
+
+
 def read_all_rows(
-    sa_json_path: Path,
-    spreadsheet_id: str,
+    session: SheetsSession,
     month: str,
 ) -> list[list]:
     """
     월 시트의 전체 데이터(헤더 제외)를 반환.
     CSV export에서 사용.
     """
-    client = _build_client(sa_json_path)
-    spreadsheet = client.open_by_key(spreadsheet_id)
-    try:
-        ws = spreadsheet.worksheet(month)
-    except gspread.WorksheetNotFound:
+    ws = session.worksheet(month, create=False)
+    if ws is None:
         logger.warning(f"시트 없음: {month}")
         return []
 
@@ -149,6 +309,34 @@ def read_all_rows(
     return all_values[1:]  # 헤더 제외
 
 
+def iter_sheet_rows(
+    session: SheetsSession,
+    month: str,
+    window_rows: int = CSV_CHUNK_ROWS,
+) -> Iterator[list[list]]:
+    """
+    월 시트 데이터(헤더 제외)를 window_rows행 구간씩 읽어 내주는 제너레이터.
+    각 행은 SHEET_HEADERS 폭으로 채워지므로 get_all_values()[1:]과 같은 내용이다.
+    """
+    ws = session.worksheet(month, create=False)
+    if ws is None:
+        logger.warning(f"시트 없음: {month}")
+        return
+
+    width = len(SHEET_HEADERS)
+    last_col = chr(ord("A") + width - 1)
+    start = 2   # 1행은 헤더
+    while True:
+        end = start + window_rows - 1
+        values = ws.get(f"A{start}:{last_col}{end}")
+        if not values or values == [[]]:   # 빈 구간은 [[]]로 온다
+            return
+        yield [list(v) + [""] * (width - len(v)) for v in values]
+        if len(values) < window_rows:   # API는 구간 끝의 빈 행을 잘라서 준다
+            return
+        start = end + 1
+
+
 # ── 단독 실행 테스트 ──────────────────────────────────────────────────────────
 if __name__ == "__main__":
     import sys
@@ -160,14 +348,10 @@ if __name__ == "__main__":
     load_env()
 
     test_rows = [
-        {"날짜": "2026-02-01", "코드": "T001", "성명": "테스트", "수신합계": 10, "발신합계": 5, "총합계": 15},
-        {"날짜": "2026-02-01", "코드": "T002", "성명": "홍길동", "수신합계": 8, "발신합계": 3, "총합계": 11},
+        CallRecord("2026-02-01", "T001", "테스트", 10, 5, 15),
+        CallRecord("2026-02-01", "T002", "홍길동", 8, 3, 11),
     ]
 
-    n = upsert_rows(
-        sa_json_path=get_google_sa_json_path(),
-        spreadsheet_id=get_spreadsheet_id(),
-        month="2026-02",
-        rows=test_rows,
-    )
+    session = SheetsSession(get_google_sa_json_path(), get_spreadsheet_id())
+    n = upsert_rows(session, month="2026-02", rows=test_rows)
     print(f"upsert 행 수: {n}")
@@ -0,0 +1,68 @@
+"""
+Sheets 쓰기 지연(write-behind) 버퍼.
+
+날짜별로 upsert_rows를 호출하면 매번 시트 전체를 다운로드하므로
+한 달 실행 시 O(일수²) 바이트를 읽는다. 여러 날짜의 파싱 결과를 모아
+한 번의 키 기반 upsert(또는 스냅샷 게시)로 내보낸다.
+
+flush 시점은 modules.outbox의 flusher가 정한다 (SHEETS_FLUSH_MAX_ROWS / SHEETS_FLUSH_MAX_SEC,
+실행 종료 시 drain). flusher는 outbox 배치마다 월별로 이 버퍼를 하나 만들어 채우고 flush한다.
+
+체크포인트는 해당 날짜의 행을 실은 flush가 성공한 뒤에만 갱신한다 (outbox flusher 담당).
+"""
+import time
+from typing import Callable
+from loguru import logger
+
+from modules.records import CallRecord
+
+
+class CoalescingWriter:
+    """
+    사용 예:
+        writer = CoalescingWriter(lambda rows: upsert_rows(session, month, rows))
+        writer.add("2026-02-01", rows_0201)
+        writer.add("2026-02-02", rows_0202)
+        done = writer.flush()    # ["2026-02-01", "2026-02-02"]
+    """
+
+    def __init__(self, publish: Callable[[list[CallRecord]], int]) -> None:
+        self._publish = publish
+        self._rows: dict[tuple, CallRecord] = {}     # (날짜, 코드) → 행 (같은 키는 마지막 값 유지)
+        self._dates: list[str] = []
+
+    @property
+    def pending_dates(self) -> list[str]:
+        """버퍼에 행이 남아있는 날짜 (아직 시트에 반영 안 됨)."""
+        return list(self._dates)
+
+    @property
+    def pending_rows(self) -> int:
+        return len(self._rows)
+
+    def add(self, date_str: str, rows: list[CallRecord]) -> None:
+        for row in rows:
+            self._rows[row[:2]] = row
+        if date_str not in self._dates:
+            self._dates.append(date_str)
+
+    def flush(self) -> list[str]:
+        """
+        버퍼 전체를 한 번에 게시. 성공 시 게시된 날짜 목록 반환.
+        실패 시 버퍼를 비우고 예외를 그대로 올린다 (해당 날짜는 호출 측에서 실패 처리).
+        """
+        if not self._dates:
+            return []
+
+        rows = list(self._rows.values())
+        dates = self._dates
+        self._rows = {}
+        self._dates = []
+
+        t0 = time.perf_counter()
+        self._publish(rows)
+        logger.info(
+            f"Sheets flush - {len(dates)}일 / {len(rows)}행 "
+            f"({time.perf_counter() - t0:.1f}초)"
+        )
+        return dates
@@ -3,6 +3,7 @@ Telegram으로 CSV 파일을 Document로 전송한다. (D23~D24)
 
 - 최대 3회 재시도, 지수 백오프
 - 최종 실패 시 CSV 로컬 보관 + 로그 기록
+- 월 피벗/순위 보고서(modules.month_matrix)도 같은 방식으로 전송 (send_pivot)
 """
 import time
 from pathlib import Path
@@ -15,8 +16,24 @@ from config import (
     TELEGRAM_BACKOFF_BASE,
     TELEGRAM_API_URL,
 )
+from modules.tracing import shared_tracer, traced
 
+# 전송 시도 카운터 (modules.metrics가 읽음)
+_send_stats: dict[str, int] = {"attempts": 0, "failed_attempts": 0, "sent": 0, "gave_up": 0}
 
+
+def get_send_stats() -> dict[str, int]:
+    """sendDocument 시도/실패/성공/최종 실패 횟수 사본 (프로세스 누적)."""
+    return dict(_send_stats)
+
+
+_MIME_TYPES = {
+    ".csv": "text/csv",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+@traced()
 def send_csv(
     bot_token: str,
     chat_id: str,
@@ -41,34 +58,63 @@ def send_csv(
         f"총 행수: {total_rows:,}\n"
         f"상태: SUCCESS"
     )
+    if send_document(bot_token, chat_id, csv_path, caption):
+        return True
+    logger.error(f"Telegram 최종 전송 실패 — CSV 로컬 보관: {csv_path}")
+    return False
+
 
+@traced()
+def send_pivot(bot_token: str, chat_id: str, paths: list[Path], month: str) -> bool:
+    """
+    월 피벗/순위 보고서 전송. XLSX가 있으면 그 한 파일만, 없으면 CSV 파일들을 보낸다.
+
+    Returns:
+        모두 성공하면 True
+    """
+    xlsx = [p for p in paths if p.suffix == ".xlsx"]
+    ok = True
+    for path in xlsx or paths:
+        ok = send_document(bot_token, chat_id, path, f"[로지 월 피벗/순위]\n월: {month}") and ok
+    if not ok:
+        logger.error(f"Telegram 피벗 전송 실패 — 로컬 보관: {', '.join(p.name for p in paths)}")
+    return ok
+
+
+def send_document(bot_token: str, chat_id: str, path: Path, caption: str) -> bool:
+    """파일 하나를 Document로 전송 (재시도/백오프 포함). 성공 여부 반환."""
     url = TELEGRAM_API_URL.format(token=bot_token, method="sendDocument")
+    mime = _MIME_TYPES.get(path.suffix, "application/octet-stream")
 
     for attempt in range(1, TELEGRAM_MAX_RETRIES + 1):
+        _send_stats["attempts"] += 1
         try:
-            with csv_path.open("rb") as f:
+            with shared_tracer.span("send_document", file=path.name, retry=attempt - 1), \
+                    path.open("rb") as f:
                 resp = requests.post(
                     url,
                     data={"chat_id": chat_id, "caption": caption},
-                    files={"document": (csv_path.name, f, "text/csv")},
+                    files={"document": (path.name, f, mime)},
                     timeout=60,
                 )
-            resp.raise_for_status()
+                resp.raise_for_status()
             data = resp.json()
             if data.get("ok"):
-                logger.info(f"Telegram 전송 성공: {csv_path.name} (시도 {attempt}회)")
+                _send_stats["sent"] += 1
+                logger.info(f"Telegram 전송 성공: {path.name} (시도 {attempt}회)")
                 return True
             else:
                 raise RuntimeError(f"Telegram API 오류: {data}")
 
         except Exception as e:
+            _send_stats["failed_attempts"] += 1
             wait = TELEGRAM_BACKOFF_BASE ** attempt
             logger.warning(f"Telegram 전송 실패 (시도 {attempt}/{TELEGRAM_MAX_RETRIES}): {e}")
             if attempt < TELEGRAM_MAX_RETRIES:
                 logger.info(f"{wait}초 후 재시도...")
                 time.sleep(wait)
 
-    logger.error(f"Telegram 최종 전송 실패 — CSV 로컬 보관: {csv_path}")
+    _send_stats["gave_up"] += 1
     return False
 
 
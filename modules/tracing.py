@@ -0,0 +1,208 @@
+"""
+단계별 span 추적 → Chrome/Perfetto trace JSON + 단계별 p50/p95/max 표.
+
+월 실행이 한 시간씩 걸려도 로그의 자유 텍스트만으로는 시간이 어디에 쓰였는지 알기 어렵다.
+각 단계를 span으로 감싸 시작 시각/소요 시간/스레드/태그(date, attempt 등)를 기록하고
+실행 종료 시 LOG_DIR/trace_{YYYY-MM}.json으로 저장한다 (ui.perfetto.dev 또는
+chrome://tracing에서 열기). UI 스레드/업로드 워커/다이얼로그 감시 스레드가 각각 한 줄로 보인다.
+
+    @traced("upsert_rows")
+    def upsert_rows(...): ...
+
+    with shared_tracer.tags(date="2026-02-18", attempt=1):    # 이 스레드의 이후 span에 붙는 태그
+        with shared_tracer.span("extract_day") as sp:
+            rows = ...
+            sp["rows"] = len(rows)                             # 결과 값을 태그로 추가
+
+    shared_tracer.finish("2026-02")    # trace 파일 저장 + 표 로그
+
+태그: date(처리 날짜, flush는 "첫날~마지막날"), attempt(날짜 시도 회차 - 이전 실행 실패 횟수 + 1),
+      retry(함수 안 재시도 순번, 0부터), error(예외 종류)
+TRACE_ENABLED=False면 span은 아무것도 기록하지 않는다.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from loguru import logger
+
+from config import LOG_DIR, TRACE_ENABLED, TRACE_FILENAME_FMT
+from modules.latency import percentile
+
+
+class Tracer:
+    def __init__(self, enabled: bool = TRACE_ENABLED) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        """기록 초기화 (실행 시작 시). 기준 시각도 새로 잡는다."""
+        with self._lock:
+            self._t0 = time.perf_counter_ns()
+            self._events: list[tuple[str, int, int, int, dict]] = []   # (이름, 시작ns, 소요ns, tid, 태그)
+            self._threads: dict[int, str] = {}
+
+    # ── 기록 ─────────────────────────────────────────────────────────────────
+
+    def _tags(self) -> dict:
+        return getattr(self._local, "tags", {})
+
+    @contextmanager
+    def tags(self, **tags):
+        """블록 안에서 이 스레드가 여는 span에 tags를 붙인다 (중첩 시 안쪽 값 우선)."""
+        prev = self._tags()
+        self._local.tags = {**prev, **tags}
+        try:
+            yield
+        finally:
+            self._local.tags = prev
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """
+        name 단계의 span. 현재 스레드 태그 + args가 기록된다.
+        yield하는 dict에 값을 넣으면 함께 기록된다. 예외는 error 태그를 달고 그대로 전파.
+        """
+        merged = {**self._tags(), **args}
+        if not self.enabled:
+            yield merged
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield merged
+        except BaseException as e:
+            merged["error"] = type(e).__name__
+            raise
+        finally:
+            end = time.perf_counter_ns()
+            thread = threading.current_thread()
+            tid = thread.native_id or thread.ident or 0
+            with self._lock:
+                self._events.append((name, start - self._t0, end - start, tid, merged))
+                self._threads.setdefault(tid, thread.name)
+
+    def add(self, name: str, seconds: float, **args) -> None:
+        """외부에서 잰 구간을 방금 끝난 span으로 기록."""
+        if not self.enabled:
+            return
+        end = time.perf_counter_ns()
+        dur = int(seconds * 1e9)
+        thread = threading.current_thread()
+        tid = thread.native_id or thread.ident or 0
+        with self._lock:
+            self._events.append((name, end - dur - self._t0, dur, tid, {**self._tags(), **args}))
+            self._threads.setdefault(tid, thread.name)
+
+    # ── 집계/내보내기 ─────────────────────────────────────────────────────────
+
+    def stage_seconds(self) -> dict[str, list[float]]:
+        """단계 이름 → 소요 시간(초) 목록 (기록 순)."""
+        with self._lock:
+            events = list(self._events)
+        out: dict[str, list[float]] = {}
+        for name, _, dur, _, _ in events:
+            out.setdefault(name, []).append(dur / 1e9)
+        return out
+
+    def report(self) -> str:
+        """단계별 횟수 / p50 / p95 / max / 합계 (합계 내림차순)."""
+        stages = self.stage_seconds()
+        if not stages:
+            return "추적: 기록 없음"
+        width = max(14, *(len(s) for s in stages))
+        lines = [f"{'단계':<{width}} {'횟수':>5} {'p50':>7} {'p95':>7} {'max':>7} {'합계':>8}"]
+        for name, secs in sorted(stages.items(), key=lambda kv: -sum(kv[1])):
+            lines.append(
+                f"{name:<{width}} {len(secs):>5} {percentile(secs, 50):>7.2f} "
+                f"{percentile(secs, 95):>7.2f} {max(secs):>7.2f} {sum(secs):>8.1f}"
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict:
+        """Trace Event Format (완료 이벤트 "X" + 스레드 이름 메타데이터 "M")."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        trace = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        for name, start, dur, tid, args in events:
+            trace.append({
+                "name": name, "cat": "logi", "ph": "X", "pid": pid, "tid": tid,
+                "ts": start / 1000, "dur": dur / 1000,
+                "args": {k: v if isinstance(v, (int, float, bool)) else str(v) for k, v in args.items()},
+            })
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.chrome_trace(), ensure_ascii=False), encoding="utf-8")
+        return path
+
+    def finish(self, month: str) -> Path | None:
+        """실행 종료: trace_{month}.json 저장 + 단계별 표 로그. 실패해도 예외 없음."""
+        if not self.enabled:
+            return None
+        logger.info(f"단계별 소요 시간 (초):\n{self.report()}")
+        try:
+            path = self.write(LOG_DIR / TRACE_FILENAME_FMT.format(month=month))
+        except Exception as e:
+            logger.warning(f"trace 저장 실패(무시): {e}")
+            return None
+        logger.info(f"trace 저장: {path} (ui.perfetto.dev에서 열기)")
+        return path
+
+
+shared_tracer = Tracer()
+
+
+def traced(name: str | None = None):
+    """함수 호출 전체를 shared_tracer span으로 감싸는 데코레이터 (기본 이름 = 함수 이름)."""
+    def decorate(fn):
+        stage = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with shared_tracer.span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ── 단독 실행 테스트 ──────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    tracer = Tracer(enabled=True)
+    rng = random.Random(0)
+
+    def worker() -> None:
+        for i in range(5):
+            with tracer.tags(date=f"2026-02-{i + 1:02d}"), tracer.span("upsert_rows") as sp:
+                time.sleep(rng.uniform(0.01, 0.03))
+                sp["rows"] = 300
+
+    t = threading.Thread(target=worker, name="upload-worker")
+    t.start()
+    for i in range(5):
+        with tracer.tags(date=f"2026-02-{i + 1:02d}", attempt=1), tracer.span("extract_day"):
+            with tracer.span("query_date"):
+                time.sleep(rng.uniform(0.02, 0.05))
+            for retry in range(2):
+                with tracer.span("_set_datetime_field", field=0, retry=retry):
+                    time.sleep(0.005)
+    t.join()
+
+    print(tracer.report())
+    out = tracer.write(Path(tempfile.gettempdir()) / "trace_TEST.json")
+    events = json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
+    assert sum(e["ph"] == "X" for e in events) == 5 + 5 + 5 + 10
+    print(f"{out} ({len(events)} events)")
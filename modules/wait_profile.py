@@ -0,0 +1,180 @@
+"""
+로지 UI 대기 엔진 - 고정 sleep 대신 준비 조건 + 학습된 제한 시간.
+
+단계(step)마다 실제로 걸린 시간을 기록해 LOG_DIR/wait_profile.json 에 보존하고
+다음 실행에서 제한 시간(budget)을 자동으로 줄이거나 늘린다.
+
+두 종류의 대기:
+  wait_until(step, cond)  준비 조건을 짧은 간격으로 확인. 조건이 참이 되는 즉시 반환.
+                          budget = 관측 p95 × WAIT_BUDGET_MARGIN (처음엔 ceiling)
+                          타임아웃이 나면 다음 budget을 2배로 늘림.
+  pause(step)             관측할 신호가 없는 대기 (키 입력 사이 간격 등).
+                          feedback(step, ok)로 결과를 알려주면
+                          성공 시 20% 줄이고 실패 시 2배로 늘린다.
+
+report()는 단계별 기존 고정 대기(legacy) 대비 이번 실행에서 절약한 시간을 보여준다.
+
+파일 구조:
+{
+  "date.enter": {"samples": [0.08, 0.11, ...], "budget": 0.4, "legacy": 0.2},
+  ...
+}
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable
+from loguru import logger
+
+from config import WAIT_PROFILE_PATH, WAIT_SAMPLES_KEEP, WAIT_BUDGET_MARGIN, WAIT_MIN_SEC
+from modules.latency import percentile
+
+_PAUSE_SHRINK = 0.8
+_GROW = 2.0
+
+
+class WaitEngine:
+    def __init__(self, path: Path = WAIT_PROFILE_PATH) -> None:
+        self.path = path
+        self.profile: dict[str, dict] = self._load()
+        self._run: dict[str, dict] = {}     # 이번 실행: step → {calls, waited, legacy, timeouts}
+
+    # ── 프로파일 파일 ────────────────────────────────────────────────────────
+
+    def _load(self) -> dict:
+        if self.path.exists():
+            try:
+                return json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception as e:
+                logger.warning(f"대기 프로파일 파싱 실패, 초기화: {e}")
+        return {}
+
+    def save(self) -> None:
+        """단계별 p50/p95를 함께 기록해 저장. 같은 폴더 임시 파일에 쓴 뒤 교체 (원자적)."""
+        for step, entry in self.profile.items():
+            entry["p50"] = round(percentile(entry["samples"], 50), 3)
+            entry["p95"] = round(percentile(entry["samples"], 95), 3)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write(json.dumps(self.profile, ensure_ascii=False, indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        logger.debug(f"대기 프로파일 저장: {self.path} ({len(self.profile)}단계)")
+
+    def _entry(self, step: str, legacy: float, initial: float) -> dict:
+        entry = self.profile.setdefault(step, {"samples": [], "budget": initial})
+        entry["legacy"] = legacy
+        return entry
+
+    def _record(self, step: str, entry: dict, waited: float, legacy: float, timed_out: bool) -> None:
+        entry["samples"] = (entry["samples"] + [round(waited, 3)])[-WAIT_SAMPLES_KEEP:]
+        run = self._run.setdefault(step, {"calls": 0, "waited": 0.0, "legacy": 0.0, "timeouts": 0})
+        run["calls"] += 1
+        run["waited"] += waited
+        run["legacy"] += legacy
+        run["timeouts"] += int(timed_out)
+
+    # ── 대기 ─────────────────────────────────────────────────────────────────
+
+    def budget(self, step: str) -> float | None:
+        entry = self.profile.get(step)
+        return entry["budget"] if entry else None
+
+    def wait_until(
+        self,
+        step: str,
+        cond: Callable[[], bool],
+        legacy: float,
+        ceiling: float,
+    ) -> bool:
+        """
+        cond()가 참이 될 때까지 대기. 조건 확인 중 예외는 거짓으로 본다.
+
+        Args:
+            legacy: 이 단계가 예전에 쓰던 고정 sleep (절약 시간 보고용)
+            ceiling: 제한 시간 상한. 처음 실행 시 budget 기본값.
+        Returns:
+            조건 충족 여부 (False = 제한 시간 초과)
+        """
+        entry = self._entry(step, legacy, ceiling)
+        budget = min(ceiling, max(WAIT_MIN_SEC, entry["budget"]))
+        p50 = percentile(entry["samples"], 50)
+        poll = min(0.25, max(0.02, p50 / 4)) if p50 else 0.05
+
+        t0 = time.perf_counter()
+        while True:
+            try:
+                ok = bool(cond())
+            except Exception:
+                ok = False
+            waited = time.perf_counter() - t0
+            if ok or waited >= budget:
+                break
+            time.sleep(min(poll, max(0.0, budget - waited)))
+
+        self._record(step, entry, waited, legacy, timed_out=not ok)
+        if ok:
+            p95 = percentile(entry["samples"], 95)
+            entry["budget"] = round(min(ceiling, max(WAIT_MIN_SEC, p95 * WAIT_BUDGET_MARGIN)), 3)
+        else:
+            entry["budget"] = round(min(ceiling, budget * _GROW), 3)
+            logger.debug(f"  대기 '{step}' 제한 시간 초과 ({budget:.2f}초) → 다음 {entry['budget']:.2f}초")
+        return ok
+
+    def pause(self, step: str, legacy: float) -> None:
+        """관측 신호 없는 대기. 학습된 budget(처음엔 legacy)만큼 sleep."""
+        entry = self._entry(step, legacy, legacy)
+        budget = max(WAIT_MIN_SEC, entry["budget"])
+        time.sleep(budget)
+        self._record(step, entry, budget, legacy, timed_out=False)
+
+    def feedback(self, step: str, ok: bool, ceiling: float | None = None) -> None:
+        """pause() 단계 결과 통보. 성공 시 budget 축소, 실패 시 확대(ceiling 이하)."""
+        entry = self.profile.get(step)
+        if entry is None:
+            return
+        if ok:
+            entry["budget"] = round(max(WAIT_MIN_SEC, entry["budget"] * _PAUSE_SHRINK), 3)
+        else:
+            grown = entry["budget"] * _GROW
+            cap = ceiling if ceiling is not None else max(entry["legacy"] * 4, WAIT_MIN_SEC)
+            entry["budget"] = round(min(cap, grown), 3)
+            logger.debug(f"  대기 '{step}' 실패 통보 → budget {entry['budget']:.2f}초")
+
+    # ── 보고 ─────────────────────────────────────────────────────────────────
+
+    def report(self) -> str:
+        """이번 실행의 단계별 대기 시간 vs 기존 고정 sleep 합계."""
+        if not self._run:
+            return "대기 엔진: 기록 없음"
+        lines = [f"{'단계':<14} {'횟수':>4} {'p50':>6} {'p95':>6} {'budget':>7} {'대기합':>7} {'기존합':>7} {'절약':>7}"]
+        total_saved = 0.0
+        for step in sorted(self._run):
+            run = self._run[step]
+            entry = self.profile[step]
+            saved = run["legacy"] - run["waited"]
+            total_saved += saved
+            timeouts = f" (초과 {run['timeouts']})" if run["timeouts"] else ""
+            lines.append(
+                f"{step:<14} {run['calls']:>4} "
+                f"{percentile(entry['samples'], 50):>6.2f} {percentile(entry['samples'], 95):>6.2f} "
+                f"{entry['budget']:>7.2f} {run['waited']:>7.1f} {run['legacy']:>7.1f} {saved:>+7.1f}{timeouts}"
+            )
+        lines.append(f"총 절약: {total_saved:+.1f}초")
+        return "\n".join(lines)
+
+
+# ── 단독 실행: 저장된 프로파일 보기 ──────────────────────────────────────────
+if __name__ == "__main__":
+    engine = WaitEngine()
+    if not engine.profile:
+        print(f"프로파일 없음: {engine.path}")
+    for step, entry in sorted(engine.profile.items()):
+        s = entry["samples"]
+        print(
+            f"{step:<14} n={len(s):>3} p50={percentile(s, 50):.2f}s p95={percentile(s, 95):.2f}s "
+            f"budget={entry['budget']:.2f}s legacy={entry.get('legacy', 0):.2f}s"
+        )
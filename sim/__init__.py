@@ -0,0 +1,11 @@
+"""
+Windows/로지/Excel 없이 파이프라인을 실행·측정하기 위한 가짜 백엔드 모음.
+
+  fake_uia          로지 UIA 트리 (debug_controls_output.txt 구조, 가상화 Report 그리드)
+  fake_logi         조회/엑셀로보기 동작 + SimLogiAutomation
+  fake_excel        Excel.Application 객체 모델 (FakeExcelConnection)
+  fake_sheets_http  Google API 로컬 HTTP 대역 (지연/429/5xx 주입)
+  fake_sheets_api   Sheets API v4 메모리 구현 + SimSheetsSession
+  fake_telegram     Telegram sendDocument 대역
+  bench             main.run() 종단 간 벤치마크 (python -m sim.bench)
+"""
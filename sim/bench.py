@@ -0,0 +1,359 @@
+"""
+전체 파이프라인 종단 간 시뮬레이션 벤치마크.
+
+가짜 로지(sim.fake_logi) / Excel COM(sim.fake_excel) / Sheets API(sim.fake_sheets_api) /
+Telegram(sim.fake_telegram) 위에서 main.run()을 그대로 실행하고 다음을 잰다:
+  - 단계별 누적 시간 (조회, 그리드/Excel 추출, 로컬 저장, Sheets flush, CSV, 피벗, 전송)
+  - API 호출 수 (Sheets 종류별, Telegram, 로지 조회/내보내기, 그리드 스크롤)
+  - 최대 메모리 (프로세스 peak RSS)
+  - 결과 검증 (CSV 행 수 / 시트 행 수 = 완료 일수 × 상담원 수)
+
+시나리오마다 하위 프로세스를 띄운다 - config 경로(LOGI_DATA_DIR)와 peak RSS를 분리하기 위함.
+
+    python -m sim.bench                     # 기본 시나리오 실행 후 기준선과 비교 (회귀 시 exit 1)
+    python -m sim.bench --quick             # 7일 × 소규모 (빠른 확인)
+    python -m sim.bench --update-baseline   # 결과를 sim/bench_baseline.json에 기록
+    python -m sim.bench --query-latency 0.5 --sheets-error-rate 0.1 --no-compare
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from calendar import monthrange
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+BASELINE_PATH = Path(__file__).parent / "bench_baseline.json"
+RESULT_MARK = "BENCH_RESULT "
+
+BENCH_MONTH = "2026-01"
+SCENARIOS = {
+    "grid-300":   {"mode": "grid",  "agents": 300,  "days": 31},
+    "grid-3000":  {"mode": "grid",  "agents": 3000, "days": 31},
+    "excel-300":  {"mode": "excel", "agents": 300,  "days": 31},
+    "excel-3000": {"mode": "excel", "agents": 3000, "days": 31},
+}
+QUICK_SCENARIOS = {
+    "grid-300-quick":  {"mode": "grid",  "agents": 300, "days": 7},
+    "excel-300-quick": {"mode": "excel", "agents": 300, "days": 7},
+}
+
+# 회귀 판정 - 시간은 비율 + 절대 여유(짧은 단계의 흔들림), 호출 수는 증가 금지, 메모리는 비율
+TIME_RATIO = 1.3
+TIME_FLOOR_SEC = 0.25
+MEMORY_RATIO = 1.2
+
+_FAKE_ENV = {
+    "LOGI_ID": "sim", "LOGI_PW": "sim",
+    "TELEGRAM_BOT_TOKEN": "sim-token", "TELEGRAM_CHAT_ID": "sim-chat",
+    "SPREADSHEET_ID": "sim-spreadsheet",
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 하위 프로세스: 시나리오 1개 실행
+# ─────────────────────────────────────────────────────────────────────────────
+
+class StageTimer:
+    """함수/메서드를 감싸 단계별 누적 시간과 호출 수를 기록 (업로드 워커 스레드 포함)."""
+
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, elapsed: float) -> None:
+        with self._lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + elapsed
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    @contextmanager
+    def measure(self, stage: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - t0)
+
+    def wrap(self, owner, name: str, stage: str) -> None:
+        fn = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            with self.measure(stage):
+                return fn(*args, **kwargs)
+
+        setattr(owner, name, timed)
+
+
+def _peak_rss_mb() -> float | None:
+    """프로세스 최대 RSS(MB). Linux/macOS는 resource, Windows는 PeakWorkingSetSize."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    except ImportError:
+        pass
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (f, ctypes.c_size_t) for f in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                    "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                    "PagefileUsage", "PeakPagefileUsage")
+            ]
+
+        counters = _Counters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / 2**20
+    except Exception:
+        pass
+    return None
+
+
+def run_scenario(args: argparse.Namespace) -> dict:
+    """현재 프로세스에서 시나리오 1개 실행 (LOGI_DATA_DIR/가짜 자격증명은 부모가 설정)."""
+    import main
+    from config import CSV_DIR
+    from modules import checkpoint, excel_com, month_store, pipeline, telegram_sender
+    from modules.logi_automation import LogiAutomation
+    from modules.sheets_writer import CoalescingWriter
+    from sim.fake_excel import FakeExcelConnection
+    from sim.fake_logi import FakeLogi, SimLogiAutomation
+    from sim.fake_sheets_api import FakeSheetsAPI, SimSheetsSession
+    from sim.fake_sheets_http import FakeSheetsServer
+    from sim.fake_telegram import FakeTelegramAPI, api_url
+
+    month = BENCH_MONTH
+    dates = [f"{month}-{d:02d}" for d in range(1, args.days + 1)]
+
+    sheets_api = FakeSheetsAPI(_FAKE_ENV["SPREADSHEET_ID"])
+    telegram_api = FakeTelegramAPI()
+    sheets_server = FakeSheetsServer(
+        handler=sheets_api, latency_sec=args.sheets_latency,
+        throttle_rate=args.sheets_throttle_rate, error_rate=args.sheets_error_rate,
+        retry_after=0.1, seed=args.seed,
+    ).start()
+    telegram_server = FakeSheetsServer(
+        handler=telegram_api, latency_sec=args.telegram_latency,
+        error_rate=args.telegram_error_rate, seed=args.seed,
+    ).start()
+
+    excel = FakeExcelConnection(reject_rate=args.excel_reject_rate, seed=args.seed)
+    excel_com.use_connection(excel)
+    backend = FakeLogi(
+        n_agents=args.agents, query_latency_sec=args.query_latency,
+        query_fail_rate=args.query_fail_rate, excel=excel,
+        excel_delay_sec=args.excel_delay, seed=args.seed,
+    )
+    pipeline.EXTRACT_MODE = args.mode
+    telegram_sender.TELEGRAM_API_URL = api_url(telegram_server.url)
+    session = SimSheetsSession(sheets_server.url, sheets_api.spreadsheet_id)
+
+    timer = StageTimer()
+    timer.wrap(LogiAutomation, "query_date", "query")
+    timer.wrap(LogiAutomation, "read_grid_rows", "extract.grid")
+    timer.wrap(LogiAutomation, "open_excel", "extract.open_excel")
+    timer.wrap(pipeline, "parse_open_excel", "extract.parse_excel")
+    timer.wrap(pipeline, "extract_day", "extract.total")
+    timer.wrap(month_store, "write_day", "store.write_day")
+    timer.wrap(CoalescingWriter, "flush", "sheets.flush")
+    timer.wrap(pipeline, "run_days", "days.total")
+    timer.wrap(main, "export_csv_stream", "csv.export")
+    timer.wrap(pipeline, "month_pivot", "pivot")
+    timer.wrap(main, "send_csv", "telegram.csv")
+    timer.wrap(main, "send_pivot", "telegram.pivot")
+
+    try:
+        with timer.measure("total"):
+            main.run(month, dates, session=session,
+                     logi_factory=lambda i, p: SimLogiAutomation(backend, i, p))
+    finally:
+        sheets_server.stop()
+        telegram_server.stop()
+        excel_com.use_connection(None)
+
+    state = checkpoint.load(month)
+    done = len(state.done_dates)
+    expected = done * args.agents
+    csv_rows = None
+    if state.last_csv:
+        with (CSV_DIR / state.last_csv).open(encoding="utf-8-sig") as f:
+            csv_rows = sum(1 for _ in f) - 1
+    sheet_rows = len(sheets_api.data_rows(month))
+    failed = len(state.failed_dates)
+
+    return {
+        "scenario": args.scenario,
+        "params": {"mode": args.mode, "agents": args.agents, "days": args.days},
+        "stages": {k: round(v, 4) for k, v in sorted(timer.seconds.items())},
+        "stage_calls": dict(sorted(timer.counts.items())),
+        "calls": {
+            **{f"sheets.{k}": v for k, v in sorted(sheets_api.calls.items())},
+            "sheets.http": sheets_server.stats["requests"],
+            **{f"telegram.{k}": v for k, v in sorted(telegram_api.calls.items())},
+            "logi.queries": backend.stats["queries"],
+            "logi.exports": backend.stats["exports"],
+            "grid.scrolls": backend.table.scroll_calls,
+        },
+        "faults": {
+            "sheets.throttled": sheets_server.stats["throttled"],
+            "sheets.errors": sheets_server.stats["errors"],
+            "telegram.errors": telegram_server.stats["errors"],
+            "logi.query_failures": backend.stats["query_failures"],
+            "excel.rejected": excel.rejected,
+        },
+        "quota": session.quota.stats(),
+        "peak_rss_mb": _peak_rss_mb(),
+        "check": {
+            "done_dates": done,
+            "failed_dates": failed,
+            "expected_rows": expected,
+            "csv_rows": csv_rows,
+            "sheet_rows": sheet_rows,
+            # 실패 날짜는 주입한 조회 실패로만 생겨야 한다 (다음 실행에서 체크포인트로 재개)
+            "ok": (csv_rows == expected and sheet_rows == expected and done + failed == args.days
+                   and failed <= backend.stats["query_failures"]),
+        },
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 상위 프로세스: 시나리오별 하위 프로세스 실행, 기준선 비교
+# ─────────────────────────────────────────────────────────────────────────────
+
+_FAULT_FLAGS = (
+    "query_latency", "query_fail_rate", "excel_delay", "excel_reject_rate",
+    "sheets_latency", "sheets_throttle_rate", "sheets_error_rate",
+    "telegram_latency", "telegram_error_rate", "seed",
+)
+
+
+def _spawn(name: str, spec: dict, args: argparse.Namespace) -> dict:
+    cmd = [sys.executable, "-m", "sim.bench", "--scenario", name,
+           "--mode", spec["mode"], "--agents", str(spec["agents"]), "--days", str(spec["days"])]
+    for flag in _FAULT_FLAGS:
+        cmd += [f"--{flag.replace('_', '-')}", str(getattr(args, flag))]
+
+    with tempfile.TemporaryDirectory(prefix="logi_bench_") as data_dir:
+        env = {**os.environ, **_FAKE_ENV, "LOGI_DATA_DIR": data_dir, "PYTHONIOENCODING": "utf-8"}
+        proc = subprocess.run(cmd, cwd=data_dir, env={**env, "PYTHONPATH": str(ROOT)},
+                              capture_output=True, text=True, encoding="utf-8")
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_MARK):
+            return json.loads(line[len(RESULT_MARK):])
+    raise RuntimeError(f"[{name}] 결과 없음 (exit {proc.returncode})\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+
+
+def compare(result: dict, base: dict) -> list[str]:
+    """기준선 대비 회귀 목록 (빈 목록이면 통과)."""
+    problems = []
+    for stage, sec in result["stages"].items():
+        ref = base.get("stages", {}).get(stage)
+        if ref is not None and sec > ref * TIME_RATIO + TIME_FLOOR_SEC:
+            problems.append(f"시간 {stage}: {ref:.2f}s → {sec:.2f}s")
+    for key, n in result["calls"].items():
+        ref = base.get("calls", {}).get(key)
+        if ref is not None and n > ref:
+            problems.append(f"호출 {key}: {ref} → {n}")
+    rss, ref = result.get("peak_rss_mb"), base.get("peak_rss_mb")
+    if rss and ref and rss > ref * MEMORY_RATIO:
+        problems.append(f"메모리: {ref:.0f}MB → {rss:.0f}MB")
+    return problems
+
+
+def _print_result(r: dict) -> None:
+    check = r["check"]
+    rss = r["peak_rss_mb"]
+    print(f"\n■ {r['scenario']}  ({r['params']['mode']}, {r['params']['agents']}명 × {r['params']['days']}일)"
+          + (f"  peak RSS {rss:.0f}MB" if rss else ""))
+    for stage, sec in r["stages"].items():
+        print(f"    {stage:<22} {sec:8.2f}s  ({r['stage_calls'][stage]}회)")
+    print("    호출: " + ", ".join(f"{k}={v}" for k, v in r["calls"].items()))
+    faults = {k: v for k, v in r["faults"].items() if v}
+    if faults:
+        print("    주입 오류: " + ", ".join(f"{k}={v}" for k, v in faults.items()))
+    print(f"    검증: {'OK' if check['ok'] else 'FAIL'} - 완료 {check['done_dates']}일, "
+          f"실패 {check['failed_dates']}일, CSV {check['csv_rows']}행 / 시트 {check['sheet_rows']}행 / 기대 {check['expected_rows']}행")
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="python -m sim.bench", description=__doc__.split("\n")[1])
+    p.add_argument("--quick", action="store_true", help="7일 소규모 시나리오만")
+    p.add_argument("--only", nargs="*", default=None, help="실행할 시나리오 이름")
+    p.add_argument("--update-baseline", action="store_true", help="결과를 기준선 파일에 기록")
+    p.add_argument("--no-compare", action="store_true", help="기준선 비교 생략")
+    p.add_argument("--json", type=Path, default=None, help="결과 전체를 JSON 파일로 저장")
+
+    p.add_argument("--query-latency", type=float, default=0.2)
+    p.add_argument("--query-fail-rate", type=float, default=0.0)
+    p.add_argument("--excel-delay", type=float, default=0.3)
+    p.add_argument("--excel-reject-rate", type=float, default=0.0)
+    p.add_argument("--sheets-latency", type=float, default=0.02)
+    p.add_argument("--sheets-throttle-rate", type=float, default=0.0)
+    p.add_argument("--sheets-error-rate", type=float, default=0.0)
+    p.add_argument("--telegram-latency", type=float, default=0.02)
+    p.add_argument("--telegram-error-rate", type=float, default=0.0)
+    p.add_argument("--seed", type=int, default=0)
+
+    # 하위 프로세스용
+    p.add_argument("--scenario", help=argparse.SUPPRESS)
+    p.add_argument("--mode", default="grid", help=argparse.SUPPRESS)
+    p.add_argument("--agents", type=int, default=300, help=argparse.SUPPRESS)
+    p.add_argument("--days", type=int, default=monthrange(2026, 1)[1], help=argparse.SUPPRESS)
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    if args.scenario:
+        sys.path.insert(0, str(ROOT))
+        result = run_scenario(args)
+        print(RESULT_MARK + json.dumps(result, ensure_ascii=False))
+        return 0
+
+    scenarios = QUICK_SCENARIOS if args.quick else SCENARIOS
+    if args.only:
+        scenarios = {k: v for k, v in {**SCENARIOS, **QUICK_SCENARIOS}.items() if k in args.only}
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else {}
+
+    results = {}
+    failed = False
+    for name, spec in scenarios.items():
+        print(f"[{name}] 실행 중...", flush=True)
+        r = _spawn(name, spec, args)
+        results[name] = r
+        _print_result(r)
+        if not r["check"]["ok"]:
+            failed = True
+        if not args.no_compare and not args.update_baseline and name in baseline:
+            problems = compare(r, baseline[name])
+            for msg in problems:
+                print(f"    회귀: {msg}")
+            failed = failed or bool(problems)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.update_baseline:
+        baseline.update({
+            name: {k: r[k] for k in ("params", "stages", "calls", "peak_rss_mb")}
+            for name, r in results.items()
+        })
+        BASELINE_PATH.write_text(json.dumps(baseline, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\n기준선 갱신: {BASELINE_PATH}")
+
+    print("\n결과: " + ("실패" if failed else "통과"))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
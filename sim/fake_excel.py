@@ -0,0 +1,159 @@
+"""
+Excel.Application 가짜 객체 모델 (순수 Python).
+
+parse_open_excel이 사용하는 부분만 흉내 낸다:
+  Application.Workbooks.Count / ActiveWorkbook
+  Workbook.ActiveSheet / Close(SaveChanges=False)
+  Worksheet.Name / UsedRange.Rows.Count / Range("A2:F301").Value2
+
+    conn = FakeExcelConnection()
+    excel_com.use_connection(conn)
+    conn.open_workbook(values, delay_sec=0.3)   # "엑셀로보기" 시뮬레이션
+    rows = parse_open_excel("2026-02-18")
+
+reject_rate를 주면 그 확률로 새 통합문서의 첫 ActiveWorkbook 접근이
+COM 호출 거부(RPC_E_CALL_REJECTED)처럼 예외를 낸다 (parse_open_excel의 재시도 경로).
+"""
+import random
+import re
+import threading
+
+from modules.excel_com import ExcelConnection
+
+_RANGE_RE = re.compile(r"([A-Z]+)(\d+):([A-Z]+)(\d+)")
+
+
+def _col_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + (ord(ch) - 64)
+    return n - 1
+
+
+class _Rows:
+    def __init__(self, count: int) -> None:
+        self.Count = count
+
+
+class _UsedRange:
+    def __init__(self, sheet: "FakeWorksheet") -> None:
+        self.Rows = _Rows(len(sheet.cells))
+
+
+class _Range:
+    def __init__(self, value2) -> None:
+        self.Value2 = value2
+
+
+class FakeWorksheet:
+    """cells: 헤더 포함 2차원 리스트 (Excel 1행 = cells[0])."""
+
+    def __init__(self, cells: list[list], name: str = "Sheet1") -> None:
+        self.cells = cells
+        self.Name = name
+
+    @property
+    def UsedRange(self) -> _UsedRange:
+        return _UsedRange(self)
+
+    def Range(self, address: str) -> _Range:
+        m = _RANGE_RE.fullmatch(address)
+        c0, r0, c1, r1 = _col_index(m[1]), int(m[2]), _col_index(m[3]), int(m[4])
+        block = []
+        for r in range(r0 - 1, r1):
+            src = self.cells[r] if r < len(self.cells) else []
+            block.append(tuple(src[c] if c < len(src) else None for c in range(c0, c1 + 1)))
+        if len(block) == 1:
+            return _Range(block[0])   # 실제 COM처럼 단일 행은 1차원
+        return _Range(tuple(block))
+
+
+class FakeWorkbook:
+    def __init__(self, app: "FakeExcelApp", sheet: FakeWorksheet, rejects: int = 0) -> None:
+        self._app = app
+        self.ActiveSheet = sheet
+        self.rejects = rejects
+
+    def Close(self, SaveChanges: bool = False) -> None:
+        self._app.books.remove(self)
+        self._app.closed += 1
+
+
+class _Workbooks:
+    def __init__(self, app: "FakeExcelApp") -> None:
+        self._app = app
+
+    @property
+    def Count(self) -> int:
+        return len(self._app.books)
+
+
+class FakeExcelApp:
+    def __init__(self) -> None:
+        self.books: list[FakeWorkbook] = []
+        self.closed = 0
+        self.Workbooks = _Workbooks(self)
+
+    @property
+    def ActiveWorkbook(self) -> FakeWorkbook | None:
+        if not self.books:
+            return None
+        wb = self.books[-1]
+        if wb.rejects > 0:
+            wb.rejects -= 1
+            raise RuntimeError("(-2147418111, '호출을 수신자가 거부했습니다.') - 가짜 Excel")
+        return wb
+
+
+class FakeExcelConnection(ExcelConnection):
+    """
+    가짜 Excel 연결. open_workbook()은 delay_sec 뒤에 통합문서를 열고
+    WorkbookOpen 이벤트(on_workbook_open)를 발생시킨다.
+    """
+
+    def __init__(self, header: list[str] | None = None, reject_rate: float = 0.0, seed: int = 0) -> None:
+        super().__init__()
+        self.fake_app = FakeExcelApp()
+        self.fake_pid = 4242
+        self.reject_rate = reject_rate
+        self.rejected = 0
+        self._rng = random.Random(seed)
+        self.header = header or ["코드", "성명", "고객(받음)", "기사(받음)", "고객(걸음)", "기사(걸음)", "합계(건)"]
+
+    def _connect(self) -> FakeExcelApp:
+        return self.fake_app
+
+    def pid(self) -> int | None:
+        return None if self._app is None else self.fake_pid
+
+    def open_workbook(self, values: list[list], delay_sec: float = 0.0) -> None:
+        """
+        values: 헤더 제외 행 (그리드와 같은 셀 값, sim.fake_uia.synthetic_grid).
+        숫자 컬럼(C~)의 숫자 문자열은 float, 빈 문자열은 None으로 바꿔 COM Value2처럼 만든다.
+        """
+        def cell(i, v):
+            if v == "":
+                return None
+            if i >= 2 and isinstance(v, str) and v.replace(".", "", 1).isdigit():
+                return float(v)
+            return v
+
+        cells = [list(self.header)]
+        for row in values:
+            row = [cell(i, v) for i, v in enumerate(row)]
+            if row and row[0] is None:
+                row[1] = None   # 엑셀 내보내기의 합계행은 코드/성명이 모두 비어 있음
+            cells.append(row)
+
+        rejects = 1 if self._rng.random() < self.reject_rate else 0
+        self.rejected += rejects
+
+        def _open():
+            wb = FakeWorkbook(self.fake_app, FakeWorksheet(cells), rejects)
+            self.fake_app.books.append(wb)
+            self.on_workbook_open(wb)
+
+        if delay_sec > 0:
+            threading.Timer(delay_sec, _open).start()
+        else:
+            _open()
@@ -0,0 +1,146 @@
+"""
+가짜 로지 백엔드 - sim.fake_uia 트리에 조회/엑셀로보기 동작을 붙인다.
+
+  조회(V) 클릭   → query_latency_sec 뒤 Report 그리드를 해당 날짜의 합성 데이터로 교체
+                   (query_fail_rate 확률로 클릭 예외)
+  우클릭 메뉴    → "엑셀로보기" 클릭 시 excel(FakeExcelConnection)에 통합문서를 연다
+                   (excel_delay_sec 뒤)
+
+SimLogiAutomation은 login()/connect_to_open_screen()만 바꿔 이 트리에 붙고
+나머지(기간 입력, 완료 감지, 그리드/Excel 읽기)는 LogiAutomation 코드를 그대로 탄다.
+
+    backend = FakeLogi(n_agents=300, query_latency_sec=0.2)
+    logi = SimLogiAutomation(backend)
+    logi.login()
+    logi.query_date("2026-01-05")
+    rows = logi.read_grid_rows("2026-01-05")
+"""
+import random
+import threading
+import zlib
+
+from config import LOGI_SCREEN_NAME
+from modules.logi_automation import LogiAutomation
+from sim.fake_excel import FakeExcelConnection
+from sim.fake_uia import FakeElement, FakeRect, build_logi_tree, synthetic_grid
+
+
+class _QueryButton(FakeElement):
+    def __init__(self, backend: "FakeLogi") -> None:
+        super().__init__("Button", "조 회(V)", "2357", FakeRect(643, 66, 750, 92))
+        self._backend = backend
+
+    def click_input(self, button: str = "left", **kwargs) -> None:
+        super().click_input(button, **kwargs)
+        self._backend.on_query()
+
+
+class _ExcelMenuItem(FakeElement):
+    def __init__(self, backend: "FakeLogi") -> None:
+        super().__init__("MenuItem", "엑셀로보기")
+        self._backend = backend
+        self.shown = False
+
+    def exists(self, timeout: float | None = None) -> bool:
+        return self.shown
+
+    def click_input(self, button: str = "left", **kwargs) -> None:
+        super().click_input(button, **kwargs)
+        self.shown = False
+        self._backend.on_export()
+
+
+class _FakeApp:
+    """pywinauto Application 대용 (open_excel의 top_window()만 사용)."""
+
+    def __init__(self, backend: "FakeLogi") -> None:
+        self._backend = backend
+
+    def top_window(self) -> FakeElement:
+        return self._backend.context_menu
+
+
+class FakeLogi:
+    """
+    Args:
+        n_agents: 날짜별 상담원 수 (그리드 행 수, 합계행 제외)
+        query_latency_sec: 조회 클릭 → 그리드 갱신 지연
+        query_fail_rate: 조회 클릭이 예외를 내는 확률
+        excel: 엑셀로보기 대상 가짜 Excel (None이면 엑셀 모드 미지원)
+        excel_delay_sec: 엑셀로보기 → 통합문서 열림 지연
+    """
+
+    def __init__(
+        self,
+        n_agents: int = 300,
+        query_latency_sec: float = 0.2,
+        query_fail_rate: float = 0.0,
+        excel: FakeExcelConnection | None = None,
+        excel_delay_sec: float = 0.3,
+        seed: int = 0,
+    ) -> None:
+        self.n_agents = n_agents
+        self.query_latency_sec = query_latency_sec
+        self.query_fail_rate = query_fail_rate
+        self.excel = excel
+        self.excel_delay_sec = excel_delay_sec
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self.stats = {"queries": 0, "query_failures": 0, "exports": 0}
+
+        self.tree = build_logi_tree(data=[])
+        self.query_win = self.tree.child_window(title=LOGI_SCREEN_NAME)
+        self.table = self.query_win.child_window(auto_id="1780")
+        self.date_start = self.query_win.child_window(auto_id="1204")
+        kids = self.query_win._children
+        i = next(i for i, c in enumerate(kids) if c.element_info.automation_id == "2357")
+        kids[i] = _QueryButton(self)
+        self.excel_item = _ExcelMenuItem(self)
+        self.context_menu = FakeElement("Menu", "Context").add(self.excel_item)
+        self.table.click_input = self._table_click
+        self.app = _FakeApp(self)
+
+    def grid_for(self, date_str: str) -> list[list[str]]:
+        """날짜별로 고정된 합성 그리드 (같은 날짜는 항상 같은 값)."""
+        return synthetic_grid(self.n_agents, seed=self.seed ^ zlib.crc32(date_str.encode()))
+
+    # ── 동작 ─────────────────────────────────────────────────────────────────
+
+    def on_query(self) -> None:
+        self.stats["queries"] += 1
+        if self._rng.random() < self.query_fail_rate:
+            self.stats["query_failures"] += 1
+            raise RuntimeError("가짜 로지: 조회 버튼 응답 없음")
+        date_str = self.date_start.text[:10]
+        data = self.grid_for(date_str)
+        if self.query_latency_sec > 0:
+            threading.Timer(self.query_latency_sec, self.table.set_data, (data,)).start()
+        else:
+            self.table.set_data(data)
+
+    def _table_click(self, button: str = "left", **_kwargs) -> None:
+        self.table.clicks.append(button)
+        if button == "right":
+            self.excel_item.shown = True
+
+    def on_export(self) -> None:
+        if self.excel is None:
+            raise RuntimeError("가짜 로지: Excel 대역이 없습니다")
+        self.stats["exports"] += 1
+        self.excel.open_workbook(list(self.table.data), delay_sec=self.excel_delay_sec)
+
+
+class SimLogiAutomation(LogiAutomation):
+    """로그인/화면 연결만 가짜 트리로 바꾼 LogiAutomation."""
+
+    def __init__(self, backend: FakeLogi, logi_id: str = "", logi_pw: str = "") -> None:
+        super().__init__(logi_id, logi_pw)
+        self.backend = backend
+
+    def login(self) -> None:
+        self._app = self.backend.app
+        self._main_win = self.backend.tree
+        self._navigate_to_query_screen()
+
+    def connect_to_open_screen(self) -> None:
+        self.login()
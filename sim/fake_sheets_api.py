@@ -0,0 +1,237 @@
+"""
+Google Sheets API v4 메모리 구현 (sim.fake_sheets_http 서버의 handler).
+
+sheets_uploader / row_index가 쓰는 요청만 흉내 낸다:
+  GET  /v4/spreadsheets/{id}                        메타데이터 (시트 목록)
+  POST /v4/spreadsheets/{id}:batchUpdate            addSheet / updateSheetProperties / appendDimension
+  GET  /v4/spreadsheets/{id}/values/{range}         값 읽기 (문자열, 끝의 빈 행/셀 생략)
+  PUT  /v4/spreadsheets/{id}/values/{range}         값 쓰기
+  POST /v4/spreadsheets/{id}/values/{range}:append  마지막 데이터 행 다음에 추가
+  GET  /v4/spreadsheets/{id}/values:batchGet
+  POST /v4/spreadsheets/{id}/values:batchUpdate
+
+    api = FakeSheetsAPI()
+    with FakeSheetsServer(handler=api, latency_sec=0.05) as server:
+        session = SimSheetsSession(server.url, api.spreadsheet_id)
+        upsert_rows(session, "2026-02", rows)
+    api.calls   # {"values.append": 3, ...}
+"""
+import re
+import threading
+from collections import Counter
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import gspread
+
+from modules.sheets_quota import QuotaHTTPClient, SheetsQuota
+from modules.sheets_uploader import SheetsSession
+from sim.fake_sheets_http import redirect_session
+
+_CELL_RE = re.compile(r"([A-Z]*)(\d*)")
+
+
+def _col_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + (ord(ch) - 64)
+    return n - 1
+
+
+def _col_letters(index: int) -> str:
+    s = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        s = chr(65 + rem) + s
+    return s
+
+
+class _Sheet:
+    def __init__(self, sheet_id: int, title: str, rows: int, cols: int) -> None:
+        self.sheet_id = sheet_id
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self.cells: list[list] = []
+
+    def properties(self) -> dict:
+        return {
+            "sheetId": self.sheet_id, "title": self.title, "index": self.sheet_id,
+            "sheetType": "GRID",
+            "gridProperties": {"rowCount": self.row_count, "columnCount": self.col_count},
+        }
+
+    def bounds(self, a1: str | None) -> tuple[int, int, int, int]:
+        """A1 구간 → (r0, c0, r1, c1) 0-based, 끝 포함. 생략된 끝은 시트 끝."""
+        if not a1:
+            return 0, 0, self.row_count - 1, self.col_count - 1
+        start, _, end = a1.partition(":")
+        m0 = _CELL_RE.fullmatch(start)
+        m1 = _CELL_RE.fullmatch(end or start)
+        r0 = int(m0[2]) - 1 if m0[2] else 0
+        c0 = _col_index(m0[1]) if m0[1] else 0
+        r1 = int(m1[2]) - 1 if m1[2] else self.row_count - 1
+        c1 = _col_index(m1[1]) if m1[1] else self.col_count - 1
+        return r0, c0, r1, c1
+
+    def read(self, a1: str | None) -> list[list[str]]:
+        r0, c0, r1, c1 = self.bounds(a1)
+        out = []
+        for r in range(r0, min(r1 + 1, len(self.cells))):
+            row = self.cells[r][c0:c1 + 1]
+            out.append(["" if v is None else str(v) for v in row])
+        while out and not any(out[-1]):
+            out.pop()
+        for row in out:
+            while row and row[-1] == "":
+                row.pop()
+        return out
+
+    def write(self, a1: str | None, values: list[list]) -> tuple[int, int]:
+        r0, c0, _, _ = self.bounds(a1)
+        for i, vals in enumerate(values):
+            r = r0 + i
+            while len(self.cells) <= r:
+                self.cells.append([])
+            row = self.cells[r]
+            need = c0 + len(vals)
+            if len(row) < need:
+                row.extend([None] * (need - len(row)))
+            row[c0:need] = vals
+        self.row_count = max(self.row_count, r0 + len(values))
+        width = max((len(v) for v in values), default=0)
+        return r0, c0 + width - 1
+
+    def last_data_row(self) -> int:
+        for r in range(len(self.cells) - 1, -1, -1):
+            if any(v not in (None, "") for v in self.cells[r]):
+                return r
+        return -1
+
+
+class FakeSheetsAPI:
+    """FakeSheetsServer(handler=...)에 넘기는 (method, path, body) → (status, dict) 구현."""
+
+    def __init__(self, spreadsheet_id: str = "sim-spreadsheet", title: str = "로지 월 취합 (sim)") -> None:
+        self.spreadsheet_id = spreadsheet_id
+        self.title = title
+        self.sheets: dict[str, _Sheet] = {}
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+
+    # ── 요청 분기 ────────────────────────────────────────────────────────────
+
+    def __call__(self, method: str, path: str, body: dict | None) -> tuple[int, dict]:
+        parts = urlsplit(path)
+        query = parse_qs(parts.query)
+        rest = unquote(parts.path).split("/v4/spreadsheets/", 1)[-1]
+        sid, _, tail = rest.partition("/")
+        sid, _, action = sid.partition(":")
+        if sid != self.spreadsheet_id:
+            return 404, {"error": {"code": 404, "status": "NOT_FOUND", "message": "spreadsheet"}}
+
+        with self._lock:
+            if not tail:
+                if action == "batchUpdate":
+                    return self._batch_update(body or {})
+                self.calls["metadata"] += 1
+                return 200, self._metadata()
+            if tail == "values:batchGet":
+                self.calls["values.batchGet"] += 1
+                return 200, {"valueRanges": [self._get(r) for r in query.get("ranges", [])]}
+            if tail == "values:batchUpdate":
+                self.calls["values.batchUpdate"] += 1
+                for item in (body or {}).get("data", []):
+                    self._put(item["range"], item["values"])
+                return 200, {"spreadsheetId": sid}
+            rng = tail[len("values/"):]
+            if rng.endswith(":append"):
+                self.calls["values.append"] += 1
+                return 200, self._append(rng[:-len(":append")], (body or {}).get("values", []))
+            if method == "GET":
+                self.calls["values.get"] += 1
+                return 200, self._get(rng)
+            self.calls["values.update"] += 1
+            self._put(rng, (body or {}).get("values", []))
+            return 200, {"spreadsheetId": sid, "updatedRange": rng}
+
+    # ── 구현 ─────────────────────────────────────────────────────────────────
+
+    def _metadata(self) -> dict:
+        return {
+            "spreadsheetId": self.spreadsheet_id,
+            "properties": {"title": self.title, "locale": "ko_KR", "timeZone": "Asia/Seoul"},
+            "sheets": [{"properties": s.properties()} for s in self.sheets.values()],
+        }
+
+    def _sheet(self, rng: str) -> tuple[_Sheet, str | None]:
+        title, _, a1 = rng.partition("!")
+        title = title.strip("'").replace("''", "'")
+        return self.sheets[title], (a1 or None)
+
+    def _get(self, rng: str) -> dict:
+        sheet, a1 = self._sheet(rng)
+        values = sheet.read(a1)
+        resp = {"range": rng, "majorDimension": "ROWS"}
+        if values:
+            resp["values"] = values
+        return resp
+
+    def _put(self, rng: str, values: list[list]) -> None:
+        sheet, a1 = self._sheet(rng)
+        sheet.write(a1, values)
+
+    def _append(self, rng: str, values: list[list]) -> dict:
+        sheet, _ = self._sheet(rng)
+        start = sheet.last_data_row() + 1
+        _, c1 = sheet.write(f"A{start + 1}", values)
+        end = start + len(values)
+        updated = f"'{sheet.title}'!A{start + 1}:{_col_letters(c1)}{end}"
+        return {"spreadsheetId": self.spreadsheet_id, "tableRange": f"'{sheet.title}'!A1",
+                "updates": {"updatedRange": updated, "updatedRows": len(values)}}
+
+    def _batch_update(self, body: dict) -> tuple[int, dict]:
+        self.calls["batchUpdate"] += 1
+        replies = []
+        for req in body.get("requests", []):
+            if "addSheet" in req:
+                props = req["addSheet"]["properties"]
+                grid = props.get("gridProperties", {})
+                sheet = _Sheet(len(self.sheets), props["title"],
+                               grid.get("rowCount", 1000), grid.get("columnCount", 26))
+                self.sheets[sheet.title] = sheet
+                replies.append({"addSheet": {"properties": sheet.properties()}})
+            elif "updateSheetProperties" in req:
+                props = req["updateSheetProperties"]["properties"]
+                sheet = next(s for s in self.sheets.values() if s.sheet_id == props["sheetId"])
+                grid = props.get("gridProperties", {})
+                sheet.row_count = grid.get("rowCount", sheet.row_count)
+                sheet.col_count = grid.get("columnCount", sheet.col_count)
+                replies.append({})
+            elif "appendDimension" in req:
+                dim = req["appendDimension"]
+                sheet = next(s for s in self.sheets.values() if s.sheet_id == dim["sheetId"])
+                if dim.get("dimension") == "ROWS":
+                    sheet.row_count += dim["length"]
+                else:
+                    sheet.col_count += dim["length"]
+                replies.append({})
+            else:
+                replies.append({})
+        return 200, {"spreadsheetId": self.spreadsheet_id, "replies": replies}
+
+    def data_rows(self, title: str) -> list[list[str]]:
+        """시트 값 (헤더 제외, 문자열) - 결과 검증용."""
+        sheet = self.sheets.get(title)
+        return sheet.read(None)[1:] if sheet else []
+
+
+class SimSheetsSession(SheetsSession):
+    """인증 없이 로컬 대역 서버로 요청하는 SheetsSession."""
+
+    def __init__(self, base_url: str, spreadsheet_id: str, quota: SheetsQuota | None = None) -> None:
+        super().__init__(None, spreadsheet_id, quota=quota or SheetsQuota())
+        self._base_url = base_url
+
+    def _new_client(self) -> gspread.Client:
+        return gspread.Client(None, session=redirect_session(self._base_url), http_client=QuotaHTTPClient)
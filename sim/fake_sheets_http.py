@@ -0,0 +1,173 @@
+"""
+Google Sheets API 로컬 HTTP 대역(stand-in).
+
+127.0.0.1의 임의 포트에서 동작하며 응답 지연과 429/5xx 오류를 주입한다.
+redirect_session()이 반환하는 requests.Session을 gspread HTTPClient에 넣으면
+https://sheets.googleapis.com 요청이 이 서버로 향한다.
+
+    with FakeSheetsServer(throttle_rate=0.3) as server:
+        client = QuotaHTTPClient(auth=None, session=redirect_session(server.url))
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+_GOOGLE_PREFIXES = (
+    "https://sheets.googleapis.com",
+    "https://www.googleapis.com",
+)
+
+
+class FakeSheetsServer:
+    """
+    Args:
+        throttle_rate: 요청이 429를 받을 확률 (0~1)
+        error_rate: 요청이 503을 받을 확률 (0~1)
+        lost_reply_rate: 요청을 처리(handler 반영)한 뒤 503을 돌려줄 확률 (응답 유실 흉내)
+        retry_after: 429 응답의 Retry-After 헤더(초). None이면 헤더 생략.
+        latency_sec: 모든 응답 전 지연(초)
+        handler: (method, path, body) → (status, dict) 정상 응답 생성 함수.
+                 None이면 항상 200 {}.
+    """
+
+    def __init__(
+        self,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        lost_reply_rate: float = 0.0,
+        retry_after: float | None = 1.0,
+        latency_sec: float = 0.0,
+        handler=None,
+        seed: int = 0,
+    ) -> None:
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.lost_reply_rate = lost_reply_rate
+        self.retry_after = retry_after
+        self.latency_sec = latency_sec
+        self.handler = handler
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "lost_replies": 0, "bytes_out": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _decide(self) -> str:
+        with self._lock:
+            self.stats["requests"] += 1
+            r = self._rng.random()
+            if r < self.throttle_rate:
+                self.stats["throttled"] += 1
+                return "throttle"
+            if r < self.throttle_rate + self.error_rate:
+                self.stats["errors"] += 1
+                return "error"
+            if r < self.throttle_rate + self.error_rate + self.lost_reply_rate:
+                self.stats["lost_replies"] += 1
+                return "lost"
+            return "ok"
+
+    def _make_handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, *_args) -> None:
+                pass
+
+            def _reply(self, status: int, body: dict, headers: dict | None = None) -> None:
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(payload)
+                with server._lock:
+                    server.stats["bytes_out"] += len(payload)
+
+            def _handle(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                if server.latency_sec:
+                    time.sleep(server.latency_sec)
+
+                decision = server._decide()
+                if decision == "throttle":
+                    headers = {}
+                    if server.retry_after is not None:
+                        headers["Retry-After"] = f"{server.retry_after:g}"
+                    self._reply(429, {"error": {
+                        "code": 429, "status": "RESOURCE_EXHAUSTED",
+                        "message": "Quota exceeded (fake)",
+                    }}, headers)
+                    return
+                if decision == "error":
+                    self._reply(503, {"error": {
+                        "code": 503, "status": "UNAVAILABLE", "message": "Backend error (fake)",
+                    }})
+                    return
+
+                if server.handler is None:
+                    self._reply(200, {})
+                    return
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    body = None
+                status, resp = server.handler(self.command, self.path, body)
+                if decision == "lost":
+                    self._reply(503, {"error": {
+                        "code": 503, "status": "UNAVAILABLE", "message": "Reply lost after apply (fake)",
+                    }})
+                    return
+                self._reply(status, resp)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+        return _Handler
+
+    def start(self) -> "FakeSheetsServer":
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "FakeSheetsServer":
+        return self.start()
+
+    def __exit__(self, *_exc) -> None:
+        self.stop()
+
+
+class _RedirectSession(requests.Session):
+    def __init__(self, base_url: str) -> None:
+        super().__init__()
+        self._base = base_url.rstrip("/")
+
+    def request(self, method, url, *args, **kwargs):
+        for prefix in _GOOGLE_PREFIXES:
+            if url.startswith(prefix):
+                url = self._base + url[len(prefix):]
+                break
+        return super().request(method, url, *args, **kwargs)
+
+
+def redirect_session(base_url: str) -> requests.Session:
+    """Google API URL을 base_url로 바꿔 보내는 requests.Session."""
+    return _RedirectSession(base_url)
@@ -0,0 +1,39 @@
+"""
+Telegram Bot API 대역 (sim.fake_sheets_http 서버의 handler).
+
+telegram_sender가 쓰는 sendDocument만 흉내 낸다. 지연/5xx 주입은 서버 옵션을 그대로 쓴다.
+
+    api = FakeTelegramAPI()
+    with FakeSheetsServer(handler=api, error_rate=0.2) as server:
+        telegram_sender.TELEGRAM_API_URL = api_url(server.url)
+        send_csv("token", "chat", csv_path, "2026-02", 9300)
+    api.calls   # {"sendDocument": 1}
+"""
+import itertools
+import threading
+from collections import Counter
+
+
+def api_url(base_url: str) -> str:
+    """config.TELEGRAM_API_URL 형식 ({token}, {method})의 대역 서버 주소."""
+    return f"{base_url.rstrip('/')}/bot{{token}}/{{method}}"
+
+
+class FakeTelegramAPI:
+    """FakeSheetsServer(handler=...)에 넘기는 (method, path, body) → (status, dict) 구현."""
+
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __call__(self, method: str, path: str, body: dict | None) -> tuple[int, dict]:
+        token, _, api_method = path.lstrip("/").partition("/")
+        if not token.startswith("bot") or method != "POST":
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        with self._lock:
+            self.calls[api_method] += 1
+            message_id = next(self._ids)
+        if api_method != "sendDocument":
+            return 400, {"ok": False, "error_code": 400, "description": f"{api_method} 미지원 (sim)"}
+        return 200, {"ok": True, "result": {"message_id": message_id, "document": {}}}
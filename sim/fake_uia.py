@@ -0,0 +1,332 @@
+"""
+로지 기간별수신콜수 화면의 가짜 UIA 트리.
+
+debug_controls_output.txt 덤프와 같은 모양으로 구성하며,
+pywinauto UIAWrapper 중 이 프로젝트가 사용하는 메서드만 흉내 낸다:
+  children / descendants / child_window / wait / click_input /
+  window_text / element_info / is_enabled / rectangle /
+  get_toggle_state / scroll / iface_scroll / iface_value / legacy_properties
+
+Report 그리드(FakeReportTable)는 실제처럼 가상화되어
+한 화면(visible_rows)에 보이는 행만 자식으로 노출한다.
+"""
+import random
+import re
+from dataclasses import dataclass
+
+ROW_HEIGHT = 19
+VISIBLE_ROWS = 44          # 실측 그리드 높이(T99~B956) 기준
+GRID_COLUMNS = ["코드", "성명", "고객(받음)", "기사(받음)", "고객(걸음)", "기사(걸음)", "합계(건)"]
+
+
+class ElementNotFound(LookupError):
+    pass
+
+
+@dataclass
+class FakeRect:
+    left: int = 0
+    top: int = 0
+    right: int = 0
+    bottom: int = 0
+
+    def width(self) -> int:
+        return self.right - self.left
+
+    def height(self) -> int:
+        return self.bottom - self.top
+
+
+@dataclass
+class FakeElementInfo:
+    control_type: str
+    name: str = ""
+    automation_id: str = ""
+    rectangle: FakeRect | None = None
+
+
+class FakeElement:
+    """UIAWrapper 최소 구현."""
+
+    def __init__(self, control_type: str, name: str = "", aid: str = "",
+                 rect: FakeRect | None = None, children: list | None = None) -> None:
+        self.element_info = FakeElementInfo(control_type, name, aid, rect or FakeRect())
+        self._children: list[FakeElement] = list(children or [])
+        self.clicks: list[str] = []
+        self.enabled = True
+
+    def __repr__(self) -> str:
+        i = self.element_info
+        return f"<Fake {i.control_type} name={i.name!r} aid={i.automation_id!r}>"
+
+    # ── 트리 탐색 ────────────────────────────────────────────────────────────
+
+    def add(self, *children: "FakeElement") -> "FakeElement":
+        self._children.extend(children)
+        return self
+
+    def children(self, control_type: str | None = None) -> list["FakeElement"]:
+        kids = self._live_children()
+        if control_type is None:
+            return list(kids)
+        return [c for c in kids if c.element_info.control_type == control_type]
+
+    def _live_children(self) -> list["FakeElement"]:
+        return self._children
+
+    def descendants(self, control_type: str | None = None) -> list["FakeElement"]:
+        result = []
+        for c in self._live_children():
+            if control_type is None or c.element_info.control_type == control_type:
+                result.append(c)
+            result.extend(c.descendants(control_type))
+        return result
+
+    def _matches(self, title=None, title_re=None, auto_id=None, control_type=None, **_) -> bool:
+        i = self.element_info
+        if title is not None and i.name != title:
+            return False
+        if title_re is not None and not re.fullmatch(title_re, i.name or ""):
+            return False
+        if auto_id is not None and i.automation_id != auto_id:
+            return False
+        if control_type is not None and i.control_type != control_type:
+            return False
+        return True
+
+    def child_window(self, **criteria) -> "FakeElement":
+        for d in self.descendants():
+            if d._matches(**criteria):
+                return d
+        raise ElementNotFound(criteria)
+
+    # ── 상태/조작 ────────────────────────────────────────────────────────────
+
+    def wait(self, *_args, **_kwargs) -> "FakeElement":
+        return self
+
+    def wrapper_object(self) -> "FakeElement":
+        return self
+
+    def window_text(self) -> str:
+        return self.element_info.name
+
+    def is_enabled(self) -> bool:
+        return self.enabled
+
+    def is_visible(self) -> bool:
+        return True
+
+    def rectangle(self) -> FakeRect:
+        return self.element_info.rectangle
+
+    def click_input(self, button: str = "left", **_kwargs) -> None:
+        self.clicks.append(button)
+
+    def set_focus(self) -> "FakeElement":
+        return self
+
+
+class FakeCheckBox(FakeElement):
+    def __init__(self, name: str, aid: str = "", checked: bool = False,
+                 rect: FakeRect | None = None) -> None:
+        super().__init__("CheckBox", name, aid, rect)
+        self.checked = checked
+
+    def get_toggle_state(self) -> int:
+        return 1 if self.checked else 0
+
+    def click_input(self, button: str = "left", **kwargs) -> None:
+        super().click_input(button, **kwargs)
+        self.checked = not self.checked
+
+
+class _FakeValuePattern:
+    """IUIAutomationValuePattern 최소 구현."""
+
+    def __init__(self, pane: "FakeDatePane") -> None:
+        self._p = pane
+
+    @property
+    def CurrentValue(self) -> str:
+        return self._p.text
+
+    @property
+    def CurrentIsReadOnly(self) -> bool:
+        return False
+
+    def SetValue(self, value: str) -> None:
+        self._p.set_calls += 1
+        self._p.text = value
+
+
+class FakeDatePane(FakeElement):
+    """
+    DevExpress 기간 입력 Pane. 표시 값은 legacy_properties()['Value']로 읽힌다.
+    supports_value=False면 ValuePattern이 없어 키 입력만 가능하다.
+    keyboard(keys)는 pywinauto send_keys 대용 - 포커스가 있을 때만 반영.
+    """
+
+    def __init__(self, aid: str, supports_value: bool = True,
+                 text: str = "2026-01-01 00:00", rect: FakeRect | None = None) -> None:
+        super().__init__("Pane", "", aid, rect or FakeRect(90, 68, 223, 89))
+        self.text = text
+        self.focused = False
+        self.supports_value = supports_value
+        self.set_calls = 0
+        self.keys_sent = 0
+        self._parts: list[str] = []
+        self.handle = 0
+
+    @property
+    def iface_value(self) -> _FakeValuePattern:
+        if not self.supports_value:
+            raise NotImplementedError("ValuePattern 미지원")
+        return _FakeValuePattern(self)
+
+    def legacy_properties(self) -> dict:
+        return {"Value": self.text}
+
+    def has_keyboard_focus(self) -> bool:
+        return self.focused
+
+    def click_input(self, button: str = "left", **kwargs) -> None:
+        super().click_input(button, **kwargs)
+        self.focused = True
+        self._parts = []
+
+    def keyboard(self, keys: str) -> None:
+        if not self.focused:
+            return
+        self.keys_sent += 1
+        if keys == "{ENTER}":
+            if len(self._parts) == 4:
+                y, m, d, h = self._parts
+                self.text = f"{y}-{m}-{d} {h}:00"
+            self._parts = []
+        else:
+            self._parts.append(keys)
+
+
+class _FakeScrollPattern:
+    """IUIAutomationScrollPattern 최소 구현."""
+
+    def __init__(self, table: "FakeReportTable") -> None:
+        self._t = table
+
+    @property
+    def CurrentVerticalScrollPercent(self) -> float:
+        span = self._t.max_offset()
+        if span <= 0:
+            return -1.0   # 스크롤 불가 (UIA_ScrollPatternNoScroll)
+        return 100.0 * self._t.offset / span
+
+    @property
+    def CurrentVerticalViewSize(self) -> float:
+        n = len(self._t.data)
+        return 100.0 if n <= self._t.visible_rows else 100.0 * self._t.visible_rows / n
+
+    def SetScrollPercent(self, _horizontal: float, vertical: float) -> None:
+        if vertical >= 0:
+            self._t.offset = round(self._t.max_offset() * vertical / 100.0)
+
+
+class FakeReportTable(FakeElement):
+    """
+    가상화된 Report 그리드. 보이는 행만 Custom(Report Row) 자식으로 생성한다.
+
+    data: 행별 셀 문자열 리스트 (GRID_COLUMNS 순서, 맨 끝 합계행 포함 가능)
+    """
+
+    def __init__(self, data: list[list[str]], visible_rows: int = VISIBLE_ROWS) -> None:
+        super().__init__("Table", "Report", "1780", FakeRect(34, 99, 318, 956))
+        self.data = data
+        self.visible_rows = visible_rows
+        self.offset = 0
+        self.scroll_calls = 0
+        self.iface_scroll = _FakeScrollPattern(self)
+        header = FakeElement("Header", "Report Header")
+        header.add(*(FakeElement("Header", col) for col in GRID_COLUMNS))
+        self._fixed = [FakeElement("Thumb"), header]
+
+    def max_offset(self) -> int:
+        return max(0, len(self.data) - self.visible_rows)
+
+    def set_data(self, data: list[list[str]]) -> None:
+        """조회 결과 교체 (새 날짜 조회 시뮬레이션)."""
+        self.data = data
+        self.offset = 0
+
+    def _live_children(self) -> list[FakeElement]:
+        rows = []
+        top = 122
+        for vals in self.data[self.offset:self.offset + self.visible_rows]:
+            row = FakeElement("Custom", "Report Row", rect=FakeRect(35, top, 395, top + ROW_HEIGHT))
+            row.add(*(FakeElement("DataItem", v) for v in vals))
+            rows.append(row)
+            top += ROW_HEIGHT
+        return self._fixed + rows
+
+    def scroll(self, direction: str, amount: str, count: int = 1, **_kwargs) -> None:
+        self.scroll_calls += 1
+        step = self.visible_rows if amount == "page" else 1
+        delta = step * count * (1 if direction == "down" else -1)
+        self.offset = min(self.max_offset(), max(0, self.offset + delta))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 트리/데이터 생성
+# ─────────────────────────────────────────────────────────────────────────────
+
+def synthetic_grid(n_agents: int, seed: int = 0, with_total: bool = True) -> list[list[str]]:
+    """
+    그리드 셀 텍스트 생성. 빈 셀('')은 실제 덤프처럼 0 대신 섞어 넣는다.
+    with_total=True면 맨 끝에 합계행을 붙인다.
+    """
+    rng = random.Random(seed)
+
+    def num(hi: int) -> str:
+        v = rng.randint(0, hi)
+        return "" if v == 0 else str(v)
+
+    rows = []
+    grand = 0
+    for i in range(n_agents):
+        c, d, e, f = num(200), num(50), num(30), num(10)
+        total = sum(int(x or 0) for x in (c, d, e, f))
+        grand += total
+        rows.append([str(1000 + i), f"상담원{i:04d}", c, d, e, f, str(total)])
+    if with_total:
+        rows.append(["", "합계", "", "", "", "", str(grand)])
+    return rows
+
+
+def build_logi_tree(data: list[list[str]] | None = None,
+                    visible_rows: int = VISIBLE_ROWS) -> FakeElement:
+    """
+    debug_controls_output.txt와 같은 구조의 로지 메인 창 트리를 생성.
+    반환값은 메인 Pane. 기간별수신콜수 Window는
+    child_window(title='기간별수신콜수')로 접근한다.
+    """
+    table = FakeReportTable(data if data is not None else synthetic_grid(40), visible_rows)
+
+    query_win = FakeElement("Window", "기간별수신콜수", "65280", FakeRect(29, 58, 998, 958)).add(
+        FakeDatePane("1204", rect=FakeRect(90, 68, 223, 89)),
+        FakeDatePane("1206", rect=FakeRect(244, 68, 377, 89)),
+        FakeElement("Text", "∼"),
+        FakeElement("Text", "기간", "2200"),
+        FakeElement("Button", "조건", "1186"),
+        FakeElement("Button", "조 회(V)", "2357", FakeRect(643, 66, 750, 92)),
+        FakeCheckBox("전화받은건수기준", "2207", checked=True, rect=FakeRect(770, 70, 900, 88)),
+        FakeElement("Pane", "", "5027"),
+        table,
+    )
+    work_area = FakeElement("Pane", "작업 영역", "59648").add(query_win)
+
+    menu_bar = FakeElement("MenuBar", "MENU").add(
+        *(FakeElement("MenuItem", m) for m in ("홈", "직원", "보기", "설정", "요청", "원격연결요청", "도움말"))
+    )
+    top_bar = FakeElement("Pane", "xtpBarTop", "59419").add(menu_bar)
+
+    return FakeElement("Pane", "아리랑콜센터-알렉스.기수신[메인/1등급]",
+                       rect=FakeRect(22, 5, 1011, 990)).add(work_area, top_bar)